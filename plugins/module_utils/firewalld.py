@@ -4,49 +4,171 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 from __future__ import absolute_import, division, print_function
+
+import shlex
+import time
+
 from ansible_collections.ansible.posix.plugins.module_utils.version import LooseVersion
 from ansible_collections.ansible.posix.plugins.module_utils._respawn import respawn_module, HAS_RESPAWN_UTIL
+from ansible_collections.ansible.posix.plugins.module_utils.firewalld_xml import FirewallXml, ZoneSettings, is_firewalld_running
 from ansible.module_utils.basic import missing_required_lib
 
 __metaclass__ = type
 
 
+# The firewall python bindings are imported and firewalld is connected on
+# first use, see connect_fw(), so that modules failing argument validation or
+# using the xml backend don't pay for it.
+fw_import_start = time.time()
+fw_import_time = 0.0
+
 FW_VERSION = None
 fw = None
 fw_offline = False
+fw_backend = 'firewall'
+zone_settings_class = None
 import_failure = True
-try:
-    import firewall.config
-    FW_VERSION = firewall.config.VERSION
 
-    from firewall.client import FirewallClient
-    from firewall.client import FirewallClientZoneSettings
-    from firewall.errors import FirewallError
-    import_failure = False
 
+def connect_fw():
+    """
+    Import the firewall python bindings and connect to firewalld, or start
+    the offline firewall if the daemon is not running. Does nothing if a
+    backend is already in place.
+    """
+    global FW_VERSION, fw, fw_offline, zone_settings_class, import_failure, fw_import_time
+
+    if fw is not None:
+        return
+
+    start = time.time()
     try:
-        fw = FirewallClient()
-        fw.getDefaultZone()
+        import firewall.config
+        FW_VERSION = firewall.config.VERSION
 
-    except (AttributeError, FirewallError):
-        # Firewalld is not currently running, permanent-only operations
-        fw_offline = True
+        from firewall.client import FirewallClient
+        from firewall.client import FirewallClientZoneSettings
+        from firewall.errors import FirewallError
+        zone_settings_class = FirewallClientZoneSettings
+        import_failure = False
 
-        # Import other required parts of the firewalld API
-        #
-        # NOTE:
-        #  online and offline operations do not share a common firewalld API
         try:
-            from firewall.core.fw_test import Firewall_test
-            fw = Firewall_test()
-        except (ModuleNotFoundError):
-            # In firewalld version 0.7.0 this behavior changed
-            from firewall.core.fw import Firewall
-            fw = Firewall(offline=True)
+            fw = FirewallClient()
+            fw.getDefaultZone()
+
+        except (AttributeError, FirewallError):
+            # Firewalld is not currently running, permanent-only operations
+            fw_offline = True
+
+            # Import other required parts of the firewalld API
+            #
+            # NOTE:
+            #  online and offline operations do not share a common firewalld API
+            try:
+                from firewall.core.fw_test import Firewall_test
+                fw = Firewall_test()
+            except (ModuleNotFoundError):
+                # In firewalld version 0.7.0 this behavior changed
+                from firewall.core.fw import Firewall
+                fw = Firewall(offline=True)
+
+            fw.start()
+    except ImportError:
+        pass
+    finally:
+        fw_import_time = time.time() - start
+
+
+def use_xml_backend():
+    """
+    Switch to the daemon-free backend, which edits the zone XML files in
+    /etc/firewalld directly and does not need the firewall python bindings.
+    """
+    global fw, fw_offline, fw_backend, zone_settings_class
+
+    fw = FirewallXml()
+    fw_offline = True
+    fw_backend = 'xml'
+    zone_settings_class = ZoneSettings
+
+
+def normalize_rich_rule(rule):
+    """
+    Return the canonical form of a rich rule string as a hashable tuple.
+
+    Rules that only differ in whitespace, quoting, the order of attributes or
+    the order of their elements have the same canonical form. The rule is not
+    validated beyond its structure, that is left to firewalld.
+
+    Raises ValueError if the rule can't be parsed.
+    """
+    try:
+        tokens = shlex.split(rule)
+    except ValueError as e:
+        raise ValueError('invalid rich rule "%s": %s' % (rule, e))
+    if not tokens or tokens[0] != 'rule':
+        raise ValueError('invalid rich rule "%s": a rule has to start with "rule"' % rule)
+
+    # Every element is [name, inverted, attributes, limit]
+    elements = []
+    current = None
+    for token in tokens:
+        if '=' in token:
+            if current is None:
+                raise ValueError('invalid rich rule "%s": unexpected "%s"' % (rule, token))
+            key, value = token.split('=', 1)
+            current[2].append((key, value))
+        elif token == 'not':
+            if current is None:
+                raise ValueError('invalid rich rule "%s": unexpected "not"' % rule)
+            current[1] = True
+        elif token == 'limit':
+            # A limit belongs to the log, audit or action element before it
+            if current is None:
+                raise ValueError('invalid rich rule "%s": unexpected "limit"' % rule)
+            current[3] = ['limit', False, [], None]
+            current = current[3]
+        else:
+            current = [token, False, [], None]
+            elements.append(current)
+
+    def canonical(element):
+        name, inverted, attributes, limit = element
+        if name == 'rule':
+            # firewalld omits the default priority
+            attributes = [attr for attr in attributes if attr != ('priority', '0')]
+        return (name, inverted, tuple(sorted(attributes)), canonical(limit) if limit else ())
+
+    return tuple(sorted(canonical(element) for element in elements))
+
+
+class RichRuleIndex(object):
+    """
+    Set of rich rules keyed on their canonical form, see normalize_rich_rule().
+
+    Membership tests are hash lookups and get() returns the rule string as it
+    was added, i.e. as firewalld stores it when built from its rule list.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = {}
+        for rule in rules:
+            self.add(rule)
+
+    def __contains__(self, rule):
+        return normalize_rich_rule(rule) in self.rules
+
+    def __len__(self):
+        return len(self.rules)
+
+    def get(self, rule):
+        return self.rules.get(normalize_rich_rule(rule))
 
-        fw.start()
-except ImportError:
-    pass
+    def add(self, rule):
+        self.rules.setdefault(normalize_rich_rule(rule), rule)
+
+    def discard(self, rule):
+        self.rules.pop(normalize_rich_rule(rule), None)
 
 
 class FirewallTransaction(object):
@@ -56,14 +178,29 @@ class FirewallTransaction(object):
     This is the base class for all firewalld transactions we might want to have
     """
 
+    # Zone objects and permanent settings fetched during this module run,
+    # keyed by zone name. The cache is shared by every transaction so that a
+    # zone is read only once until it is written to again.
+    zone_settings_cache = {}
+
+    # Operation name -> [count, seconds] of the calls made through
+    # action_handler(), only recorded with the perf option of the module
+    perf_stats = {}
+
+    # Offline only: interface and source name -> names of the zones they are
+    # bound to. Built on first use and kept up to date by update_fw_settings().
+    zone_binding_index = None
+
     def __init__(self, module, action_args=(), zone=None, desired_state=None,
-                 permanent=False, immediate=False, enabled_values=None, disabled_values=None):
+                 permanent=False, immediate=False, enabled_values=None, disabled_values=None,
+                 items=None):
         # type: (firewall.client, tuple, str, bool, bool, bool)
         """
         initializer the transaction
 
         :module:          AnsibleModule, instance of AnsibleModule
         :action_args:     tuple, args to pass for the action to take place
+        :items:           tuple[], action_args of several items to process in one settings round trip
         :zone:            str,  firewall zone
         :desired_state:   str,  the desired state (enabled, disabled, etc)
         :permanent:       bool, action should be permanent
@@ -75,6 +212,16 @@ class FirewallTransaction(object):
         self.module = module
         self.fw = fw
         self.action_args = action_args
+        self.items = None
+        if items is not None:
+            # Each item is checked and changed once, in the order given
+            self.items = []
+            seen = set()
+            for item in items:
+                item = tuple(item)
+                if item not in seen:
+                    seen.add(item)
+                    self.items.append(item)
 
         if zone:
             self.zone = zone
@@ -100,6 +247,9 @@ class FirewallTransaction(object):
         self.enabled_msg = None
         self.disabled_msg = None
 
+        # Items that were (or in check mode would have been) changed by run()
+        self.changed_items = []
+
     #####################
     # exception handling
     #
@@ -109,6 +259,7 @@ class FirewallTransaction(object):
         logic and emit (hopefully) useful error messages
         """
 
+        start = time.time()
         try:
             return action_func(*action_func_args)
         except Exception as e:
@@ -124,18 +275,60 @@ class FirewallTransaction(object):
                 )
             else:
                 self.module.fail_json(msg='ERROR: Exception caught: %s' % e)
+        finally:
+            if self.module.params.get('perf'):
+                stats = self.perf_stats.setdefault(action_func.__name__, [0, 0.0])
+                stats[0] += 1
+                stats[1] += time.time() - start
+
+    @classmethod
+    def get_perf_result(cls, module):
+        """
+        Return the perf module result, i.e. the number of calls and time spent
+        per operation of all transactions, if requested by the perf option.
+        """
+        if not module.params.get('perf'):
+            return {}
+
+        operations = dict(
+            (name, {'count': count, 'time': round(seconds, 6)})
+            for name, (count, seconds) in cls.perf_stats.items()
+        )
+        return {'perf': {
+            'import_time': round(fw_import_time, 6),
+            'operations': operations,
+            'calls': sum(op['count'] for op in operations.values()),
+            'calls_time': round(sum(seconds for dummy, seconds in cls.perf_stats.values()), 6),
+            'total_time': round(time.time() - fw_import_start, 6),
+        }}
+
+    def get_fw_zone_settings(self, zone=None):
+        """
+        Return the zone object and permanent settings of zone (default: the
+        transaction zone). The result is cached for the rest of the module run,
+        so callers that modify the settings must write them back with
+        update_fw_settings().
+        """
+        zone = zone or self.zone
 
-    def get_fw_zone_settings(self):
-        if self.fw_offline:
-            fw_zone = self.fw.config.get_zone(self.zone)
-            fw_settings = FirewallClientZoneSettings(
-                list(self.fw.config.get_zone_config(fw_zone))
-            )
-        else:
-            fw_zone = self.fw.config().getZoneByName(self.zone)
-            fw_settings = fw_zone.getSettings()
+        if zone not in self.zone_settings_cache:
+            if self.fw_offline:
+                fw_zone = self.fw.config.get_zone(zone)
+                fw_settings = zone_settings_class(
+                    list(self.fw.config.get_zone_config(fw_zone))
+                )
+            else:
+                fw_zone = self.fw.config().getZoneByName(zone)
+                fw_settings = fw_zone.getSettings()
 
-        return (fw_zone, fw_settings)
+            self.zone_settings_cache[zone] = (fw_zone, fw_settings)
+
+        return self.zone_settings_cache[zone]
+
+    @staticmethod
+    def new_fw_zone_settings():
+        """Return empty permanent zone settings of the active backend."""
+        return zone_settings_class()
 
     def update_fw_settings(self, fw_zone, fw_settings):
         if self.fw_offline:
@@ -143,24 +336,237 @@ class FirewallTransaction(object):
         else:
             fw_zone.update(fw_settings)
 
-    def get_enabled_immediate(self):
+        # firewalld may replace the zone object on write (e.g. when a builtin
+        # zone is first customized offline), so drop it together with the settings
+        written_zones = []
+        for zone, (cached_zone, dummy) in list(self.zone_settings_cache.items()):
+            if cached_zone is fw_zone:
+                self.invalidate_fw_zone_settings(zone)
+                written_zones.append(zone)
+
+        if self.zone_binding_index is not None:
+            if written_zones:
+                for zone in written_zones:
+                    self.update_zone_binding_index(zone, fw_settings)
+            else:
+                FirewallTransaction.zone_binding_index = None
+
+    def get_zones_of_binding(self, kind, name):
+        """
+        Offline only: return the sorted names of the zones the interface or
+        source name is bound to.
+
+        :kind: str, either 'interfaces' or 'sources'
+        """
+        if self.zone_binding_index is None:
+            index = {'interfaces': {}, 'sources': {}}
+            for zone in self.fw.config.get_zones():
+                zone_obj = self.fw.config.get_zone(zone)
+                for binding_kind, bindings in index.items():
+                    for binding in getattr(zone_obj, binding_kind):
+                        bindings.setdefault(binding, set()).add(zone_obj.name)
+            FirewallTransaction.zone_binding_index = index
+
+        return sorted(self.zone_binding_index[kind].get(name, ()))
+
+    @classmethod
+    def update_zone_binding_index(cls, zone, fw_settings=None):
+        """
+        Replace the interfaces and sources of zone in the binding index with
+        the ones in fw_settings, or drop the zone if fw_settings is None.
+        """
+        if cls.zone_binding_index is None:
+            return
+
+        for kind, getter in (('interfaces', 'getInterfaces'), ('sources', 'getSources')):
+            bindings = cls.zone_binding_index[kind]
+            for zones in bindings.values():
+                zones.discard(zone)
+            if fw_settings is not None:
+                for binding in getattr(fw_settings, getter)():
+                    bindings.setdefault(binding, set()).add(zone)
+
+    @classmethod
+    def invalidate_fw_zone_settings(cls, zone=None):
+        """
+        Forget the cached zone object and settings of zone, or of all zones if
+        zone is None.
+        """
+        if zone is None:
+            cls.zone_settings_cache.clear()
+        else:
+            cls.zone_settings_cache.pop(zone, None)
+
+    def get_fw_runtime_settings(self):
+        return self.fw.getZoneSettings(self.zone)
+
+    def update_fw_runtime_settings(self, fw_settings):
+        self.fw.setZoneSettings(self.zone, fw_settings)
+
+    @staticmethod
+    def get_comparable_settings(fw_settings):
+        """
+        Return the zone settings in a form that compares equal for the
+        permanent and the runtime settings of a zone with the same content.
+        """
+        def comparable(value):
+            # D-Bus hands over arrays and structs for lists and tuples
+            if isinstance(value, (list, tuple)):
+                return tuple(comparable(item) for item in value)
+            return value
+
+        return [
+            frozenset(comparable(item) for item in value) if isinstance(value, list) else value
+            for value in fw_settings.settings
+        ]
+
+    def is_runtime_in_sync(self, fw_settings, runtime_settings):
+        """Return whether the runtime settings of the zone equal its permanent settings."""
+        return self.get_comparable_settings(fw_settings) == self.get_comparable_settings(runtime_settings)
+
+    @staticmethod
+    def has_fw_runtime_zone_settings():
+        """Runtime zone settings can only be pushed as a whole with firewalld >= 0.9.0."""
+        return hasattr(fw, 'setZoneSettings')
+
+    def can_update_fw_runtime_settings(self):
+        """
+        Return whether the runtime zone settings can be pushed as a whole,
+        which is not supported for timeouts.
+        """
+        return not self.module.params.get('timeout') and self.has_fw_runtime_zone_settings()
+
+    def get_enabled_settings(self, fw_settings, *args):
         raise NotImplementedError
 
-    def get_enabled_permanent(self):
+    def set_enabled_settings(self, fw_settings, *args):
         raise NotImplementedError
 
-    def set_enabled_immediate(self):
+    def set_disabled_settings(self, fw_settings, *args):
         raise NotImplementedError
 
-    def set_enabled_permanent(self):
+    def get_enabled_immediate(self):
         raise NotImplementedError
 
-    def set_disabled_immediate(self):
+    def get_enabled_permanent(self, *args):
+        fw_zone, fw_settings = self.get_fw_zone_settings()
+        return self.get_enabled_settings(fw_settings, *args)
+
+    def set_enabled_immediate(self):
         raise NotImplementedError
 
-    def set_disabled_permanent(self):
+    def set_enabled_permanent(self, *args):
+        fw_zone, fw_settings = self.get_fw_zone_settings()
+        self.set_enabled_settings(fw_settings, *args)
+        self.update_fw_settings(fw_zone, fw_settings)
+
+    def set_disabled_immediate(self):
         raise NotImplementedError
 
+    def set_disabled_permanent(self, *args):
+        fw_zone, fw_settings = self.get_fw_zone_settings()
+        self.set_disabled_settings(fw_settings, *args)
+        self.update_fw_settings(fw_zone, fw_settings)
+
+    def run_items(self):
+        """
+        run_items
+
+        Batched counterpart of run() used when the transaction was given a list
+        of items. The zone settings are fetched once per configuration
+        (permanent and/or runtime), every item is checked and changed in
+        memory, and the result is written back with a single update.
+
+        With permanent and immediate both set the permanent changes are written
+        first and the runtime configuration is then synced in one step:
+
+        - if the runtime settings of the zone equal its permanent settings, the
+          updated permanent settings are copied to the runtime configuration;
+        - else the runtime settings are updated in memory and written back, so
+          that the runtime-only settings of the zone are kept.
+
+        firewalld is never reloaded, which would discard the runtime-only
+        settings of every zone.
+        """
+
+        self.changed = False
+        self.changed_items = []
+
+        if self.desired_state in self.enabled_values:
+            enable = True
+            set_settings = self.set_enabled_settings
+            set_immediate = self.set_enabled_immediate
+        elif self.desired_state in self.disabled_values:
+            enable = False
+            set_settings = self.set_disabled_settings
+            set_immediate = self.set_disabled_immediate
+        else:
+            return (self.changed, self.msgs)
+
+        pending_permanent = []
+        pending_immediate = []
+
+        if self.permanent:
+            fw_zone, fw_settings = self.action_handler(self.get_fw_zone_settings, ())
+            pending_permanent = [
+                item for item in self.items
+                if self.action_handler(self.get_enabled_settings, (fw_settings,) + item) != enable
+            ]
+
+        copy_runtime = False
+        if self.immediate:
+            runtime_settings = self.action_handler(self.get_fw_runtime_settings, ())
+            if self.permanent and self.can_update_fw_runtime_settings() and \
+                    self.is_runtime_in_sync(fw_settings, runtime_settings):
+                # The runtime config of the zone mirrors the permanent one, so
+                # it only has to follow the permanent changes
+                copy_runtime = True
+                pending_immediate = list(pending_permanent)
+            else:
+                pending_immediate = [
+                    item for item in self.items
+                    if self.action_handler(self.get_enabled_settings, (runtime_settings,) + item) != enable
+                ]
+
+        if self.immediate and self.permanent:
+            self.msgs.append('Permanent and Non-Permanent(immediate) operation')
+        elif self.permanent:
+            self.msgs.append('Permanent operation')
+        elif self.immediate:
+            self.msgs.append('Non-permanent operation')
+
+        pending = set(pending_permanent) | set(pending_immediate)
+        self.changed_items = [item for item in self.items if item in pending]
+        if not self.changed_items:
+            return (self.changed, self.msgs)
+
+        if self.module.check_mode:
+            self.module.exit_json(changed=True, **self.get_perf_result(self.module))
+
+        if pending_permanent:
+            for item in pending_permanent:
+                self.action_handler(set_settings, (fw_settings,) + item)
+            self.action_handler(self.update_fw_settings, (fw_zone, fw_settings))
+
+        if pending_immediate:
+            if copy_runtime:
+                self.action_handler(self.update_fw_runtime_settings, (fw_settings,))
+            elif self.can_update_fw_runtime_settings():
+                for item in pending_immediate:
+                    self.action_handler(set_settings, (runtime_settings,) + item)
+                self.action_handler(self.update_fw_runtime_settings, (runtime_settings,))
+            else:
+                for item in pending_immediate:
+                    self.action_handler(set_immediate, item)
+
+        self.changed = True
+        if enable and self.enabled_msg:
+            self.msgs.append(self.enabled_msg)
+        elif not enable and self.disabled_msg:
+            self.msgs.append(self.disabled_msg)
+
+        return (self.changed, self.msgs)
+
     def run(self):
         """
         run
@@ -170,6 +576,9 @@ class FirewallTransaction(object):
         call different functions to carry that action out.
         """
 
+        if self.items is not None:
+            return self.run_items()
+
         self.changed = False
 
         if self.immediate and self.permanent:
@@ -186,7 +595,7 @@ class FirewallTransaction(object):
             if self.desired_state in self.enabled_values:
                 if not is_enabled_permanent or not is_enabled_immediate:
                     if self.module.check_mode:
-                        self.module.exit_json(changed=True)
+                        self.module.exit_json(changed=True, **self.get_perf_result(self.module))
                 if not is_enabled_permanent:
                     self.action_handler(
                         self.set_enabled_permanent,
@@ -205,7 +614,7 @@ class FirewallTransaction(object):
             elif self.desired_state in self.disabled_values:
                 if is_enabled_permanent or is_enabled_immediate:
                     if self.module.check_mode:
-                        self.module.exit_json(changed=True)
+                        self.module.exit_json(changed=True, **self.get_perf_result(self.module))
                 if is_enabled_permanent:
                     self.action_handler(
                         self.set_disabled_permanent,
@@ -231,7 +640,7 @@ class FirewallTransaction(object):
             if self.desired_state in self.enabled_values:
                 if not is_enabled:
                     if self.module.check_mode:
-                        self.module.exit_json(changed=True)
+                        self.module.exit_json(changed=True, **self.get_perf_result(self.module))
 
                     self.action_handler(
                         self.set_enabled_permanent,
@@ -244,7 +653,7 @@ class FirewallTransaction(object):
             elif self.desired_state in self.disabled_values:
                 if is_enabled:
                     if self.module.check_mode:
-                        self.module.exit_json(changed=True)
+                        self.module.exit_json(changed=True, **self.get_perf_result(self.module))
 
                     self.action_handler(
                         self.set_disabled_permanent,
@@ -264,7 +673,7 @@ class FirewallTransaction(object):
             if self.desired_state in self.enabled_values:
                 if not is_enabled:
                     if self.module.check_mode:
-                        self.module.exit_json(changed=True)
+                        self.module.exit_json(changed=True, **self.get_perf_result(self.module))
 
                     self.action_handler(
                         self.set_enabled_immediate,
@@ -277,7 +686,7 @@ class FirewallTransaction(object):
             elif self.desired_state in self.disabled_values:
                 if is_enabled:
                     if self.module.check_mode:
-                        self.module.exit_json(changed=True)
+                        self.module.exit_json(changed=True, **self.get_perf_result(self.module))
 
                     self.action_handler(
                         self.set_disabled_immediate,
@@ -289,6 +698,11 @@ class FirewallTransaction(object):
 
         return (self.changed, self.msgs)
 
+    @staticmethod
+    def get_fw_offline():
+        """Return whether the transactions work on the permanent configuration only."""
+        return fw_offline
+
     @staticmethod
     def sanity_check(module):
         """
@@ -297,6 +711,17 @@ class FirewallTransaction(object):
         :module:    AnsibleModule instance
         """
 
+        if module.params.get('offline_backend') == 'xml':
+            # Neither the firewall python bindings nor the daemon are needed,
+            # and a running daemon would not see the changed files or would
+            # overwrite them
+            if is_firewalld_running():
+                module.fail_json(msg='offline_backend=xml cannot be used while firewalld is running, use offline_backend=firewall')
+            use_xml_backend()
+            return
+
+        connect_fw()
+
         if FW_VERSION and fw_offline:
             # Pre-run version checking
             if LooseVersion(FW_VERSION) < LooseVersion("0.3.9"):
@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Daemon-free offline backend for the firewalld modules.
+
+It reads and writes the zone XML files of firewalld directly with the
+standard library, providing the subset of the firewalld offline API
+(``Firewall_test``) used by the transactions in module_utils/firewalld.py.
+The python firewall bindings are not required.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import copy
+import os
+import re
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+
+
+ETC_FIREWALLD = '/etc/firewalld'
+USR_LIB_FIREWALLD = '/usr/lib/firewalld'
+FALLBACK_ZONE = 'public'
+
+MAC_RE = re.compile(r'^([0-9a-f]{2}:){5}[0-9a-f]{2}$', re.IGNORECASE)
+
+
+class FirewallXmlError(Exception):
+    pass
+
+
+def is_firewalld_running(proc='/proc'):
+    """
+    Return whether a firewalld daemon is running, from the processes in proc,
+    as neither the firewall python bindings nor firewall-cmd may be
+    installed. firewalld is run by the python interpreter and, under
+    systemd, without a PID file. The command name of a script started by
+    its shebang line is the name of the script, otherwise the script is
+    found in the command line after the options of the interpreter.
+    """
+    try:
+        pids = [name for name in os.listdir(proc) if name.isdigit()]
+    except OSError:
+        return False
+
+    for pid in pids:
+        try:
+            with open(os.path.join(proc, pid, 'comm'), 'rb') as f:
+                if f.read().strip() == b'firewalld':
+                    return True
+            with open(os.path.join(proc, pid, 'cmdline'), 'rb') as f:
+                args = [arg for arg in f.read().split(b'\0') if arg]
+        except (IOError, OSError):
+            # The process is gone
+            continue
+        # e.g. python3.6 or platform-python
+        if args and b'python' in os.path.basename(args[0]):
+            args = [arg for arg in args[1:] if not arg.startswith(b'-')]
+        if args and os.path.basename(args[0]) == b'firewalld':
+            return True
+    return False
+
+
+class ZoneSettings(object):
+    """
+    Zone settings with the list layout and the methods of
+    firewall.client.FirewallClientZoneSettings that the transactions use.
+    """
+
+    def __init__(self, settings=None):
+        if settings:
+            self.settings = settings
+        else:
+            self.settings = ["", "", "", False, "default", [], [], [], False, [], [], [], [], [], [], False, False]
+
+    def _add(self, index, item):
+        if item in self.settings[index]:
+            raise FirewallXmlError("ALREADY_ENABLED: %s" % (item,))
+        self.settings[index].append(item)
+
+    def _remove(self, index, item):
+        if item not in self.settings[index]:
+            raise FirewallXmlError("NOT_ENABLED: %s" % (item,))
+        self.settings[index].remove(item)
+
+    def getShort(self):
+        return self.settings[1]
+
+    def getDescription(self):
+        return self.settings[2]
+
+    def getTarget(self):
+        return self.settings[4]
+
+    def setTarget(self, target):
+        self.settings[4] = target
+
+    def getServices(self):
+        return self.settings[5]
+
+    def addService(self, service):
+        self._add(5, service)
+
+    def removeService(self, service):
+        self._remove(5, service)
+
+    def getPorts(self):
+        return self.settings[6]
+
+    def queryPort(self, port, protocol):
+        return (port, protocol) in self.settings[6]
+
+    def addPort(self, port, protocol):
+        self._add(6, (port, protocol))
+
+    def removePort(self, port, protocol):
+        self._remove(6, (port, protocol))
+
+    def getIcmpBlocks(self):
+        return self.settings[7]
+
+    def addIcmpBlock(self, icmptype):
+        self._add(7, icmptype)
+
+    def removeIcmpBlock(self, icmptype):
+        self._remove(7, icmptype)
+
+    def getMasquerade(self):
+        return self.settings[8]
+
+    def setMasquerade(self, masquerade):
+        self.settings[8] = masquerade
+
+    def getForwardPorts(self):
+        return self.settings[9]
+
+    def queryForwardPort(self, port, protocol, to_port, to_addr):
+        return (port, protocol, str(to_port or ''), str(to_addr or '')) in self.settings[9]
+
+    def addForwardPort(self, port, protocol, to_port, to_addr):
+        self._add(9, (port, protocol, str(to_port or ''), str(to_addr or '')))
+
+    def removeForwardPort(self, port, protocol, to_port, to_addr):
+        self._remove(9, (port, protocol, str(to_port or ''), str(to_addr or '')))
+
+    def getInterfaces(self):
+        return self.settings[10]
+
+    def addInterface(self, interface):
+        self._add(10, interface)
+
+    def removeInterface(self, interface):
+        self._remove(10, interface)
+
+    def getSources(self):
+        return self.settings[11]
+
+    def addSource(self, source):
+        self._add(11, source)
+
+    def removeSource(self, source):
+        self._remove(11, source)
+
+    def getRichRules(self):
+        return self.settings[12]
+
+    def addRichRule(self, rule):
+        self._add(12, rule)
+
+    def removeRichRule(self, rule):
+        self._remove(12, rule)
+
+    def getProtocols(self):
+        return self.settings[13]
+
+    def addProtocol(self, protocol):
+        self._add(13, protocol)
+
+    def removeProtocol(self, protocol):
+        self._remove(13, protocol)
+
+    def getSourcePorts(self):
+        return self.settings[14]
+
+    def getIcmpBlockInversion(self):
+        return self.settings[15]
+
+    def setIcmpBlockInversion(self, flag):
+        self.settings[15] = flag
+
+    def getForward(self):
+        return self.settings[16]
+
+    def queryForward(self):
+        return self.settings[16]
+
+    def setForward(self, forward):
+        self.settings[16] = forward
+
+
+class XmlZone(object):
+    """
+    A zone loaded from its XML file.
+
+    ``interfaces`` and ``sources`` mirror the attributes of the zone objects
+    of the firewalld offline API.
+    """
+
+    def __init__(self, name, path, builtin, root):
+        self.name = name
+        self.path = path
+        self.builtin = builtin
+        self.root = root
+        self.settings = zone_settings_from_xml(root)
+
+    @property
+    def interfaces(self):
+        return self.settings[10]
+
+    @property
+    def sources(self):
+        return self.settings[11]
+
+
+def zone_settings_from_xml(root):
+    """Return the settings list of a <zone> element."""
+
+    settings = ZoneSettings().settings
+    settings[0] = root.get('version', '')
+    settings[4] = root.get('target', 'default')
+
+    for child in root:
+        if child.tag == 'short':
+            settings[1] = child.text or ''
+        elif child.tag == 'description':
+            settings[2] = child.text or ''
+        elif child.tag == 'service':
+            settings[5].append(child.get('name'))
+        elif child.tag == 'port':
+            settings[6].append((child.get('port'), child.get('protocol')))
+        elif child.tag == 'icmp-block':
+            settings[7].append(child.get('name'))
+        elif child.tag == 'masquerade':
+            settings[8] = True
+        elif child.tag == 'forward-port':
+            settings[9].append((child.get('port'), child.get('protocol'),
+                                child.get('to-port', ''), child.get('to-addr', '')))
+        elif child.tag == 'interface':
+            settings[10].append(child.get('name'))
+        elif child.tag == 'source':
+            if child.get('ipset'):
+                settings[11].append('ipset:%s' % child.get('ipset'))
+            else:
+                settings[11].append(child.get('address') or child.get('mac'))
+        elif child.tag == 'protocol':
+            settings[13].append(child.get('value'))
+        elif child.tag == 'source-port':
+            settings[14].append((child.get('port'), child.get('protocol')))
+        elif child.tag == 'icmp-block-inversion':
+            settings[15] = True
+        elif child.tag == 'forward':
+            settings[16] = True
+        # Rich rules and unknown elements are kept as they are in the XML tree
+
+    return settings
+
+
+# Elements of a <zone> that are rebuilt from the settings, everything else
+# (rich rules in particular) is written back untouched.
+MANAGED_TAGS = frozenset((
+    'short', 'description', 'service', 'port', 'icmp-block', 'masquerade', 'forward-port',
+    'interface', 'source', 'protocol', 'source-port', 'icmp-block-inversion', 'forward',
+))
+
+
+def zone_settings_to_xml(settings, original=None):
+    """Return a <zone> element for settings, preserving unmanaged parts of original."""
+
+    if settings[12]:
+        raise FirewallXmlError('rich rules are not supported by the xml offline backend')
+
+    attrib = dict(original.attrib) if original is not None else {}
+    attrib.pop('target', None)
+    attrib.pop('version', None)
+    if settings[0]:
+        attrib['version'] = settings[0]
+    if settings[4] and settings[4] != 'default':
+        attrib['target'] = settings[4]
+    root = ET.Element('zone', attrib)
+
+    if settings[1]:
+        ET.SubElement(root, 'short').text = settings[1]
+    if settings[2]:
+        ET.SubElement(root, 'description').text = settings[2]
+    for interface in settings[10]:
+        ET.SubElement(root, 'interface', {'name': interface})
+    for source in settings[11]:
+        if source.startswith('ipset:'):
+            ET.SubElement(root, 'source', {'ipset': source[len('ipset:'):]})
+        elif MAC_RE.match(source):
+            ET.SubElement(root, 'source', {'mac': source})
+        else:
+            ET.SubElement(root, 'source', {'address': source})
+    for service in settings[5]:
+        ET.SubElement(root, 'service', {'name': service})
+    for port, protocol in settings[6]:
+        ET.SubElement(root, 'port', {'port': port, 'protocol': protocol})
+    for protocol in settings[13]:
+        ET.SubElement(root, 'protocol', {'value': protocol})
+    for icmp_block in settings[7]:
+        ET.SubElement(root, 'icmp-block', {'name': icmp_block})
+    if settings[15]:
+        ET.SubElement(root, 'icmp-block-inversion')
+    if settings[16]:
+        ET.SubElement(root, 'forward')
+    if settings[8]:
+        ET.SubElement(root, 'masquerade')
+    for port, protocol, to_port, to_addr in settings[9]:
+        attrib = {'port': port, 'protocol': protocol}
+        if to_port:
+            attrib['to-port'] = to_port
+        if to_addr:
+            attrib['to-addr'] = to_addr
+        ET.SubElement(root, 'forward-port', attrib)
+    for port, protocol in settings[14]:
+        ET.SubElement(root, 'source-port', {'port': port, 'protocol': protocol})
+
+    if original is not None:
+        for child in original:
+            if child.tag not in MANAGED_TAGS:
+                root.append(copy.deepcopy(child))
+
+    return root
+
+
+def _indent(elem, level=0):
+    # ElementTree.indent() is only available with Python >= 3.9
+    i = "\n" + level * "  "
+    if len(elem):
+        if not elem.text or not elem.text.strip():
+            elem.text = i + "  "
+        for child in elem:
+            _indent(child, level + 1)
+        if not child.tail or not child.tail.strip():
+            child.tail = i
+    if level and (not elem.tail or not elem.tail.strip()):
+        elem.tail = i
+
+
+class FirewallXmlConfig(object):
+    """
+    Permanent configuration of the zones, with the method names of the
+    firewalld offline API (``Firewall_test.config``).
+    """
+
+    def __init__(self, etc_dir=ETC_FIREWALLD, usr_dir=USR_LIB_FIREWALLD):
+        self.etc_zones = os.path.join(etc_dir, 'zones')
+        self.usr_zones = os.path.join(usr_dir, 'zones')
+        self._zones = {}
+
+    @staticmethod
+    def _zone_names(path):
+        try:
+            files = os.listdir(path)
+        except OSError:
+            return set()
+        return set(name[:-len('.xml')] for name in files if name.endswith('.xml'))
+
+    def get_zones(self):
+        return sorted(self._zone_names(self.etc_zones) | self._zone_names(self.usr_zones))
+
+    def get_zone(self, name):
+        if name not in self._zones:
+            etc_path = os.path.join(self.etc_zones, '%s.xml' % name)
+            usr_path = os.path.join(self.usr_zones, '%s.xml' % name)
+            if os.path.exists(etc_path):
+                path, builtin = etc_path, False
+            elif os.path.exists(usr_path):
+                path, builtin = usr_path, True
+            else:
+                raise FirewallXmlError('INVALID_ZONE: %s' % name)
+
+            try:
+                root = ET.parse(path).getroot()
+            except (ET.ParseError, IOError, OSError) as e:
+                raise FirewallXmlError('Failed to parse %s: %s' % (path, e))
+            self._zones[name] = XmlZone(name, path, builtin, root)
+
+        return self._zones[name]
+
+    def get_zone_config(self, zone):
+        # Hand out a copy, changes only take effect with set_zone_config()
+        return copy.deepcopy(zone.settings)
+
+    def set_zone_config(self, zone, settings):
+        settings = list(settings)
+        root = zone_settings_to_xml(settings, zone.root)
+        path = os.path.join(self.etc_zones, '%s.xml' % zone.name)
+        self._write(path, root)
+
+        zone.path = path
+        zone.builtin = False
+        zone.root = root
+        zone.settings = zone_settings_from_xml(root)
+        return zone
+
+    def new_zone(self, name, settings):
+        if name in self.get_zones():
+            raise FirewallXmlError('NAME_CONFLICT: %s' % name)
+
+        path = os.path.join(self.etc_zones, '%s.xml' % name)
+        root = zone_settings_to_xml(list(settings))
+        self._write(path, root)
+        self._zones[name] = XmlZone(name, path, False, root)
+        return self._zones[name]
+
+    def remove_zone(self, zone):
+        if os.path.exists(os.path.join(self.usr_zones, '%s.xml' % zone.name)):
+            raise FirewallXmlError('BUILTIN_ZONE: %s' % zone.name)
+
+        os.remove(zone.path)
+        self._zones.pop(zone.name, None)
+
+    @staticmethod
+    def _write(path, root):
+        dirname = os.path.dirname(path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname, 0o750)
+
+        _indent(root)
+        fd, tmp_path = tempfile.mkstemp(prefix='.%s.' % os.path.basename(path), dir=dirname)
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                ET.ElementTree(root).write(tmp_file, encoding='utf-8', xml_declaration=True)
+                tmp_file.write(b'\n')
+            os.chmod(tmp_path, 0o640)
+            # Keep a backup like firewalld does
+            if os.path.exists(path):
+                shutil.copy2(path, '%s.old' % path)
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise FirewallXmlError('Failed to write %s: %s' % (path, e))
+
+
+class FirewallXml(object):
+    """
+    Drop-in for the offline ``Firewall_test`` object working on the XML
+    configuration files only.
+    """
+
+    def __init__(self, etc_dir=ETC_FIREWALLD, usr_dir=USR_LIB_FIREWALLD):
+        self.etc_dir = etc_dir
+        self.usr_dir = usr_dir
+        self.config = FirewallXmlConfig(etc_dir, usr_dir)
+
+    def get_default_zone(self):
+        for conf in (os.path.join(self.etc_dir, 'firewalld.conf'), os.path.join(self.usr_dir, 'firewalld.conf')):
+            try:
+                with open(conf) as conf_file:
+                    for line in conf_file:
+                        line = line.strip()
+                        if line.startswith('DefaultZone='):
+                            return line.split('=', 1)[1].strip() or FALLBACK_ZONE
+            except (IOError, OSError):
+                continue
+        return FALLBACK_ZONE
@@ -52,7 +52,29 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import errno
 import os
+import platform
+import select
+import stat
+import sys
+import threading
+import time
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    # TODO(Python2): remove the fallback once Python 2 targets are dropped
+    from collections import Mapping
+
+try:
+    import ctypes
+    HAS_CTYPES = True
+except ImportError:
+    HAS_CTYPES = False
+
+# TODO(Python2): time.monotonic() is new in Python 3.3
+_monotonic = getattr(time, 'monotonic', time.time)
 
 
 def ismount(path):
@@ -92,3 +114,443 @@ def ismount(path):
     if ino1 == ino2:
         return True     # path/.. is the same i-node as path
     return False
+
+
+# The code below is not based on Lib/posixpath.py.
+
+
+# statx(2), see linux/fcntl.h and linux/stat.h
+AT_FDCWD = -100
+AT_SYMLINK_NOFOLLOW = 0x100
+AT_STATX_DONT_SYNC = 0x4000
+STATX_TYPE = 0x1
+STATX_ATTR_MOUNT_ROOT = 0x2000
+
+if HAS_CTYPES:
+    class _Statx(ctypes.Structure):
+        """The leading fields of struct statx, padded to its size."""
+        _fields_ = [
+            ('stx_mask', ctypes.c_uint32),
+            ('stx_blksize', ctypes.c_uint32),
+            ('stx_attributes', ctypes.c_uint64),
+            ('stx_nlink', ctypes.c_uint32),
+            ('stx_uid', ctypes.c_uint32),
+            ('stx_gid', ctypes.c_uint32),
+            ('stx_mode', ctypes.c_uint16),
+            ('spare0', ctypes.c_uint16),
+            ('stx_ino', ctypes.c_uint64),
+            ('stx_size', ctypes.c_uint64),
+            ('stx_blocks', ctypes.c_uint64),
+            ('stx_attributes_mask', ctypes.c_uint64),
+            ('spare', ctypes.c_uint8 * 192),
+        ]
+
+_statx = None
+
+
+def _get_statx():
+    """Return the statx() function of the C library, False if there is none."""
+    global _statx
+    if _statx is None:
+        _statx = False
+        if HAS_CTYPES and platform.system() == 'Linux':
+            try:
+                func = ctypes.CDLL(None, use_errno=True).statx
+            except (AttributeError, OSError):
+                pass
+            else:
+                func.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.POINTER(_Statx)]
+                func.restype = ctypes.c_int
+                _statx = func
+    return _statx
+
+
+def statx_ismount(path):
+    """
+    Test whether path is a mount point with the mount root attribute of
+    statx(2), with a single call which doesn't revalidate network
+    filesystems. Return None if the attribute isn't available, i.e. on other
+    platforms than Linux 5.8 and later, or if path can't be looked up for
+    another reason than not existing.
+    """
+    func = _get_statx()
+    if not func:
+        return None
+
+    buf = _Statx()
+    if not isinstance(path, bytes):
+        # TODO(Python2): use os.fsencode() only
+        path = os.fsencode(path) if hasattr(os, 'fsencode') else path.encode(sys.getfilesystemencoding())
+    try:
+        rc = func(AT_FDCWD, path, AT_SYMLINK_NOFOLLOW | AT_STATX_DONT_SYNC, STATX_TYPE, ctypes.byref(buf))
+    except (ValueError, ctypes.ArgumentError):
+        return None
+    if rc != 0:
+        # It doesn't exist -- so not a mount point
+        if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+            return False
+        return None
+    if not buf.stx_attributes_mask & STATX_ATTR_MOUNT_ROOT:
+        return None
+    # A symlink can never be a mount point
+    if buf.stx_mask & STATX_TYPE and stat.S_ISLNK(buf.stx_mode):
+        return False
+    return bool(buf.stx_attributes & STATX_ATTR_MOUNT_ROOT)
+
+
+class MountPoints(object):
+    """
+    Whether paths are mount points, cached per path for a run of a module,
+    see ismount(). statx_ismount() is used if it can tell, ismount()
+    otherwise. Can be used by several threads. A mount or unmount has to
+    invalidate() the cached results it changes.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def ismount(self, path):
+        with self._lock:
+            if path in self._cache:
+                return self._cache[path]
+
+        result = statx_ismount(path)
+        if result is None:
+            result = ismount(path)
+
+        with self._lock:
+            self._cache[path] = result
+        return result
+
+    def invalidate(self, path):
+        """Forget the results of path and of the paths below it."""
+        prefix = os.path.join(path, b'' if isinstance(path, bytes) else '')
+        with self._lock:
+            for cached in list(self._cache):
+                if cached == path or cached.startswith(prefix):
+                    del self._cache[cached]
+
+
+class FstabEntry(object):
+    """A mount entry of an fstab file, with the fields as written in the file."""
+
+    __slots__ = ('src', 'name', 'fstype', 'opts', 'dump', 'passno', 'boot', 'line')
+
+    def __init__(self, line=None, **fields):
+        self.line = line
+        for key in self.__slots__[:-1]:
+            setattr(self, key, fields.get(key))
+
+    def to_dict(self):
+        return dict((key, getattr(self, key)) for key in self.__slots__[:-1])
+
+
+class Fstab(object):
+    """
+    An fstab file (vfstab on Solaris) parsed once, with its mount entries
+    indexed by mount point.
+
+    Lines that are not mount entries, i.e. blank lines, comments and lines
+    without the number of fields of the platform, are kept as they are. Only
+    the entries changed by set() are formatted again, every other line is
+    written back as it was read. changed tells whether there is anything to
+    write at all.
+
+    Mount points and field values are compared as they are written in the
+    file, so they have to be escaped by the caller.
+    """
+
+    def __init__(self, path, system=None, lines=None):
+        """
+        :path:   str, the fstab file
+        :system: str, the platform.system() the file is for (default: this one)
+        :lines:  str[], content to parse instead of reading path
+        """
+        self.path = path
+        self.system = system or platform.system()
+
+        if self.system == 'SunOS':
+            self.labels = ('src', None, 'name', 'fstype', 'passno', 'boot', 'opts')
+            self.compared = ('src', 'fstype', 'passno', 'boot', 'opts')
+            self.line_format = '%(src)s - %(name)s %(fstype)s %(passno)s %(boot)s %(opts)s\n'
+        else:
+            self.labels = ('src', 'name', 'fstype', 'opts', 'dump', 'passno')
+            self.compared = ('src', 'fstype', 'opts', 'dump', 'passno')
+            self.line_format = '%(src)s %(name)s %(fstype)s %(opts)s %(dump)s %(passno)s\n'
+
+        # Lines as read, and lines and entries as they will be written
+        self.original_lines = []
+        self.lines = []
+        self.index = {}
+        self.changed = False
+
+        if lines is None:
+            with open(path, 'r') as f:
+                lines = f.readlines()
+        for line in lines:
+            # Append newline if the line in fstab does not finished with newline.
+            if not line.endswith('\n'):
+                line += '\n'
+            self.original_lines.append(line)
+            self.lines.append(self._parse(line))
+
+    def _parse(self, line):
+        """Return the FstabEntry of line, or line if it isn't a mount entry."""
+        fields = line.split('#')[0].split()
+
+        # On Linux the 5th and the 6th field is optional
+        if self.system == 'Linux':
+            valid = 4 <= len(fields) <= 6
+        else:
+            valid = len(fields) == len(self.labels)
+        if not valid:
+            return line
+
+        entry = FstabEntry(line)
+        if self.system == 'Linux':
+            entry.dump = entry.passno = '0'
+        for key, value in zip(self.labels, fields):
+            if key:
+                setattr(entry, key, value)
+        self.index.setdefault(entry.name, []).append(entry)
+        return entry
+
+    def find(self, name, src=None):
+        """
+        Return the entries of the mount point name. For swap entries, which
+        all have the mount point 'none', src has to match as well if given.
+        """
+        return [
+            entry for entry in self.index.get(name, ())
+            if src is None or name != 'none' or entry.fstype != 'swap' or entry.src == src
+        ]
+
+    def set(self, fields):
+        """
+        Update the entries of the mount point fields['name'] with fields, or
+        add an entry if there is none. Return whether anything changed.
+        """
+        entries = self.find(fields['name'], fields.get('src'))
+        changed = False
+
+        for entry in entries:
+            differs = False
+            for key in self.compared:
+                if getattr(entry, key) != fields[key]:
+                    setattr(entry, key, fields[key])
+                    differs = True
+            if differs:
+                entry.line = self.line_format % entry.to_dict()
+                changed = True
+
+        if not entries:
+            entry = FstabEntry(**fields)
+            entry.line = self.line_format % entry.to_dict()
+            self.lines.append(entry)
+            self.index.setdefault(entry.name, []).append(entry)
+            changed = True
+
+        self.changed = self.changed or changed
+        return changed
+
+    def remove(self, name, src=None):
+        """Remove the entries of the mount point name, see find(). Return whether there were any."""
+        entries = self.find(name, src)
+        if not entries:
+            return False
+
+        for entry in entries:
+            entry.line = None
+            self.index[name].remove(entry)
+        self.changed = True
+        return True
+
+    def to_lines(self):
+        """Return the lines of the file as they have to be written."""
+        return [
+            item.line if isinstance(item, FstabEntry) else item
+            for item in self.lines
+            if not isinstance(item, FstabEntry) or item.line is not None
+        ]
+
+
+class LinuxMount(object):
+    """
+    A mount of /proc/self/mountinfo, see LinuxMounts.
+
+    src is the mounted source, which is the bound directory for bind mounts,
+    and is only worked out from the parent mounts when it is needed. opts are
+    the options of the mount, super_opts those of the filesystem.
+    Records can be read like the dicts get_linux_mounts() used to return.
+    """
+
+    __slots__ = ('id', 'parent_id', 'device', 'root', 'dst', 'opts', 'fs', 'source', 'super_opts', 'index', 'mounts', '_root')
+
+    FIELDS = ('dst', 'src', 'opts', 'fs', 'device', 'source', 'super_opts')
+
+    def __init__(self, mounts, index, fields):
+        self.mounts = mounts
+        self.index = index
+        self.id = int(fields[0])
+        self.parent_id = int(fields[1])
+        self.device = fields[2]
+        self.root = fields[3]
+        self.dst = fields[4]
+        self.opts = fields[5]
+        self.fs = fields[-3]
+        self.source = fields[-2]
+        self.super_opts = fields[-1]
+        self._root = None
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def to_dict(self):
+        return dict((key, getattr(self, key)) for key in self.FIELDS)
+
+    @property
+    def parent(self):
+        """The parent mount, if it is relevant for src."""
+        if self.parent_id == 1:
+            return None
+        return self.mounts.by_id.get(self.parent_id)
+
+    @property
+    def src(self):
+        if self.parent is None:
+            return self.source
+        return self.resolved_root()
+
+    def resolved_root(self):
+        """
+        Return root relative to the parent mount: the parent's root is
+        omitted and the parent's mount point prepended.
+
+        == Example:
+        140 136 253:2 /rootfs / rw - ext4 /dev/sdb2 rw
+        141 140 253:2 /rootfs/tmp/aaa /tmp/bbb rw - ext4 /dev/sdb2 rw
+        == Expected result:
+        src=/tmp/aaa
+
+        == Example:
+        42 60 0:35 / /tmp rw - tmpfs tmpfs rw
+        78 42 0:35 /aaa /tmp/bbb rw - tmpfs tmpfs rw
+        == Expected result:
+        src=/tmp/aaa
+
+        The root of a parent listed before its child is resolved as well,
+        the result is memoized.
+        """
+        # Walk up to the first mount already resolved, or not to resolve
+        chain = []
+        mnt = self
+        while mnt._root is None:
+            chain.append(mnt)
+            parent = mnt.parent
+            if parent is None or parent.index > mnt.index:
+                break
+            mnt = parent
+
+        for mnt in reversed(chain):
+            parent = mnt.parent
+            if parent is None:
+                mnt._root = mnt.root
+                continue
+            parent_root = parent._root if parent.index < mnt.index else parent.root
+            root = mnt.root
+            if len(parent_root) > 1 and root.startswith("%s/" % parent_root):
+                root = root[len(parent_root):]
+            if parent.dst != '/':
+                root = "%s%s" % (parent.dst, root)
+            mnt._root = root
+        return self._root
+
+
+class LinuxMounts(Mapping):
+    """
+    The mounts of a mountinfo file (see proc(5)) by mount point, read in one
+    pass into LinuxMount records. A mount point mounted over is represented
+    by the last mount on it.
+    """
+
+    def __init__(self, lines=()):
+        self.by_id = {}
+        self.by_dst = {}
+        for index, line in enumerate(lines):
+            fields = line.split()
+            if not fields:
+                continue
+            mnt = LinuxMount(self, index, fields)
+            self.by_id[mnt.id] = mnt
+            self.by_dst[mnt.dst] = mnt
+
+    @classmethod
+    def from_file(cls, path='/proc/self/mountinfo'):
+        with open(path) as f:
+            return cls(f)
+
+    def __getitem__(self, dst):
+        return self.by_dst[dst]
+
+    def __contains__(self, dst):
+        return dst in self.by_dst
+
+    def __iter__(self):
+        return iter(self.by_dst)
+
+    def __len__(self):
+        return len(self.by_dst)
+
+
+def escape_mountinfo(path):
+    """Escape path like the mount points of mountinfo are, see proc(5)."""
+    for char in '\\ \t\n':
+        path = path.replace(char, '\\%03o' % ord(char))
+    return path
+
+
+def wait_for_mount(path, timeout, mntinfo_file='/proc/self/mountinfo'):
+    """
+    Wait at most timeout seconds until path is a mount point, e.g. mounted
+    asynchronously by an automounter. Return whether it is.
+
+    The kernel raises POLLPRI on mntinfo_file when the mount table changes,
+    so it is read again only then. Where it can't be polled, ismount() is
+    tried every 0.1 seconds instead.
+    """
+    deadline = _monotonic() + timeout
+    try:
+        f = open(mntinfo_file)
+    except (IOError, OSError):
+        f = None
+
+    if f is None or not hasattr(select, 'poll'):
+        if f is not None:
+            f.close()
+        while not ismount(path):
+            remaining = deadline - _monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, 0.1))
+        return True
+
+    dst = escape_mountinfo(path)
+    with f:
+        poller = select.poll()
+        poller.register(f, select.POLLPRI)
+        while True:
+            f.seek(0)
+            for line in f:
+                fields = line.split()
+                if len(fields) > 4 and fields[4] == dst:
+                    return True
+            remaining = deadline - _monotonic()
+            if remaining <= 0:
+                return False
+            poller.poll(remaining * 1000)
@@ -16,21 +16,27 @@ description:
 options:
   service:
     description:
-      - Name of a service to add/remove to/from firewalld.
+      - Name of a service, or a list of services, to add/remove to/from firewalld.
       - The service must be listed in output of C(firewall-cmd --get-services).
-    type: str
+      - All services in the list are applied with a single update of the zone settings.
+    type: list
+    elements: str
   protocol:
     description:
-      - Name of a protocol to add/remove to/from firewalld.
-    type: str
+      - Name of a protocol, or a list of protocols, to add/remove to/from firewalld.
+    type: list
+    elements: str
   port:
     description:
-      - Name of a port or port range to add/remove to/from firewalld.
+      - Name of a port or port range, or a list of them, to add/remove to/from firewalld.
       - Must be in the form PORT/PROTOCOL or PORT-PORT/PROTOCOL for port ranges.
-    type: str
+      - All ports in the list are applied with a single update of the zone settings.
+    type: list
+    elements: str
   port_forward:
     description:
       - Port and protocol to forward using firewalld.
+      - All port forwards in the list are applied with a single update of the zone settings.
     type: list
     elements: dict
     suboptions:
@@ -56,21 +62,28 @@ options:
           - Optional address to forward to.
   rich_rule:
     description:
-      - Rich rule to add/remove to/from firewalld.
+      - Rich rule, or a list of rich rules, to add/remove to/from firewalld.
       - See L(Syntax for firewalld rich language rules,https://firewalld.org/documentation/man-pages/firewalld.richlanguage.html).
-    type: str
+      - A string is always a single rule, even if it contains commas. Only a list gives several rules, which are
+        applied with a single update of the zone settings.
+      - Rules are compared with the rules of the zone in a canonical form, differences in whitespace, quoting
+        and the order of attributes or elements do not count as changes.
+    type: raw
   source:
     description:
-      - The source/network you would like to add/remove to/from firewalld.
-    type: str
+      - The source/network, or a list of them, you would like to add/remove to/from firewalld.
+    type: list
+    elements: str
   interface:
     description:
-      - The interface you would like to add/remove to/from a zone in firewalld.
-    type: str
+      - The interface, or a list of interfaces, you would like to add/remove to/from a zone in firewalld.
+    type: list
+    elements: str
   icmp_block:
     description:
-      - The ICMP block you would like to add/remove to/from a zone in firewalld.
-    type: str
+      - The ICMP block, or a list of ICMP blocks, you would like to add/remove to/from a zone in firewalld.
+    type: list
+    elements: str
   icmp_block_inversion:
     description:
       - Enable/Disable inversion of ICMP blocks for a zone in firewalld.
@@ -125,6 +138,26 @@ options:
       - Ignores O(immediate) if O(permanent=true) and firewalld is not running.
     type: bool
     default: false
+  perf:
+    description:
+      - Record the number of calls and the time spent for every firewalld operation and return them as RV(perf).
+    type: bool
+    default: false
+    version_added: 3.0.0
+  offline_backend:
+    description:
+      - How the permanent configuration is changed when firewalld is not running.
+      - V(firewall) uses the offline API of the firewall python bindings.
+      - V(xml) reads and writes the zone XML files in C(/etc/firewalld/zones) directly, falling back
+        to the builtin zones in C(/usr/lib/firewalld/zones). It neither needs the firewall python
+        bindings nor starts the offline firewall, which makes it much faster, e.g. for image builds.
+      - V(xml) only supports permanent operations and fails if firewalld is running.
+      - V(xml) does not support O(rich_rule) and O(zone_settings.rich_rules), the rich rules of a zone
+        are left untouched.
+    type: str
+    choices: [ firewall, xml ]
+    default: firewall
+    version_added: 3.0.0
   target:
     description:
       - firewalld Zone target.
@@ -132,6 +165,109 @@ options:
     choices: [ default, ACCEPT, DROP, "%%REJECT%%" ]
     type: str
     version_added: 1.2.0
+  zone_settings:
+    description:
+      - The desired settings of O(zone) as a whole.
+      - The current zone settings are fetched once, compared with this declaration and only
+        the differences are applied with a single update of the zone settings.
+      - Settings that are not given are left untouched unless O(purge=true).
+      - Can only be used with O(state=present) on an existing zone.
+      - Using it with O(immediate=true) requires firewalld >= 0.9.0.
+      - Cannot be used with O(timeout).
+    type: dict
+    version_added: 3.0.0
+    suboptions:
+      services:
+        description:
+          - Services that should be enabled in the zone.
+        type: list
+        elements: str
+      ports:
+        description:
+          - Ports or port ranges that should be enabled in the zone, in the form PORT/PROTOCOL or PORT-PORT/PROTOCOL.
+        type: list
+        elements: str
+      protocols:
+        description:
+          - Protocols that should be enabled in the zone.
+        type: list
+        elements: str
+      sources:
+        description:
+          - Sources/networks that should be bound to the zone.
+        type: list
+        elements: str
+      interfaces:
+        description:
+          - Interfaces that should be bound to the zone.
+          - The interfaces must not be bound to another zone.
+        type: list
+        elements: str
+      icmp_blocks:
+        description:
+          - ICMP blocks that should be enabled in the zone.
+        type: list
+        elements: str
+      rich_rules:
+        description:
+          - Rich rules that should be enabled in the zone.
+        type: list
+        elements: str
+      forward_ports:
+        description:
+          - Port forwards that should be enabled in the zone.
+        type: list
+        elements: dict
+        suboptions:
+          port:
+            type: str
+            required: true
+            description:
+              - Source port to forward from.
+          proto:
+            type: str
+            required: true
+            description:
+              - protocol to forward.
+            choices: [udp, tcp]
+          toport:
+            type: str
+            required: true
+            description:
+              - destination port.
+          toaddr:
+            type: str
+            default: ''
+            description:
+              - Optional address to forward to.
+      target:
+        description:
+          - The zone target.
+          - Only applied to the permanent configuration.
+        type: str
+        choices: [ default, ACCEPT, DROP, "%%REJECT%%" ]
+      masquerade:
+        description:
+          - Whether masquerading is enabled in the zone.
+        type: bool
+      forward:
+        description:
+          - Whether intra-zone forwarding is enabled in the zone.
+        type: bool
+      icmp_block_inversion:
+        description:
+          - Whether ICMP block inversion is enabled in the zone.
+        type: bool
+  purge:
+    description:
+      - Only used with O(zone_settings).
+      - If V(true), remove every service, port, protocol, source, interface, ICMP block, rich rule
+        and port forward of the zone that is not declared in O(zone_settings).
+      - A list setting that is not given in O(zone_settings) is treated as an empty list,
+        so everything of that kind is removed from the zone.
+    type: bool
+    default: false
+    version_added: 3.0.0
 notes:
   - Not tested on any Debian based system.
   - Requires the python2 bindings of firewalld, which may not be installed by default.
@@ -143,6 +279,9 @@ notes:
     The module will not take care of this for you implicitly because that would undo any previously performed immediate actions which were not
     permanent. Therefore, if you require immediate access to a newly created zone it is recommended you reload firewalld immediately after the zone
     creation returns with a changed state and before you perform any other immediate, non-permanent actions on that zone.
+  - With O(permanent=true) and O(immediate=true), the permanent changes are written first. The runtime settings of the zone
+    are then updated in one step, by copying the new permanent settings if the runtime settings equaled the permanent ones,
+    so that runtime-only changes of the zone or of other zones are kept.
   - This module needs C(python-firewall) or C(python3-firewall) on managed nodes.
     It is usually provided as a subset with C(firewalld) from the OS distributor for the OS default Python interpreter.
 requirements:
@@ -185,6 +324,17 @@ EXAMPLES = r'''
     permanent: true
     state: enabled
 
+- name: Permit traffic in public zone on several ports with a single zone update
+  ansible.posix.firewalld:
+    zone: public
+    port:
+      - 8080/tcp
+      - 8443/tcp
+      - 9000-9100/udp
+    permanent: true
+    immediate: true
+    state: enabled
+
 - name: Permit traffic in dmz zone on http service
   ansible.posix.firewalld:
     zone: dmz
@@ -252,6 +402,36 @@ EXAMPLES = r'''
     permanent: true
     target: ACCEPT
 
+- name: Forward ports 80 and 443 to 8080 and 8443
+  ansible.posix.firewalld:
+    zone: public
+    port_forward:
+      - port: 80
+        proto: tcp
+        toport: 8080
+      - port: 443
+        proto: tcp
+        toport: 8443
+    permanent: true
+    state: enabled
+
+- name: Reconcile the complete settings of the internal zone in one update
+  ansible.posix.firewalld:
+    zone: internal
+    state: present
+    permanent: true
+    purge: true
+    zone_settings:
+      services:
+        - ssh
+        - dhcpv6-client
+      ports:
+        - 8080/tcp
+      sources:
+        - 192.0.2.0/24
+      masquerade: false
+      target: default
+
 - name: Redirect port 443 to 8443 with Rich Rule
   ansible.posix.firewalld:
     rich_rule: rule family=ipv4 forward-port port=443 protocol=tcp to-port=8443
@@ -261,16 +441,43 @@ EXAMPLES = r'''
     state: enabled
 '''
 
-from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.ansible.posix.plugins.module_utils.firewalld import FirewallTransaction, fw_offline
+RETURN = r'''
+perf:
+  description:
+    - Number of calls and time spent in seconds per firewalld operation.
+    - C(import_time) is the time spent importing the firewall python bindings and connecting to firewalld,
+      C(calls) and C(calls_time) are the totals of C(operations) and C(total_time) is the time since the module started.
+  returned: when O(perf=true)
+  type: dict
+  sample: {
+    "import_time": 0.182214,
+    "operations": {
+      "get_fw_zone_settings": {"count": 1, "time": 0.012051},
+      "get_enabled_settings": {"count": 2, "time": 0.000031},
+      "update_fw_settings": {"count": 1, "time": 0.104483}
+    },
+    "calls": 4,
+    "calls_time": 0.116565,
+    "total_time": 0.311072
+  }
+'''
 
-try:
-    from firewall.client import Rich_Rule
-    from firewall.client import FirewallClientZoneSettings
-except ImportError:
-    # The import errors are handled via FirewallTransaction, don't need to
-    # duplicate that here
-    pass
+import sys
+
+# TODO(Python2): On Python 2, string_types is basestring (str + unicode).
+# This module may run on target hosts with Python 2.7.
+# Remove the Python 2 branch when Python 2 support is dropped.
+if sys.version_info >= (3, 0):
+    string_types = str
+else:
+    string_types = basestring  # pylint: disable=undefined-variable
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.ansible.posix.plugins.module_utils.firewalld import (
+    FirewallTransaction,
+    RichRuleIndex,
+    normalize_rich_rule,
+)
 
 
 class IcmpBlockTransaction(FirewallTransaction):
@@ -278,33 +485,29 @@ class IcmpBlockTransaction(FirewallTransaction):
     IcmpBlockTransaction
     """
 
-    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False):
+    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False, items=None):
         super(IcmpBlockTransaction, self).__init__(
-            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate
+            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate,
+            items=items
         )
 
     def get_enabled_immediate(self, icmp_block, timeout):
         return icmp_block in self.fw.getIcmpBlocks(self.zone)
 
-    def get_enabled_permanent(self, icmp_block, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def get_enabled_settings(self, fw_settings, icmp_block, timeout):
         return icmp_block in fw_settings.getIcmpBlocks()
 
     def set_enabled_immediate(self, icmp_block, timeout):
         self.fw.addIcmpBlock(self.zone, icmp_block, timeout)
 
-    def set_enabled_permanent(self, icmp_block, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_enabled_settings(self, fw_settings, icmp_block, timeout):
         fw_settings.addIcmpBlock(icmp_block)
-        self.update_fw_settings(fw_zone, fw_settings)
 
     def set_disabled_immediate(self, icmp_block, timeout):
         self.fw.removeIcmpBlock(self.zone, icmp_block)
 
-    def set_disabled_permanent(self, icmp_block, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_disabled_settings(self, fw_settings, icmp_block, timeout):
         fw_settings.removeIcmpBlock(icmp_block)
-        self.update_fw_settings(fw_zone, fw_settings)
 
 
 class IcmpBlockInversionTransaction(FirewallTransaction):
@@ -352,9 +555,10 @@ class ServiceTransaction(FirewallTransaction):
     ServiceTransaction
     """
 
-    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False):
+    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False, items=None):
         super(ServiceTransaction, self).__init__(
-            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate
+            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate,
+            items=items
         )
 
     def get_enabled_immediate(self, service, timeout):
@@ -363,9 +567,7 @@ class ServiceTransaction(FirewallTransaction):
         else:
             return False
 
-    def get_enabled_permanent(self, service, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
-
+    def get_enabled_settings(self, fw_settings, service, timeout):
         if service in fw_settings.getServices():
             return True
         else:
@@ -374,18 +576,14 @@ class ServiceTransaction(FirewallTransaction):
     def set_enabled_immediate(self, service, timeout):
         self.fw.addService(self.zone, service, timeout)
 
-    def set_enabled_permanent(self, service, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_enabled_settings(self, fw_settings, service, timeout):
         fw_settings.addService(service)
-        self.update_fw_settings(fw_zone, fw_settings)
 
     def set_disabled_immediate(self, service, timeout):
         self.fw.removeService(self.zone, service)
 
-    def set_disabled_permanent(self, service, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_disabled_settings(self, fw_settings, service, timeout):
         fw_settings.removeService(service)
-        self.update_fw_settings(fw_zone, fw_settings)
 
 
 class ProtocolTransaction(FirewallTransaction):
@@ -393,9 +591,10 @@ class ProtocolTransaction(FirewallTransaction):
     ProtocolTransaction
     """
 
-    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False):
+    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False, items=None):
         super(ProtocolTransaction, self).__init__(
-            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate
+            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate,
+            items=items
         )
 
     def get_enabled_immediate(self, protocol, timeout):
@@ -404,9 +603,7 @@ class ProtocolTransaction(FirewallTransaction):
         else:
             return False
 
-    def get_enabled_permanent(self, protocol, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
-
+    def get_enabled_settings(self, fw_settings, protocol, timeout):
         if protocol in fw_settings.getProtocols():
             return True
         else:
@@ -415,18 +612,14 @@ class ProtocolTransaction(FirewallTransaction):
     def set_enabled_immediate(self, protocol, timeout):
         self.fw.addProtocol(self.zone, protocol, timeout)
 
-    def set_enabled_permanent(self, protocol, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_enabled_settings(self, fw_settings, protocol, timeout):
         fw_settings.addProtocol(protocol)
-        self.update_fw_settings(fw_zone, fw_settings)
 
     def set_disabled_immediate(self, protocol, timeout):
         self.fw.removeProtocol(self.zone, protocol)
 
-    def set_disabled_permanent(self, protocol, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_disabled_settings(self, fw_settings, protocol, timeout):
         fw_settings.removeProtocol(protocol)
-        self.update_fw_settings(fw_zone, fw_settings)
 
 
 class ForwardTransaction(FirewallTransaction):
@@ -520,9 +713,10 @@ class PortTransaction(FirewallTransaction):
     PortTransaction
     """
 
-    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False):
+    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False, items=None):
         super(PortTransaction, self).__init__(
-            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate
+            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate,
+            items=items
         )
 
     def get_enabled_immediate(self, port, protocol, timeout):
@@ -531,25 +725,20 @@ class PortTransaction(FirewallTransaction):
             return fw_settings.queryPort(port=port, protocol=protocol)
         return self.fw.queryPort(zone=self.zone, port=port, protocol=protocol)
 
-    def get_enabled_permanent(self, port, protocol, timeout):
-        dummy, fw_settings = self.get_fw_zone_settings()
+    def get_enabled_settings(self, fw_settings, port, protocol, timeout):
         return fw_settings.queryPort(port=port, protocol=protocol)
 
     def set_enabled_immediate(self, port, protocol, timeout):
         self.fw.addPort(self.zone, port, protocol, timeout)
 
-    def set_enabled_permanent(self, port, protocol, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_enabled_settings(self, fw_settings, port, protocol, timeout):
         fw_settings.addPort(port, protocol)
-        self.update_fw_settings(fw_zone, fw_settings)
 
     def set_disabled_immediate(self, port, protocol, timeout):
         self.fw.removePort(self.zone, port, protocol)
 
-    def set_disabled_permanent(self, port, protocol, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_disabled_settings(self, fw_settings, port, protocol, timeout):
         fw_settings.removePort(port, protocol)
-        self.update_fw_settings(fw_zone, fw_settings)
 
 
 class InterfaceTransaction(FirewallTransaction):
@@ -593,42 +782,32 @@ class InterfaceTransaction(FirewallTransaction):
     def set_enabled_permanent(self, interface):
         fw_zone, fw_settings = self.get_fw_zone_settings()
         if self.fw_offline:
-            iface_zone_objs = []
-            for zone in self.fw.config.get_zones():
-                old_zone_obj = self.fw.config.get_zone(zone)
-                if interface in old_zone_obj.interfaces:
-                    iface_zone_objs.append(old_zone_obj)
+            iface_zones = self.get_zones_of_binding('interfaces', interface)
 
-            if len(iface_zone_objs) > 1:
+            if len(iface_zones) > 1:
                 # Even it shouldn't happen, it's actually possible that
                 # the same interface is in several zone XML files
                 self.module.fail_json(
                     msg='ERROR: interface {0} is in {1} zone XML file, can only be in one'.format(
                         interface,
-                        len(iface_zone_objs)
+                        len(iface_zones)
                     )
                 )
-            elif len(iface_zone_objs) == 1 and iface_zone_objs[0].name != self.zone:
-                old_zone_obj = iface_zone_objs[0]
-                old_zone_config = self.fw.config.get_zone_config(old_zone_obj)
-                old_zone_settings = FirewallClientZoneSettings(list(old_zone_config))
+            elif len(iface_zones) == 1 and iface_zones[0] != self.zone:
+                old_zone_obj, old_zone_settings = self.get_fw_zone_settings(iface_zones[0])
                 old_zone_settings.removeInterface(interface)    # remove from old
-                self.fw.config.set_zone_config(
-                    old_zone_obj,
-                    old_zone_settings.settings
-                )
+                self.update_fw_settings(old_zone_obj, old_zone_settings)
             fw_settings.addInterface(interface)             # add to new
-            self.fw.config.set_zone_config(fw_zone, fw_settings.settings)
+            self.update_fw_settings(fw_zone, fw_settings)
         else:
             old_zone_name = self.fw.config().getZoneOfInterface(interface)
             if old_zone_name != self.zone:
                 if old_zone_name:
-                    old_zone_obj = self.fw.config().getZoneByName(old_zone_name)
-                    old_zone_settings = old_zone_obj.getSettings()
+                    old_zone_obj, old_zone_settings = self.get_fw_zone_settings(old_zone_name)
                     old_zone_settings.removeInterface(interface)  # remove from old
-                    old_zone_obj.update(old_zone_settings)
+                    self.update_fw_settings(old_zone_obj, old_zone_settings)
                 fw_settings.addInterface(interface)              # add to new
-                fw_zone.update(fw_settings)
+                self.update_fw_settings(fw_zone, fw_settings)
 
     def set_disabled_immediate(self, interface):
         self.fw.removeInterface(self.zone, interface)
@@ -644,45 +823,54 @@ class RichRuleTransaction(FirewallTransaction):
     RichRuleTransaction
     """
 
-    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False):
+    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False, items=None):
         super(RichRuleTransaction, self).__init__(
-            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate
+            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate,
+            items=items
         )
 
+        # Rich rule indexes of the settings checked by this transaction, as
+        # (settings, RichRuleIndex) pairs
+        self.rule_indexes = []
+        self.runtime_rules = None
+
+    def get_rule_index(self, fw_settings):
+        for settings, index in self.rule_indexes:
+            if settings is fw_settings:
+                return index
+        index = RichRuleIndex(fw_settings.getRichRules())
+        self.rule_indexes.append((fw_settings, index))
+        return index
+
     def get_enabled_immediate(self, rule, timeout):
-        # Convert the rule string to standard format
-        # before checking whether it is present
-        rule = str(Rich_Rule(rule_str=rule))
-        if rule in self.fw.getRichRules(self.zone):
-            return True
-        else:
-            return False
+        # Compare the canonical forms, firewalld may have stored the rule
+        # with different spacing, quoting or attribute order
+        if self.runtime_rules is None:
+            self.runtime_rules = RichRuleIndex(self.fw.getRichRules(self.zone))
+        return rule in self.runtime_rules
 
-    def get_enabled_permanent(self, rule, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
-        # Convert the rule string to standard format
-        # before checking whether it is present
-        rule = str(Rich_Rule(rule_str=rule))
-        if rule in fw_settings.getRichRules():
-            return True
-        else:
-            return False
+    def get_enabled_settings(self, fw_settings, rule, timeout):
+        return rule in self.get_rule_index(fw_settings)
 
     def set_enabled_immediate(self, rule, timeout):
         self.fw.addRichRule(self.zone, rule, timeout)
 
-    def set_enabled_permanent(self, rule, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
-        fw_settings.addRichRule(rule)
-        self.update_fw_settings(fw_zone, fw_settings)
+    def set_enabled_settings(self, fw_settings, rule, timeout):
+        index = self.get_rule_index(fw_settings)
+        # The same rule may be listed more than once in different forms
+        if rule not in index:
+            fw_settings.addRichRule(rule)
+            index.add(rule)
 
     def set_disabled_immediate(self, rule, timeout):
         self.fw.removeRichRule(self.zone, rule)
 
-    def set_disabled_permanent(self, rule, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
-        fw_settings.removeRichRule(rule)
-        self.update_fw_settings(fw_zone, fw_settings)
+    def set_disabled_settings(self, fw_settings, rule, timeout):
+        index = self.get_rule_index(fw_settings)
+        stored_rule = index.get(rule)
+        if stored_rule is not None:
+            fw_settings.removeRichRule(stored_rule)
+            index.discard(rule)
 
 
 class SourceTransaction(FirewallTransaction):
@@ -690,16 +878,19 @@ class SourceTransaction(FirewallTransaction):
     SourceTransaction
     """
 
-    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False):
+    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False, items=None):
         super(SourceTransaction, self).__init__(
-            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate
+            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate,
+            items=items
         )
 
+        sources = ', '.join(item[0] for item in (self.items or [self.action_args]))
+
         self.enabled_msg = "Added %s to zone %s" % \
-            (self.action_args[0], self.zone)
+            (sources, self.zone)
 
         self.disabled_msg = "Removed %s from zone %s" % \
-            (self.action_args[0], self.zone)
+            (sources, self.zone)
 
     def get_enabled_immediate(self, source):
         if source in self.fw.getSources(self.zone):
@@ -707,8 +898,7 @@ class SourceTransaction(FirewallTransaction):
         else:
             return False
 
-    def get_enabled_permanent(self, source):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def get_enabled_settings(self, fw_settings, source):
         if source in fw_settings.getSources():
             return True
         else:
@@ -717,18 +907,22 @@ class SourceTransaction(FirewallTransaction):
     def set_enabled_immediate(self, source):
         self.fw.addSource(self.zone, source)
 
-    def set_enabled_permanent(self, source):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_enabled_settings(self, fw_settings, source):
+        if self.fw_offline:
+            # A source can only be bound to one zone, report that here instead
+            # of failing on the config check when the zone is written
+            other_zones = [z for z in self.get_zones_of_binding('sources', source) if z != self.zone]
+            if other_zones:
+                self.module.fail_json(
+                    msg='ERROR: source {0} is already bound to zone {1}'.format(source, ', '.join(other_zones))
+                )
         fw_settings.addSource(source)
-        self.update_fw_settings(fw_zone, fw_settings)
 
     def set_disabled_immediate(self, source):
         self.fw.removeSource(self.zone, source)
 
-    def set_disabled_permanent(self, source):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_disabled_settings(self, fw_settings, source):
         fw_settings.removeSource(source)
-        self.update_fw_settings(fw_zone, fw_settings)
 
 
 class ZoneTargetTransaction(FirewallTransaction):
@@ -817,9 +1011,10 @@ class ZoneTransaction(FirewallTransaction):
 
     def set_enabled_permanent(self):
         if self.fw_offline:
-            self.fw.config.new_zone(self.zone, FirewallClientZoneSettings().settings)
+            self.fw.config.new_zone(self.zone, self.new_fw_zone_settings().settings)
         else:
-            self.fw.config().addZone(self.zone, FirewallClientZoneSettings())
+            self.fw.config().addZone(self.zone, self.new_fw_zone_settings())
+        self.invalidate_fw_zone_settings(self.zone)
 
     def set_disabled_immediate(self):
         self.module.fail_json(msg=self.tx_not_permanent_error_msg)
@@ -831,6 +1026,8 @@ class ZoneTransaction(FirewallTransaction):
         else:
             zone_obj = self.fw.config().getZoneByName(self.zone)
             zone_obj.remove()
+        self.invalidate_fw_zone_settings(self.zone)
+        self.update_zone_binding_index(self.zone)
 
 
 class ForwardPortTransaction(FirewallTransaction):
@@ -838,9 +1035,10 @@ class ForwardPortTransaction(FirewallTransaction):
     ForwardPortTransaction
     """
 
-    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False):
+    def __init__(self, module, action_args=None, zone=None, desired_state=None, permanent=False, immediate=False, items=None):
         super(ForwardPortTransaction, self).__init__(
-            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate
+            module, action_args=action_args, desired_state=desired_state, zone=zone, permanent=permanent, immediate=immediate,
+            items=items
         )
 
     def get_enabled_immediate(self, port, proto, toport, toaddr, timeout):
@@ -849,59 +1047,229 @@ class ForwardPortTransaction(FirewallTransaction):
             return fw_settings.queryForwardPort(port=port, protocol=proto, to_port=toport, to_addr=toaddr)
         return self.fw.queryForwardPort(zone=self.zone, port=port, protocol=proto, toport=toport, toaddr=toaddr)
 
-    def get_enabled_permanent(self, port, proto, toport, toaddr, timeout):
-        dummy, fw_settings = self.get_fw_zone_settings()
+    def get_enabled_settings(self, fw_settings, port, proto, toport, toaddr, timeout):
         return fw_settings.queryForwardPort(port=port, protocol=proto, to_port=toport, to_addr=toaddr)
 
     def set_enabled_immediate(self, port, proto, toport, toaddr, timeout):
         self.fw.addForwardPort(self.zone, port, proto, toport, toaddr, timeout)
 
-    def set_enabled_permanent(self, port, proto, toport, toaddr, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_enabled_settings(self, fw_settings, port, proto, toport, toaddr, timeout):
         fw_settings.addForwardPort(port, proto, toport, toaddr)
-        self.update_fw_settings(fw_zone, fw_settings)
 
     def set_disabled_immediate(self, port, proto, toport, toaddr, timeout):
         self.fw.removeForwardPort(self.zone, port, proto, toport, toaddr)
 
-    def set_disabled_permanent(self, port, proto, toport, toaddr, timeout):
-        fw_zone, fw_settings = self.get_fw_zone_settings()
+    def set_disabled_settings(self, fw_settings, port, proto, toport, toaddr, timeout):
         fw_settings.removeForwardPort(port, proto, toport, toaddr)
-        self.update_fw_settings(fw_zone, fw_settings)
+
+
+class ZoneSettingsTransaction(FirewallTransaction):
+    """
+    ZoneSettingsTransaction
+
+    Reconcile a zone against a declared set of settings. The zone settings
+    are fetched once, compared with the declaration and the minimal change set
+    is pushed back with a single update.
+    """
+
+    # zone_settings option: (getter, adder, remover) of FirewallClientZoneSettings
+    LIST_SETTINGS = {
+        'services': ('getServices', 'addService', 'removeService'),
+        'ports': ('getPorts', 'addPort', 'removePort'),
+        'protocols': ('getProtocols', 'addProtocol', 'removeProtocol'),
+        'sources': ('getSources', 'addSource', 'removeSource'),
+        'interfaces': ('getInterfaces', 'addInterface', 'removeInterface'),
+        'icmp_blocks': ('getIcmpBlocks', 'addIcmpBlock', 'removeIcmpBlock'),
+        'rich_rules': ('getRichRules', 'addRichRule', 'removeRichRule'),
+        'forward_ports': ('getForwardPorts', 'addForwardPort', 'removeForwardPort'),
+    }
+
+    # zone_settings option: (getter, setter) of FirewallClientZoneSettings
+    SCALAR_SETTINGS = {
+        'target': ('getTarget', 'setTarget'),
+        'masquerade': ('getMasquerade', 'setMasquerade'),
+        'forward': ('queryForward', 'setForward'),
+        'icmp_block_inversion': ('getIcmpBlockInversion', 'setIcmpBlockInversion'),
+    }
+
+    # zone_settings option: function returning the comparison key of an item
+    SETTING_KEYS = {
+        'rich_rules': normalize_rich_rule,
+    }
+
+    # The target of a zone is not part of its runtime settings
+    PERMANENT_ONLY_SETTINGS = ('target',)
+
+    def __init__(self, module, action_args=None, zone=None, desired_state=None,
+                 permanent=True, immediate=False, purge=False):
+        super(ZoneSettingsTransaction, self).__init__(
+            module, action_args=action_args, desired_state=desired_state, zone=zone,
+            permanent=permanent, immediate=immediate,
+            enabled_values=["present"],
+            disabled_values=["absent"])
+
+        self.purge = purge
+        self.permanent_delta = {}
+        self.immediate_delta = {}
+
+        self.tx_absent_error_msg = "zone_settings can only be used with state=present"
+
+    @staticmethod
+    def _setting_item(item):
+        # D-Bus hands over structs for ports and forward ports
+        if isinstance(item, (list, tuple)):
+            return tuple(str(value) for value in item)
+        return str(item)
+
+    def get_settings_delta(self, fw_settings, zone_settings, runtime=False):
+        """
+        Compare fw_settings with the declared zone_settings.
+
+        Returns a dict of the settings to change. List settings map to a
+        (to_add, to_remove) tuple, scalar settings to their new value.
+        """
+        delta = {}
+
+        for option, (getter, adder, remover) in self.LIST_SETTINGS.items():
+            desired = zone_settings.get(option)
+            if desired is None:
+                if not self.purge:
+                    continue
+                desired = []
+            key = self.SETTING_KEYS.get(option, lambda item: item)
+            current = [self._setting_item(item) for item in getattr(fw_settings, getter)()]
+            current_keys = set(key(item) for item in current)
+            desired_keys = set()
+            to_add = []
+            for item in desired:
+                item_key = key(item)
+                if item_key not in current_keys and item_key not in desired_keys:
+                    to_add.append(item)
+                desired_keys.add(item_key)
+            to_remove = [item for item in current if key(item) not in desired_keys] if self.purge else []
+            if to_add or to_remove:
+                delta[option] = (to_add, to_remove)
+
+        for option, (getter, setter) in self.SCALAR_SETTINGS.items():
+            desired = zone_settings.get(option)
+            if desired is None or (runtime and option in self.PERMANENT_ONLY_SETTINGS):
+                continue
+            if getattr(fw_settings, getter)() != desired:
+                delta[option] = desired
+
+        return delta
+
+    def apply_settings_delta(self, fw_settings, delta):
+        for option, change in delta.items():
+            if option in self.SCALAR_SETTINGS:
+                getattr(fw_settings, self.SCALAR_SETTINGS[option][1])(change)
+                continue
+
+            getter, adder, remover = self.LIST_SETTINGS[option]
+            to_add, to_remove = change
+            for item in to_remove:
+                if isinstance(item, tuple):
+                    getattr(fw_settings, remover)(*item)
+                else:
+                    getattr(fw_settings, remover)(item)
+            for item in to_add:
+                if isinstance(item, tuple):
+                    getattr(fw_settings, adder)(*item)
+                else:
+                    getattr(fw_settings, adder)(item)
+
+    def get_enabled_immediate(self, zone_settings):
+        self.runtime_settings = self.get_fw_runtime_settings()
+        self.immediate_delta = self.get_settings_delta(self.runtime_settings, zone_settings, runtime=True)
+        self.enabled_msg = "Changed zone %s settings: %s" % (
+            self.zone, ', '.join(sorted(set(self.permanent_delta) | set(self.immediate_delta))))
+        return not self.immediate_delta
+
+    def get_enabled_permanent(self, zone_settings):
+        self.fw_zone, self.fw_settings = self.get_fw_zone_settings()
+        self.permanent_delta = self.get_settings_delta(self.fw_settings, zone_settings)
+        self.enabled_msg = "Changed zone %s settings: %s" % (
+            self.zone, ', '.join(sorted(set(self.permanent_delta) | set(self.immediate_delta))))
+        return not self.permanent_delta
+
+    def set_enabled_immediate(self, zone_settings):
+        # main() made sure that the runtime settings can be pushed as a whole
+        self.apply_settings_delta(self.runtime_settings, self.immediate_delta)
+        self.update_fw_runtime_settings(self.runtime_settings)
+
+    def set_enabled_permanent(self, zone_settings):
+        self.apply_settings_delta(self.fw_settings, self.permanent_delta)
+        self.update_fw_settings(self.fw_zone, self.fw_settings)
+
+    def set_disabled_immediate(self, zone_settings):
+        self.module.fail_json(msg=self.tx_absent_error_msg)
+
+    def set_disabled_permanent(self, zone_settings):
+        self.module.fail_json(msg=self.tx_absent_error_msg)
 
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            icmp_block=dict(type='str'),
+            icmp_block=dict(type='list', elements='str'),
             icmp_block_inversion=dict(type='bool'),
-            service=dict(type='str'),
-            protocol=dict(type='str'),
-            port=dict(type='str'),
+            service=dict(type='list', elements='str'),
+            protocol=dict(type='list', elements='str'),
+            port=dict(type='list', elements='str'),
             port_forward=dict(type='list', elements='dict'),
-            rich_rule=dict(type='str'),
+            rich_rule=dict(type='raw'),
             zone=dict(type='str'),
             immediate=dict(type='bool', default=False),
-            source=dict(type='str'),
+            source=dict(type='list', elements='str'),
             permanent=dict(type='bool', default=False),
             state=dict(type='str', required=True, choices=['absent', 'disabled', 'enabled', 'present']),
             timeout=dict(type='int', default=0),
-            interface=dict(type='str'),
+            interface=dict(type='list', elements='str'),
             forward=dict(type='bool'),
             masquerade=dict(type='bool'),
             offline=dict(type='bool', default=False),
+            perf=dict(type='bool', default=False),
+            offline_backend=dict(type='str', default='firewall', choices=['firewall', 'xml']),
             target=dict(type='str', choices=['default', 'ACCEPT', 'DROP', '%%REJECT%%']),
+            zone_settings=dict(
+                type='dict',
+                options=dict(
+                    services=dict(type='list', elements='str'),
+                    ports=dict(type='list', elements='str'),
+                    protocols=dict(type='list', elements='str'),
+                    sources=dict(type='list', elements='str'),
+                    interfaces=dict(type='list', elements='str'),
+                    icmp_blocks=dict(type='list', elements='str'),
+                    rich_rules=dict(type='list', elements='str'),
+                    forward_ports=dict(
+                        type='list',
+                        elements='dict',
+                        options=dict(
+                            port=dict(type='str', required=True),
+                            proto=dict(type='str', required=True, choices=['udp', 'tcp']),
+                            toport=dict(type='str', required=True),
+                            toaddr=dict(type='str', default=''),
+                        ),
+                    ),
+                    target=dict(type='str', choices=['default', 'ACCEPT', 'DROP', '%%REJECT%%']),
+                    masquerade=dict(type='bool'),
+                    forward=dict(type='bool'),
+                    icmp_block_inversion=dict(type='bool'),
+                ),
+            ),
+            purge=dict(type='bool', default=False),
         ),
         supports_check_mode=True,
         required_by=dict(
             interface=('zone',),
             target=('zone',),
             source=('permanent',),
+            zone_settings=('zone',),
         ),
         mutually_exclusive=[
             ['icmp_block', 'icmp_block_inversion', 'service', 'protocol', 'port', 'port_forward', 'rich_rule',
-             'interface', 'forward', 'masquerade', 'source', 'target']
+             'interface', 'forward', 'masquerade', 'source', 'target', 'zone_settings']
         ],
     )
 
@@ -913,9 +1281,17 @@ def main():
     forward = module.params['forward']
     masquerade = module.params['masquerade']
     offline = module.params['offline']
+    offline_backend = module.params['offline_backend']
 
     # Sanity checks
     FirewallTransaction.sanity_check(module)
+    fw_offline = FirewallTransaction.get_fw_offline()
+
+    if offline_backend == 'xml':
+        if not permanent:
+            module.fail_json(msg='offline_backend=xml can only be used for permanent changes')
+        if module.params['rich_rule'] or (module.params['zone_settings'] or {}).get('rich_rules') is not None:
+            module.fail_json(msg='rich rules are not supported with offline_backend=xml')
 
     # `offline`, `immediate`, and `permanent` have a weird twisty relationship.
     if offline:
@@ -945,38 +1321,73 @@ def main():
     source = module.params['source']
     zone = module.params['zone']
     target = module.params['target']
+    zone_settings = module.params['zone_settings']
+
+    # Unlike the other item options, a string is not split on commas, which
+    # rich rules may contain
+    if isinstance(rich_rule, string_types):
+        rich_rule = [rich_rule]
+    elif rich_rule is not None and (
+            not isinstance(rich_rule, list) or not all(isinstance(item, string_types) for item in rich_rule)):
+        module.fail_json(msg='rich_rule must be a rule or a list of rules')
 
     port = None
     if module.params['port'] is not None:
-        if '/' in module.params['port']:
-            port, port_protocol = module.params['port'].strip().split('/')
-        else:
-            port_protocol = None
-        if not port_protocol:
-            module.fail_json(msg='improper port format (missing protocol?)')
-    else:
-        port_protocol = None
+        port = []
+        for item in module.params['port']:
+            if '/' in item:
+                port_number, port_protocol = item.strip().split('/')
+            else:
+                port_protocol = None
+            if not port_protocol:
+                module.fail_json(msg='improper port format (missing protocol?)')
+            port.append((port_number, port_protocol))
 
-    port_forward_toaddr = ''
     port_forward = None
     if module.params['port_forward'] is not None:
-        if len(module.params['port_forward']) > 1:
-            module.fail_json(msg='Only one port forward supported at a time')
-        port_forward = module.params['port_forward'][0]
-        if 'port' not in port_forward:
-            module.fail_json(msg='port must be specified for port forward')
-        if 'proto' not in port_forward:
-            module.fail_json(msg='proto udp/tcp must be specified for port forward')
-        if 'toport' not in port_forward:
-            module.fail_json(msg='toport must be specified for port forward')
-        if 'toaddr' in port_forward:
-            port_forward_toaddr = port_forward['toaddr']
+        port_forward = []
+        for item in module.params['port_forward']:
+            if 'port' not in item:
+                module.fail_json(msg='port must be specified for port forward')
+            if 'proto' not in item:
+                module.fail_json(msg='proto udp/tcp must be specified for port forward')
+            if 'toport' not in item:
+                module.fail_json(msg='toport must be specified for port forward')
+            port_forward.append((str(item['port']), item['proto'], str(item['toport']), item.get('toaddr') or ''))
+
+    if zone_settings is not None:
+        if desired_state != 'present':
+            module.fail_json(msg='zone_settings can only be used with state=present')
+        # Checked before anything is written, so that the zone is not left half updated
+        if timeout:
+            module.fail_json(msg='zone_settings cannot be used with timeout')
+        if immediate and not FirewallTransaction.has_fw_runtime_zone_settings():
+            module.fail_json(msg='zone_settings with immediate=true requires firewalld >= 0.9.0')
+
+        # Bring the declaration into the shape FirewallClientZoneSettings uses
+        zone_settings = dict(zone_settings)
+        for item in zone_settings['ports'] or []:
+            if '/' not in item or not item.strip().split('/')[1]:
+                module.fail_json(msg='improper port format (missing protocol?)')
+        if zone_settings['ports'] is not None:
+            zone_settings['ports'] = [tuple(item.strip().split('/')) for item in zone_settings['ports']]
+        if zone_settings['forward_ports'] is not None:
+            zone_settings['forward_ports'] = [
+                (item['port'], item['proto'], item['toport'], item['toaddr'])
+                for item in zone_settings['forward_ports']
+            ]
+
+    for item in (rich_rule or []) + ((zone_settings or {}).get('rich_rules') or []):
+        try:
+            normalize_rich_rule(item)
+        except ValueError as e:
+            module.fail_json(msg='%s' % e)
 
     modification = False
     if any([icmp_block, icmp_block_inversion, service, protocol, port, port_forward, rich_rule,
-            interface, forward, masquerade, source, target]):
+            interface, forward, masquerade, source, target, zone_settings]):
         modification = True
-    if modification and desired_state in ['absent', 'present'] and target is None:
+    if modification and desired_state in ['absent', 'present'] and target is None and zone_settings is None:
         module.fail_json(
             msg='absent and present state can only be used in zone level operations'
         )
@@ -985,7 +1396,7 @@ def main():
 
         transaction = IcmpBlockTransaction(
             module,
-            action_args=(icmp_block, timeout),
+            items=[(item, timeout) for item in icmp_block],
             zone=zone,
             desired_state=desired_state,
             permanent=permanent,
@@ -995,7 +1406,8 @@ def main():
         changed, transaction_msgs = transaction.run()
         msgs = msgs + transaction_msgs
         if changed is True:
-            msgs.append("Changed icmp-block %s to %s" % (icmp_block, desired_state))
+            msgs.append("Changed icmp-block %s to %s" % (
+                ', '.join(item[0] for item in transaction.changed_items), desired_state))
 
     if icmp_block_inversion is not None:
         expected_state = 'enabled' if (desired_state == 'enabled') == icmp_block_inversion else 'disabled'
@@ -1017,7 +1429,7 @@ def main():
 
         transaction = ServiceTransaction(
             module,
-            action_args=(service, timeout),
+            items=[(item, timeout) for item in service],
             zone=zone,
             desired_state=desired_state,
             permanent=permanent,
@@ -1027,13 +1439,14 @@ def main():
         changed, transaction_msgs = transaction.run()
         msgs = msgs + transaction_msgs
         if changed is True:
-            msgs.append("Changed service %s to %s" % (service, desired_state))
+            msgs.append("Changed service %s to %s" % (
+                ', '.join(item[0] for item in transaction.changed_items), desired_state))
 
     if protocol is not None:
 
         transaction = ProtocolTransaction(
             module,
-            action_args=(protocol, timeout),
+            items=[(item, timeout) for item in protocol],
             zone=zone,
             desired_state=desired_state,
             permanent=permanent,
@@ -1043,13 +1456,14 @@ def main():
         changed, transaction_msgs = transaction.run()
         msgs = msgs + transaction_msgs
         if changed is True:
-            msgs.append("Changed protocol %s to %s" % (protocol, desired_state))
+            msgs.append("Changed protocol %s to %s" % (
+                ', '.join(item[0] for item in transaction.changed_items), desired_state))
 
     if source is not None:
 
         transaction = SourceTransaction(
             module,
-            action_args=(source,),
+            items=[(item,) for item in source],
             zone=zone,
             desired_state=desired_state,
             permanent=permanent,
@@ -1063,7 +1477,7 @@ def main():
 
         transaction = PortTransaction(
             module,
-            action_args=(port, port_protocol, timeout),
+            items=[(port_number, port_protocol, timeout) for port_number, port_protocol in port],
             zone=zone,
             desired_state=desired_state,
             permanent=permanent,
@@ -1075,15 +1489,15 @@ def main():
         if changed is True:
             msgs.append(
                 "Changed port %s to %s" % (
-                    "%s/%s" % (port, port_protocol), desired_state
+                    ', '.join("%s/%s" % (item[0], item[1]) for item in transaction.changed_items),
+                    desired_state
                 )
             )
 
     if port_forward is not None:
         transaction = ForwardPortTransaction(
             module,
-            action_args=(str(port_forward['port']), port_forward['proto'],
-                         str(port_forward['toport']), port_forward_toaddr, timeout),
+            items=[item + (timeout,) for item in port_forward],
             zone=zone,
             desired_state=desired_state,
             permanent=permanent,
@@ -1095,9 +1509,9 @@ def main():
         if changed is True:
             msgs.append(
                 "Changed port_forward %s to %s" % (
-                    "port=%s:proto=%s:toport=%s:toaddr=%s" % (
-                        port_forward['port'], port_forward['proto'],
-                        port_forward['toport'], port_forward_toaddr
+                    ', '.join(
+                        "port=%s:proto=%s:toport=%s:toaddr=%s" % item[:4]
+                        for item in transaction.changed_items
                     ), desired_state
                 )
             )
@@ -1106,7 +1520,7 @@ def main():
 
         transaction = RichRuleTransaction(
             module,
-            action_args=(rich_rule, timeout),
+            items=[(item, timeout) for item in rich_rule],
             zone=zone,
             desired_state=desired_state,
             permanent=permanent,
@@ -1116,21 +1530,26 @@ def main():
         changed, transaction_msgs = transaction.run()
         msgs = msgs + transaction_msgs
         if changed is True:
-            msgs.append("Changed rich_rule %s to %s" % (rich_rule, desired_state))
+            msgs.append("Changed rich_rule %s to %s" % (
+                ', '.join(item[0] for item in transaction.changed_items), desired_state))
 
     if interface is not None:
 
-        transaction = InterfaceTransaction(
-            module,
-            action_args=(interface,),
-            zone=zone,
-            desired_state=desired_state,
-            permanent=permanent,
-            immediate=immediate,
-        )
+        # Moving an interface may touch the settings of another zone as
+        # well, so every interface is handled by its own transaction.
+        for item in interface:
+            transaction = InterfaceTransaction(
+                module,
+                action_args=(item,),
+                zone=zone,
+                desired_state=desired_state,
+                permanent=permanent,
+                immediate=immediate,
+            )
 
-        changed, transaction_msgs = transaction.run()
-        msgs = msgs + transaction_msgs
+            item_changed, transaction_msgs = transaction.run()
+            changed = changed or item_changed
+            msgs = msgs + transaction_msgs
 
     if forward is not None:
         expected_state = 'enabled' if (desired_state == 'enabled') == forward else 'disabled'
@@ -1174,6 +1593,21 @@ def main():
         changed, transaction_msgs = transaction.run()
         msgs = msgs + transaction_msgs
 
+    if zone_settings is not None:
+
+        transaction = ZoneSettingsTransaction(
+            module,
+            action_args=(zone_settings,),
+            zone=zone,
+            desired_state=desired_state,
+            permanent=permanent,
+            immediate=immediate,
+            purge=module.params['purge'],
+        )
+
+        changed, transaction_msgs = transaction.run()
+        msgs = msgs + transaction_msgs
+
     ''' If there are no changes within the zone we are operating on the zone itself '''
     if not modification and desired_state in ['absent', 'present']:
 
@@ -1194,7 +1628,7 @@ def main():
     if fw_offline:
         msgs.append("(offline operation: only on-disk configs were altered)")
 
-    module.exit_json(changed=changed, msg=', '.join(msgs))
+    module.exit_json(changed=changed, msg=', '.join(msgs), **FirewallTransaction.get_perf_result(module))
 
 
 if __name__ == '__main__':
@@ -25,6 +25,66 @@ options:
         required: false
         type: list
         elements: str
+    gather_subset:
+        description:
+            - The zone settings to gather for every collected zone.
+            - Only the requested settings are read from the zone settings and returned.
+            - V(all) gathers every setting.
+        required: false
+        type: list
+        elements: str
+        default: [all]
+        choices:
+            - all
+            - target
+            - icmp_block_inversion
+            - interfaces
+            - sources
+            - services
+            - ports
+            - protocols
+            - forward
+            - masquerade
+            - forward_ports
+            - source_ports
+            - icmp_blocks
+            - rich_rules
+        version_added: 3.0.0
+    drift:
+        description:
+            - Also gather the permanent settings of every collected zone and return the differences
+              between its runtime and permanent settings in RV(firewalld_info.drift).
+            - Only the settings selected with O(gather_subset) are compared.
+            - Cannot be used with O(cache_file), which may not notice runtime-only changes.
+        required: false
+        type: bool
+        default: false
+        version_added: 3.0.0
+    cache_file:
+        description:
+            - Path of a file on the managed node to cache the gathered information in.
+            - When set, a fingerprint is computed from the firewalld version, the modification time and size of every
+              configuration file below C(/etc/firewalld), the default zone, the active zones and the options of this module.
+            - If the fingerprint matches the one stored in O(cache_file), the cached information is returned
+              without gathering the settings of each zone.
+            - The cache file is not written in check mode.
+        required: false
+        type: path
+        version_added: 3.0.0
+    cache_max_age:
+        description:
+            - Maximum age in seconds of the information in O(cache_file) before it is gathered again,
+              even if the fingerprint still matches.
+            - Must be greater than V(0).
+        required: false
+        type: int
+        default: 300
+        version_added: 3.0.0
+notes:
+    - The settings of every zone are fetched with a single call to firewalld.
+    - Runtime-only changes that do not alter the default or the active zones (for example a port opened without
+      C(--permanent)) do not change the fingerprint used with O(cache_file), they go unnoticed for up to
+      O(cache_max_age) seconds.
 requirements:
     - firewalld >= 0.2.11
     - python-firewall
@@ -50,6 +110,28 @@ EXAMPLES = r'''
       - external
       - internal
   register: result
+
+- name: Gather only the ports and services of all zones
+  ansible.posix.firewalld_info:
+    gather_subset:
+      - ports
+      - services
+  register: result
+
+- name: Report the differences between the runtime and the permanent configuration of every zone
+  ansible.posix.firewalld_info:
+    drift: true
+  register: result
+
+- name: Print the zones whose runtime configuration differs from the permanent one
+  ansible.builtin.debug:
+    msg: "{{ result.firewalld_info.drift | dict2items | selectattr('value') | map(attribute='key') }}"
+
+- name: Gather information, reusing the previous result while the configuration is unchanged
+  ansible.posix.firewalld_info:
+    cache_file: /var/cache/ansible/firewalld_info.json
+    cache_max_age: 3600
+  register: result
 '''
 
 RETURN = r'''
@@ -65,6 +147,13 @@ collected_zones:
     returned: success
     type: list
     sample: [external, internal]
+cached:
+    description:
+      - Whether the information was returned from O(cache_file).
+    returned: success
+    type: bool
+    sample: false
+    version_added: 3.0.0
 undefined_zones:
     description:
       - A list of undefined zones in C(zones) option.
@@ -207,8 +296,32 @@ firewalld_info:
                             sample:
                               - "rule protocol value=\"icmp\" reject"
                               - "rule priority=\"32767\" reject"
+        drift:
+            description:
+              - The differences between the runtime and the permanent settings of every collected zone.
+              - A zone without differences maps to an empty dict.
+              - A list setting that differs maps to the items only found in the runtime (C(runtime_only))
+                and only found in the permanent (C(permanent_only)) settings.
+              - Any other setting that differs maps to its C(runtime) and C(permanent) value.
+              - A zone that only exists in the runtime configuration maps to a dict with C(permanent_missing) set to V(true).
+            returned: when O(drift=true)
+            type: dict
+            version_added: 3.0.0
+            sample: {
+              "internal": {},
+              "public": {
+                "masquerade": {"permanent": false, "runtime": true},
+                "services": {"permanent_only": [], "runtime_only": ["http"]}
+              }
+            }
 '''
 
+import hashlib
+import json
+import os
+import tempfile
+import time
+
 from ansible.module_utils.basic import AnsibleModule, missing_required_lib
 from ansible.module_utils.common.text.converters import to_native
 from ansible_collections.ansible.posix.plugins.module_utils._respawn import respawn_module, HAS_RESPAWN_UTIL
@@ -302,21 +415,178 @@ def get_zone_rich_rules(zone_settings):
     return zone_settings.getRichRules()
 
 
+# Zone information keys and the functions gathering them, in the order of
+# the output of 'firewall-cmd --info-zone=<ZONE>' command.
+ZONE_INFO_GETTERS = (
+    ('target', get_zone_target),
+    ('icmp_block_inversion', get_zone_icmp_block_inversion),
+    ('interfaces', get_zone_interfaces),
+    ('sources', get_zone_sources),
+    ('services', get_zone_services),
+    ('ports', get_zone_ports),
+    ('protocols', get_zone_protocols),
+    ('forward', get_zone_forward),
+    ('masquerade', get_zone_masquerade),
+    ('forward_ports', get_zone_forward_ports),
+    ('source_ports', get_zone_source_ports),
+    ('icmp_blocks', get_zone_icmp_blocks),
+    ('rich_rules', get_zone_rich_rules),
+)
+
+
+def get_zone_info(zone_settings, gather_subset, version):
+    zone_info = dict()
+    for key, getter in ZONE_INFO_GETTERS:
+        if 'all' not in gather_subset and key not in gather_subset:
+            continue
+        # The 'forward' parameter supports on python-firewall 0.9.0(or later).
+        if key == 'forward' and StrictVersion(version) < StrictVersion('0.9.0'):
+            continue
+        zone_info[key] = getter(zone_settings)
+    return zone_info
+
+
+# Configuration files taken into account by the cache fingerprint
+FIREWALLD_CONFIG_DIR = '/etc/firewalld'
+
+
+def get_permanent_zone_settings(client, zone):
+    return client.config().getZoneByName(zone).getSettings()
+
+
+def is_invalid_zone_error(e):
+    """Return whether the D-Bus error e is the one of firewalld for a zone that does not exist."""
+    message = e.get_dbus_message() if hasattr(e, 'get_dbus_message') else e
+    return to_native(message).startswith('INVALID_ZONE')
+
+
+def _hashable(item):
+    # D-Bus hands over arrays and structs for ports and forward ports
+    if isinstance(item, (list, tuple)):
+        return tuple(item)
+    return item
+
+
+def get_zone_drift(runtime_info, permanent_info):
+    """
+    Return the differences between the runtime and the permanent information
+    of a zone, both as returned by get_zone_info().
+    """
+    drift = dict()
+    for key, runtime_value in runtime_info.items():
+        permanent_value = permanent_info.get(key)
+        if isinstance(runtime_value, (list, tuple)):
+            runtime_items = set(_hashable(item) for item in runtime_value)
+            permanent_items = set(_hashable(item) for item in permanent_value)
+            runtime_only = [item for item in runtime_value if _hashable(item) not in permanent_items]
+            permanent_only = [item for item in permanent_value if _hashable(item) not in runtime_items]
+            if runtime_only or permanent_only:
+                drift[key] = dict(runtime_only=runtime_only, permanent_only=permanent_only)
+        elif runtime_value != permanent_value:
+            drift[key] = dict(runtime=runtime_value, permanent=permanent_value)
+    return drift
+
+
+def get_fingerprint(client, params):
+    """
+    Return a digest of everything the gathered information depends on that
+    can be checked without walking the zones.
+    """
+    fingerprint = hashlib.sha256()
+    fingerprint.update(to_native(get_version()).encode('utf-8'))
+    fingerprint.update(json.dumps(
+        [params['active_zones'], params['zones'], params['gather_subset']], sort_keys=True
+    ).encode('utf-8'))
+
+    for root, dirs, files in os.walk(FIREWALLD_CONFIG_DIR):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith('.xml') and name != 'firewalld.conf':
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            # TODO(Python2): os.stat_result has no st_mtime_ns on Python 2.
+            # Remove the fallback to st_mtime when Python 2 support is dropped.
+            mtime_ns = getattr(st, 'st_mtime_ns', None)
+            if mtime_ns is None:
+                mtime_ns = int(st.st_mtime * 1e9)
+            fingerprint.update(('%s:%d:%d\n' % (path, mtime_ns, st.st_size)).encode('utf-8'))
+
+    # The runtime bindings of interfaces and sources, and the default zone
+    fingerprint.update(to_native(get_default_zone(client)).encode('utf-8'))
+    active_zones = client.getActiveZones()
+    fingerprint.update(json.dumps(_to_json_data(active_zones), sort_keys=True).encode('utf-8'))
+
+    return fingerprint.hexdigest()
+
+
+def _to_json_data(value):
+    # dbus.Boolean is an int subclass and would be stored as 0/1
+    if isinstance(value, dbus.Boolean):
+        return bool(value)
+    if isinstance(value, dict):
+        return dict((to_native(k), _to_json_data(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_to_json_data(v) for v in value]
+    return value
+
+
+def read_cache(path, fingerprint, max_age):
+    try:
+        with open(path, 'r') as cache_file:
+            cache = json.load(cache_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict) or cache.get('fingerprint') != fingerprint:
+        return None
+    if time.time() - cache.get('timestamp', 0) > max_age:
+        return None
+    return cache.get('result')
+
+
+def write_cache(module, path, fingerprint, result):
+    cache_dir = os.path.dirname(os.path.abspath(path))
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o700)
+        fd, tmp_path = tempfile.mkstemp(prefix='.firewalld_info_', dir=cache_dir)
+        with os.fdopen(fd, 'w') as tmp_file:
+            json.dump(dict(fingerprint=fingerprint, timestamp=time.time(), result=result), tmp_file)
+    except (IOError, OSError) as e:
+        module.warn('Unable to write cache file %s: %s' % (path, to_native(e)))
+        return
+    module.atomic_move(tmp_path, path)
+
+
 def main():
     module_args = dict(
         active_zones=dict(required=False, type='bool', default=False),
         zones=dict(required=False, type='list', elements='str'),
+        gather_subset=dict(required=False, type='list', elements='str', default=['all'],
+                           choices=['all'] + [key for key, getter in ZONE_INFO_GETTERS]),
+        drift=dict(required=False, type='bool', default=False),
+        cache_file=dict(required=False, type='path'),
+        cache_max_age=dict(required=False, type='int', default=300),
     )
 
     module = AnsibleModule(
         argument_spec=module_args,
         supports_check_mode=True,
+        mutually_exclusive=[['drift', 'cache_file']],
     )
 
+    if module.params['cache_max_age'] <= 0:
+        module.fail_json(msg='cache_max_age must be greater than 0')
+
     firewalld_info = dict()
     result = dict(
         changed=False,
         active_zones=module.params['active_zones'],
+        cached=False,
         collected_zones=list(),
         undefined_zones=list(),
     )
@@ -333,15 +603,27 @@ def main():
     if not HAS_FIREWALLD:
         module.fail_json(msg=missing_required_lib('python-firewall'))
 
+    cache_file = module.params['cache_file']
+    fingerprint = None
+
     try:
         client = fw_client.FirewallClient()
 
+        if cache_file:
+            fingerprint = get_fingerprint(client, module.params)
+            cached_result = read_cache(cache_file, fingerprint, module.params['cache_max_age'])
+            if cached_result is not None:
+                result.update(cached_result)
+                result['cached'] = True
+                module.exit_json(**result)
+
         # Gather general information of firewalld.
         firewalld_info['version'] = get_version()
         firewalld_info['default_zone'] = get_default_zone(client)
 
         # Gather information for zones.
         zones_info = dict()
+        zones_drift = dict()
         collect_zones = list()
         ignore_zones = list()
         if module.params['active_zones']:
@@ -358,28 +640,26 @@ def main():
 
         for zone in collect_zones:
             # Gather settings for each zone based on the output of
-            # 'firewall-cmd --info-zone=<ZONE>' command.
-            zone_info = dict()
+            # 'firewall-cmd --info-zone=<ZONE>' command. All settings of a
+            # zone are fetched with one call, only the requested ones are kept.
             zone_settings = get_zone_settings(client, zone)
-            zone_info['target'] = get_zone_target(zone_settings)
-            zone_info['icmp_block_inversion'] = get_zone_icmp_block_inversion(zone_settings)
-            zone_info['interfaces'] = get_zone_interfaces(zone_settings)
-            zone_info['sources'] = get_zone_sources(zone_settings)
-            zone_info['services'] = get_zone_services(zone_settings)
-            zone_info['ports'] = get_zone_ports(zone_settings)
-            zone_info['protocols'] = get_zone_protocols(zone_settings)
-            zone_info['masquerade'] = get_zone_masquerade(zone_settings)
-            zone_info['forward_ports'] = get_zone_forward_ports(zone_settings)
-            zone_info['source_ports'] = get_zone_source_ports(zone_settings)
-            zone_info['icmp_blocks'] = get_zone_icmp_blocks(zone_settings)
-            zone_info['rich_rules'] = get_zone_rich_rules(zone_settings)
-
-            # The 'forward' parameter supports on python-firewall 0.9.0(or later).
-            if StrictVersion(firewalld_info['version']) >= StrictVersion('0.9.0'):
-                zone_info['forward'] = get_zone_forward(zone_settings)
-
-            zones_info[zone] = zone_info
+            zones_info[zone] = get_zone_info(zone_settings, module.params['gather_subset'], firewalld_info['version'])
+
+            if module.params['drift']:
+                try:
+                    permanent_settings = get_permanent_zone_settings(client, zone)
+                except dbus.exceptions.DBusException as e:
+                    # Anything else than a zone removed from the permanent
+                    # configuration, e.g. missing permissions, is an error
+                    if not is_invalid_zone_error(e):
+                        raise
+                    zones_drift[zone] = dict(permanent_missing=True)
+                    continue
+                permanent_info = get_zone_info(permanent_settings, module.params['gather_subset'], firewalld_info['version'])
+                zones_drift[zone] = get_zone_drift(zones_info[zone], permanent_info)
         firewalld_info['zones'] = zones_info
+        if module.params['drift']:
+            firewalld_info['drift'] = zones_drift
     except AttributeError as e:
         module.fail_json(msg=('firewalld probably not be running, Or the following method '
                               'is not supported with your python-firewall version. (Error: %s)') % to_native(e))
@@ -388,9 +668,17 @@ def main():
                               ' You may need to run as the root user or'
                               ' use become. (Error: %s)' % to_native(e)))
 
-    result['collected_zones'] = collect_zones
+    result['collected_zones'] = list(collect_zones)
     result['undefined_zones'] = ignore_zones
     result['firewalld_info'] = firewalld_info
+
+    if cache_file and not module.check_mode:
+        write_cache(module, cache_file, fingerprint, _to_json_data(dict(
+            collected_zones=result['collected_zones'],
+            undefined_zones=result['undefined_zones'],
+            firewalld_info=result['firewalld_info'],
+        )))
+
     module.exit_json(**result)
 
 
@@ -0,0 +1,478 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: firewalld_ipset
+short_description: Manage firewalld ipsets and their entries
+description:
+  - This module creates and removes firewalld ipsets and manages their entries in either running or permanent firewalld rules.
+  - The entries of an ipset are read once, the entries to add and to remove are computed as set differences
+    and the result is written back with a single call, so ipsets with tens of thousands of entries can be managed efficiently.
+version_added: 3.0.0
+options:
+  name:
+    description:
+      - Name of the ipset.
+    type: str
+    required: true
+  state:
+    description:
+      - If V(present), the ipset is created if needed and the entries are added to it.
+      - If V(absent) and O(entries) or O(entries_file) are given, the entries are removed from the ipset.
+      - If V(absent) and no entries are given, the ipset is removed. This is only possible in the permanent configuration.
+    type: str
+    choices: [ absent, present ]
+    default: present
+  type:
+    description:
+      - The type of the ipset, for example V(hash:ip), V(hash:net) or V(hash:mac).
+      - Required to create an ipset.
+      - See C(firewall-cmd --get-ipset-types) for the supported types.
+    type: str
+  ipset_options:
+    description:
+      - Options of the ipset.
+      - Options that are not given are left as they are.
+    type: dict
+    suboptions:
+      family:
+        description:
+          - The address family of the entries.
+        type: str
+        choices: [ inet, inet6 ]
+      hashsize:
+        description:
+          - The initial hash size of the ipset.
+        type: int
+      maxelem:
+        description:
+          - The maximal number of entries of the ipset.
+        type: int
+      timeout:
+        description:
+          - The timeout in seconds of the entries. Ipsets with a timeout only have runtime entries.
+        type: int
+  entries:
+    description:
+      - Entries of the ipset.
+    type: list
+    elements: str
+  entries_file:
+    description:
+      - Path of a file on the managed node with the entries of the ipset, one entry per line.
+      - Empty lines and lines starting with C(#) are ignored.
+      - Use this for long lists, so that they are not passed as module arguments.
+    type: path
+  purge:
+    description:
+      - Only used with O(state=present).
+      - If V(true), remove every entry of the ipset that is not listed in O(entries) or O(entries_file),
+        i.e. replace the entries of the ipset.
+    type: bool
+    default: false
+  permanent:
+    description:
+      - Whether to apply this change to the permanent firewalld configuration.
+      - As of Ansible 2.3, permanent operations can operate on firewalld configs when it is not running (requires firewalld >= 0.3.9).
+      - Note that if this is V(false), O(immediate) defaults to V(true).
+    type: bool
+    default: false
+  immediate:
+    description:
+      - Whether to apply this change to the runtime firewalld configuration.
+      - Defaults to V(true) if O(permanent=false).
+    type: bool
+    default: false
+  offline:
+    description:
+      - Ignores O(immediate) if O(permanent=true) and firewalld is not running.
+    type: bool
+    default: false
+  perf:
+    description:
+      - Record the number of calls and the time spent for every firewalld operation and return them as RV(perf).
+    type: bool
+    default: false
+    version_added: 3.0.0
+notes:
+  - Ipsets can only be created and removed in the permanent configuration. A new ipset becomes available in the
+    runtime configuration after firewalld has been reloaded, the module does not reload firewalld.
+  - This module needs C(python-firewall) or C(python3-firewall) on managed nodes.
+    It is usually provided as a subset with C(firewalld) from the OS distributor for the OS default Python interpreter.
+requirements:
+- firewalld >= 0.9.0
+- python-firewall >= 0.9.0
+author:
+- Ansible Project
+'''
+
+EXAMPLES = r'''
+- name: Create a blocklist ipset and load its entries from a file on the managed node
+  ansible.posix.firewalld_ipset:
+    name: blocklist
+    type: hash:net
+    entries_file: /etc/blocklist/networks.txt
+    purge: true
+    permanent: true
+    immediate: true
+
+- name: Add entries to an existing ipset in the runtime configuration
+  ansible.posix.firewalld_ipset:
+    name: blocklist
+    entries:
+      - 192.0.2.0/24
+      - 198.51.100.0/24
+
+- name: Remove an entry from an ipset
+  ansible.posix.firewalld_ipset:
+    name: blocklist
+    entries:
+      - 192.0.2.0/24
+    state: absent
+    permanent: true
+    immediate: true
+
+- name: Remove an ipset
+  ansible.posix.firewalld_ipset:
+    name: blocklist
+    state: absent
+    permanent: true
+'''
+
+RETURN = r'''
+msg:
+  description: Summary of the performed operations.
+  returned: always
+  type: str
+  sample: "Permanent and Non-Permanent(immediate) operation, Changed ipset blocklist: 2 entries added, 1 entries removed"
+added:
+  description:
+    - The number of entries added to the ipset.
+    - Counted for the permanent configuration if its entries were changed, for the runtime configuration otherwise.
+  returned: success
+  type: int
+  sample: 2
+removed:
+  description:
+    - The number of entries removed from the ipset.
+    - Counted for the permanent configuration if its entries were changed, for the runtime configuration otherwise.
+  returned: success
+  type: int
+  sample: 1
+perf:
+  description:
+    - Number of calls and time spent in seconds per firewalld operation.
+    - C(import_time) is the time spent importing the firewall python bindings and connecting to firewalld,
+      C(calls) and C(calls_time) are the totals of C(operations) and C(total_time) is the time since the module started.
+  returned: when O(perf=true)
+  type: dict
+  sample: {
+    "import_time": 0.182214,
+    "operations": {
+      "get_fw_zone_settings": {"count": 1, "time": 0.012051},
+      "get_enabled_settings": {"count": 2, "time": 0.000031},
+      "update_fw_settings": {"count": 1, "time": 0.104483}
+    },
+    "calls": 4,
+    "calls_time": 0.116565,
+    "total_time": 0.311072
+  }
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_native
+from ansible_collections.ansible.posix.plugins.module_utils.firewalld import FirewallTransaction
+
+
+def new_fw_ipset_settings(settings=None):
+    # The firewall python bindings are only imported once FirewallTransaction
+    # has checked that they are available, see connect_fw()
+    from firewall.client import FirewallClientIPSetSettings
+    return FirewallClientIPSetSettings(settings)
+
+
+class IPSetTransaction(FirewallTransaction):
+    """
+    IPSetTransaction
+
+    Reconcile an ipset with the declared type, options and entries. The
+    entries are fetched once per configuration and written back with a
+    single call.
+    """
+
+    def __init__(self, module, action_args=None, desired_state=None, permanent=False, immediate=False,
+                 name=None, ipset_type=None, ipset_options=None, entries=None, purge=False):
+        super(IPSetTransaction, self).__init__(
+            module, action_args=action_args, desired_state=desired_state,
+            permanent=permanent, immediate=immediate,
+            enabled_values=["present"],
+            disabled_values=["absent"])
+
+        self.name = name
+        self.ipset_type = ipset_type
+        self.ipset_options = ipset_options or {}
+        self.entries = entries
+        self.purge = purge
+
+        # (to_add, to_remove) of the permanent and the runtime configuration
+        self.permanent_delta = ([], [])
+        self.immediate_delta = ([], [])
+        self.settings_changed = False
+        self.fw_ipset = None
+        self.fw_ipset_settings = None
+        self.runtime_entries = None
+
+    def get_entries_delta(self, current):
+        """
+        Return the (to_add, to_remove) entry lists that bring the current
+        entries to the declared ones.
+        """
+        if self.entries is None:
+            return ([], [])
+
+        current_set = set(current)
+        if self.desired_state in self.disabled_values:
+            remove_set = set(self.entries)
+            return ([], [entry for entry in current if entry in remove_set])
+
+        to_add = []
+        desired_set = set()
+        for entry in self.entries:
+            if entry not in current_set and entry not in desired_set:
+                to_add.append(entry)
+            desired_set.add(entry)
+        to_remove = [entry for entry in current if entry not in desired_set] if self.purge else []
+        return (to_add, to_remove)
+
+    @staticmethod
+    def apply_entries_delta(current, delta):
+        to_add, to_remove = delta
+        remove_set = set(to_remove)
+        return [entry for entry in current if entry not in remove_set] + to_add
+
+    def get_fw_ipset_settings(self):
+        """
+        Return the ipset object and the permanent settings of the ipset, or
+        (None, None) if it does not exist.
+        """
+        if self.fw_offline:
+            if self.name not in self.fw.config.get_ipsets():
+                return (None, None)
+            fw_ipset = self.fw.config.get_ipset(self.name)
+            return (fw_ipset, new_fw_ipset_settings(list(self.fw.config.get_ipset_config(fw_ipset))))
+
+        if self.name not in self.fw.config().getIPSetNames():
+            return (None, None)
+        fw_ipset = self.fw.config().getIPSetByName(self.name)
+        return (fw_ipset, fw_ipset.getSettings())
+
+    def get_settings_changed(self, fw_ipset_settings):
+        if self.ipset_type and fw_ipset_settings.getType() != self.ipset_type:
+            return True
+        options = fw_ipset_settings.getOptions()
+        return any(options.get(key) != value for key, value in self.ipset_options.items())
+
+    def get_enabled_permanent(self):
+        self.fw_ipset, self.fw_ipset_settings = self.get_fw_ipset_settings()
+
+        if self.fw_ipset is None:
+            # Nothing to remove, or an ipset to create
+            return False
+
+        self.permanent_delta = self.get_entries_delta([str(entry) for entry in self.fw_ipset_settings.getEntries()])
+        if self.desired_state in self.disabled_values:
+            return self.entries is None or bool(self.permanent_delta[1])
+
+        self.settings_changed = self.get_settings_changed(self.fw_ipset_settings)
+        return not (self.settings_changed or self.permanent_delta[0] or self.permanent_delta[1])
+
+    def get_enabled_immediate(self):
+        if self.name not in self.fw.getIPSets():
+            if self.permanent:
+                # A new ipset is only available in the runtime configuration
+                # after a reload, see set_enabled_permanent()
+                return self.desired_state in self.enabled_values
+            self.module.fail_json(msg="ipset %s does not exist in the runtime configuration" % self.name)
+
+        if self.entries is None:
+            return True
+
+        self.runtime_entries = [str(entry) for entry in self.fw.getEntries(self.name)]
+        self.immediate_delta = self.get_entries_delta(self.runtime_entries)
+        if self.desired_state in self.disabled_values:
+            return bool(self.immediate_delta[1])
+        return not (self.immediate_delta[0] or self.immediate_delta[1])
+
+    def set_enabled_permanent(self):
+        if self.fw_ipset is None:
+            if not self.ipset_type:
+                self.module.fail_json(msg="type is required to create ipset %s" % self.name)
+
+            fw_ipset_settings = new_fw_ipset_settings()
+            fw_ipset_settings.setType(self.ipset_type)
+            fw_ipset_settings.setOptions(dict(self.ipset_options))
+            if self.entries:
+                self.permanent_delta = self.get_entries_delta([])
+                fw_ipset_settings.setEntries(self.permanent_delta[0])
+
+            if self.fw_offline:
+                self.fw.config.new_ipset(self.name, fw_ipset_settings.settings)
+            else:
+                self.fw.config().addIPSet(self.name, fw_ipset_settings)
+            self.msgs.append("Created ipset %s, reload firewalld to use it in the runtime configuration" % self.name)
+            return
+
+        entries = self.apply_entries_delta(
+            [str(entry) for entry in self.fw_ipset_settings.getEntries()], self.permanent_delta)
+
+        if self.settings_changed or self.fw_offline:
+            if self.ipset_type:
+                self.fw_ipset_settings.setType(self.ipset_type)
+            options = dict(self.fw_ipset_settings.getOptions())
+            options.update(self.ipset_options)
+            self.fw_ipset_settings.setOptions(options)
+            self.fw_ipset_settings.setEntries(entries)
+            if self.fw_offline:
+                self.fw.config.set_ipset_config(self.fw_ipset, self.fw_ipset_settings.settings)
+            else:
+                self.fw_ipset.update(self.fw_ipset_settings)
+        else:
+            self.fw_ipset.setEntries(entries)
+
+    def set_enabled_immediate(self):
+        self.fw.setEntries(self.name, self.apply_entries_delta(self.runtime_entries, self.immediate_delta))
+
+    def set_disabled_permanent(self):
+        if self.entries is not None:
+            self.set_enabled_permanent()
+        elif self.fw_offline:
+            self.fw.config.remove_ipset(self.fw_ipset)
+        else:
+            self.fw_ipset.remove()
+
+    def set_disabled_immediate(self):
+        self.set_enabled_immediate()
+
+
+def read_entries_file(module, path):
+    try:
+        with open(path) as entries_file:
+            lines = entries_file.readlines()
+    except (IOError, OSError) as e:
+        module.fail_json(msg="Unable to read entries_file %s: %s" % (path, to_native(e)))
+
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            entries.append(line)
+    return entries
+
+
+def main():
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            name=dict(type='str', required=True),
+            state=dict(type='str', default='present', choices=['absent', 'present']),
+            type=dict(type='str'),
+            ipset_options=dict(
+                type='dict',
+                options=dict(
+                    family=dict(type='str', choices=['inet', 'inet6']),
+                    hashsize=dict(type='int'),
+                    maxelem=dict(type='int'),
+                    timeout=dict(type='int'),
+                ),
+            ),
+            entries=dict(type='list', elements='str'),
+            entries_file=dict(type='path'),
+            purge=dict(type='bool', default=False),
+            permanent=dict(type='bool', default=False),
+            immediate=dict(type='bool', default=False),
+            offline=dict(type='bool', default=False),
+            perf=dict(type='bool', default=False),
+        ),
+        supports_check_mode=True,
+        mutually_exclusive=[
+            ['entries', 'entries_file'],
+        ],
+    )
+
+    permanent = module.params['permanent']
+    desired_state = module.params['state']
+    immediate = module.params['immediate']
+    offline = module.params['offline']
+
+    # Sanity checks
+    FirewallTransaction.sanity_check(module)
+    fw_offline = FirewallTransaction.get_fw_offline()
+
+    # `offline`, `immediate`, and `permanent` work like in the firewalld module
+    if offline:
+        if not permanent:
+            module.fail_json(msg='offline cannot be enabled unless permanent changes are allowed')
+        if fw_offline:
+            immediate = False
+
+    if not permanent and not immediate:
+        immediate = True
+
+    if immediate and fw_offline:
+        module.fail_json(msg='firewall is not currently running, unable to perform immediate actions without a running firewall daemon')
+
+    entries = module.params['entries']
+    if module.params['entries_file'] is not None:
+        entries = read_entries_file(module, module.params['entries_file'])
+    if entries is not None:
+        entries = [entry.strip() for entry in entries]
+
+    if desired_state == 'absent' and entries is None and immediate:
+        module.fail_json(msg="Ipsets can only be removed in the permanent configuration. "
+                             "Make sure you didn't set the 'permanent' flag to 'false' or the 'immediate' flag to 'true'.")
+
+    # firewalld stores the option values as strings
+    ipset_options = dict(
+        (key, str(value)) for key, value in (module.params['ipset_options'] or {}).items() if value is not None
+    )
+
+    transaction = IPSetTransaction(
+        module,
+        action_args=(),
+        desired_state=desired_state,
+        permanent=permanent,
+        immediate=immediate,
+        name=module.params['name'],
+        ipset_type=module.params['type'],
+        ipset_options=ipset_options,
+        entries=entries,
+        purge=module.params['purge'],
+    )
+
+    changed, msgs = transaction.run()
+
+    if any(transaction.permanent_delta):
+        to_add, to_remove = transaction.permanent_delta
+    else:
+        to_add, to_remove = transaction.immediate_delta
+    if changed and (to_add or to_remove):
+        msgs.append("Changed ipset %s: %d entries added, %d entries removed" % (module.params['name'], len(to_add), len(to_remove)))
+    elif changed and desired_state == 'absent' and entries is None:
+        msgs.append("Removed ipset %s" % module.params['name'])
+
+    if fw_offline:
+        msgs.append("(offline operation: only on-disk configs were altered)")
+
+    module.exit_json(changed=changed, msg=', '.join(msgs), added=len(to_add), removed=len(to_remove),
+                     **FirewallTransaction.get_perf_result(module))
+
+
+if __name__ == '__main__':
+    main()
@@ -25,8 +25,8 @@ options:
     description:
       - Path to the mount point (e.g. C(/mnt/files)).
       - Before Ansible 2.3 this option was only usable as O(ignore:dest), O(ignore:destfile), and O(name).
+      - Required unless O(mounts) is given.
     type: path
-    required: true
     aliases: [ name ]
   src:
     description:
@@ -75,8 +75,8 @@ options:
       - V(present) only specifies that the device is to be configured in
         I(fstab) and does not trigger or require a mount.
       - V(ephemeral) only specifies that the device is to be mounted, without changing
-        I(fstab). If it is already mounted, a remount will be triggered.
-        This will always return RV(ignore:changed=true). If the mount point O(path)
+        I(fstab). If it is already mounted, a remount will be triggered, unless
+        O(skip_unchanged_remount=true) and O(opts) are already in effect. If the mount point O(path)
         has already a device mounted on, and its source is different than O(src),
         the module will fail to avoid unexpected unmount or mount point override.
         If the mount point is not present, the mount point will be created.
@@ -89,19 +89,20 @@ options:
         V(absent) with a mount point that is not registered in the I(fstab) has
         no effect, use V(unmounted) instead.
       - V(remounted) specifies that the device will be remounted for when you
-        want to force a refresh on the mount itself (added in 2.9). This will
-        always return RV(ignore:changed=true). If O(opts) is set, the options will be
+        want to force a refresh on the mount itself (added in 2.9). If O(opts) is set, the options will be
         applied to the remount, but will not change I(fstab).  Additionally,
         if O(opts) is set, and the remount command fails, the module will
         error to prevent unexpected mount changes.  Try using V(mounted)
         instead to work around this issue.  V(remounted) expects the mount point
         to be present in the I(fstab). To remount a mount point not registered
         in I(fstab), use V(ephemeral) instead, especially with BSD nodes.
+        This will always return RV(ignore:changed=true), unless
+        O(skip_unchanged_remount=true) and the options are already in effect.
       - V(absent_from_fstab) specifies that the device mount's entry will be
         removed from I(fstab). This option does not unmount it or delete the
         mountpoint.
+      - Required with O(path). With O(mounts), the state of the mount points which do not set their own.
     type: str
-    required: true
     choices: [ absent, absent_from_fstab, mounted, present, unmounted, remounted, ephemeral ]
   fstab:
     description:
@@ -132,6 +133,90 @@ options:
         the original file back if you somehow clobbered it incorrectly.
     type: bool
     default: false
+  parallel:
+    description:
+      - Maximum number of mount points of O(mounts) mounted or unmounted at the same time.
+      - Mount points only wait for the ones above (when mounting) or below (when unmounting) them,
+        which speeds up mounting many network filesystems.
+      - On Python 2 without the C(futures) backport the mount points are processed one at a time.
+    type: int
+    default: 1
+    version_added: 3.0.0
+  settle_timeout:
+    description:
+      - Seconds to wait after mounting with O(state=mounted) or O(state=ephemeral) until the mount point appears in
+        the mount table, e.g. when it is mounted asynchronously by an automounter. The module fails if it does not.
+      - On Linux, C(/proc/self/mountinfo) is only read again when the kernel reports a change of the mount table.
+        On other platforms, the mount point is checked every 0.1 seconds.
+      - V(0) does not wait.
+    type: int
+    default: 0
+    version_added: 3.0.0
+  skip_unchanged_remount:
+    description:
+      - Skip the remount of O(state=remounted) and of an already mounted O(state=ephemeral) mount point,
+        and return RV(ignore:changed=false), if the options it would apply are already in effect.
+      - The options of the I(fstab) entry and O(opts) with O(state=remounted), and O(opts) with
+        O(state=ephemeral), are compared with C(/proc/self/mountinfo), e.g. C(defaults) is in effect
+        when the filesystem is mounted read-write without C(nosuid), C(nodev) or C(noexec).
+        Filesystem specific options not shown there as given always cause a remount.
+      - Only applies to Linux, mount points are always remounted on other platforms.
+    type: bool
+    default: false
+    version_added: 3.0.0
+  mounts:
+    description:
+      - A list of mount points to manage in one run instead of O(path).
+      - I(fstab) is read once and, if any entry changed, written once with a single backup
+        before any mount point is mounted or unmounted.
+      - The options of a mount point which are not set default to the options of the same name.
+      - Mount points are unmounted before any is mounted. Mount points below another one in
+        the list are unmounted before and mounted after it, others are processed in the order
+        given, or at the same time, see O(parallel).
+      - A mount point which fails does not stop the others, except the ones below it which are
+        skipped when mounting and the ones above it when unmounting. The module fails after all
+        were processed. The I(fstab) entries of the mount points with O(mounts[].state=mounted)
+        which failed to mount are restored.
+      - Mutually exclusive with O(path).
+    type: list
+    elements: dict
+    version_added: 3.0.0
+    suboptions:
+      path:
+        description:
+          - Path to the mount point.
+        type: path
+        required: true
+        aliases: [ name ]
+      src:
+        description:
+          - Device to be mounted on O(mounts[].path), see O(src).
+        type: path
+      fstype:
+        description:
+          - Filesystem type, see O(fstype).
+        type: str
+      opts:
+        description:
+          - Mount options, see O(opts).
+        type: str
+      dump:
+        description:
+          - Dump, see O(dump).
+        type: str
+      passno:
+        description:
+          - Passno, see O(passno).
+        type: str
+      boot:
+        description:
+          - Whether the filesystem should be mounted on boot, see O(boot).
+        type: bool
+      state:
+        description:
+          - State of the mount point, see O(state).
+        type: str
+        choices: [ absent, absent_from_fstab, mounted, present, unmounted, remounted, ephemeral ]
 notes:
   - As of Ansible 2.3, the O(name) option has been changed to O(path) as
     default, but O(name) still works as well.
@@ -217,18 +302,91 @@ EXAMPLES = r'''
     opts_no_log: true
     fstype: cifs
     state: ephemeral
+
+- name: Mount several NFS volumes, updating fstab only once
+  ansible.posix.mount:
+    fstype: nfs
+    opts: rw,sync,hard
+    state: mounted
+    parallel: 8
+    mounts:
+      - path: /mnt/projects
+        src: 192.168.1.100:/nfs/projects
+      - path: /mnt/scratch
+        src: 192.168.1.100:/nfs/scratch
+        opts: rw,async
+      - path: /mnt/old_share
+        state: absent
+'''
+
+RETURN = r'''
+mounts:
+  description:
+    - The mount points of O(mounts), with the options used and whether they changed.
+    - A mount point which failed has C(failed=true) and the error in C(msg).
+  returned: when O(mounts) is given
+  type: list
+  elements: dict
+  version_added: 3.0.0
+  sample: [
+    {
+      "name": "/mnt/projects",
+      "src": "192.168.1.100:/nfs/projects",
+      "fstype": "nfs",
+      "opts": "rw,sync,hard",
+      "dump": "0",
+      "passno": "0",
+      "boot": "yes",
+      "state": "mounted",
+      "changed": true
+    }
+  ]
+fstab:
+  description: The fstab file used.
+  returned: always
+  type: str
+  sample: /etc/fstab
+backup_file:
+  description: The backup of the fstab file, if O(backup=true) and it changed.
+  returned: always
+  type: str
+  sample: /etc/fstab.1234.2026-10-18@10:00:00~
 '''
 
 import errno
+import heapq
 import os
 import platform
+import stat
+
+try:
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    HAS_FUTURES = True
+except ImportError:
+    # TODO(Python2): Python 2 without the futures backport processes the
+    # mount points one at a time
+    HAS_FUTURES = False
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.ansible.posix.plugins.module_utils.mount import ismount
-from ansible.module_utils.common.text.converters import to_bytes, to_native
+from ansible_collections.ansible.posix.plugins.module_utils.mount import Fstab, LinuxMounts, MountPoints, wait_for_mount
+from ansible.module_utils.common.text.converters import to_bytes, to_native, to_text
+from ansible.module_utils.common.validation import check_required_if
 from ansible.module_utils.parsing.convert_bool import boolean
 
 
+class MountError(Exception):
+    pass
+
+
+def get_bin_path(module, name):
+    """Return the path of the command name, raise MountError if it is not found."""
+
+    bin_path = module.get_bin_path(name)
+    if bin_path is None:
+        raise MountError('Failed to find required executable "%s"' % name)
+    return bin_path
+
+
 def write_fstab(module, lines, path):
 
     if module.params['backup']:
@@ -274,175 +432,38 @@ def set_mount(module, args):
 def _set_mount_save_old(module, args):
     """Set/change a mount point location in fstab. Save the old fstab contents."""
 
-    to_write = []
-    old_lines = []
-    exists = False
-    changed = False
-    escaped_args = dict([(k, _escape_fstab(v)) for k, v in args.items()])
-    new_line = '%(src)s %(name)s %(fstype)s %(opts)s %(dump)s %(passno)s\n'
-
-    if platform.system() == 'SunOS':
-        new_line = (
-            '%(src)s - %(name)s %(fstype)s %(passno)s %(boot)s %(opts)s\n')
-
-    for line in open(args['fstab'], 'r').readlines():
-        # Append newline if the line in fstab does not finished with newline.
-        if not line.endswith('\n'):
-            line += '\n'
-
-        old_lines.append(line)
-
-        if not line.strip():
-            to_write.append(line)
-
-            continue
-
-        if line.strip().startswith('#'):
-            to_write.append(line)
-
-            continue
-
-        fields = line.split('#')[0].split()
-
-        # Check if we got a valid line for splitting
-        # (on Linux the 5th and the 6th field is optional)
-        if (
-                platform.system() == 'SunOS' and len(fields) != 7 or
-                platform.system() == 'Linux' and len(fields) not in [4, 5, 6] or
-                platform.system() not in ['SunOS', 'Linux'] and len(fields) != 6):
-            to_write.append(line)
-
-            continue
-
-        ld = {}
-
-        if platform.system() == 'SunOS':
-            (
-                ld['src'],
-                dash,
-                ld['name'],
-                ld['fstype'],
-                ld['passno'],
-                ld['boot'],
-                ld['opts']
-            ) = fields
-        else:
-            fields_labels = ['src', 'name', 'fstype', 'opts', 'dump', 'passno']
-
-            # The last two fields are optional on Linux so we fill in default values
-            ld['dump'] = 0
-            ld['passno'] = 0
-
-            # Fill in the rest of the available fields
-            for i, field in enumerate(fields):
-                ld[fields_labels[i]] = field
-
-        # Check if we found the correct line
-        if (
-                ld['name'] != escaped_args['name'] or (
-                    # In the case of swap, check the src instead
-                    'src' in args and
-                    ld['name'] == 'none' and
-                    ld['fstype'] == 'swap' and
-                    ld['src'] != args['src'])):
-            to_write.append(line)
-
-            continue
-
-        # If we got here we found a match - let's check if there is any
-        # difference
-        exists = True
-        args_to_check = ('src', 'fstype', 'opts', 'dump', 'passno')
-
-        if platform.system() == 'SunOS':
-            args_to_check = ('src', 'fstype', 'passno', 'boot', 'opts')
-
-        for t in args_to_check:
-            if ld[t] != escaped_args[t]:
-                ld[t] = escaped_args[t]
-                changed = True
-
-        if changed:
-            to_write.append(new_line % ld)
-        else:
-            to_write.append(line)
-
-    if not exists:
-        to_write.append(new_line % escaped_args)
-        changed = True
+    fstab = Fstab(args['fstab'])
+    changed = update_fstab(fstab, args, 'present')
 
     if changed and not module.check_mode:
-        args['backup_file'] = write_fstab(module, to_write, args['fstab'])
+        args['backup_file'] = write_fstab(module, fstab.to_lines(), args['fstab'])
 
-    return (args['name'], old_lines, changed)
+    return (args['name'], fstab.original_lines, changed)
 
 
 def unset_mount(module, args):
     """Remove a mount point from fstab."""
 
-    to_write = []
-    changed = False
-    escaped_name = _escape_fstab(args['name'])
-
-    for line in open(args['fstab'], 'r').readlines():
-        if not line.strip():
-            to_write.append(line)
+    fstab = Fstab(args['fstab'])
+    changed = update_fstab(fstab, args, 'absent')
 
-            continue
+    if changed and not module.check_mode:
+        write_fstab(module, fstab.to_lines(), args['fstab'])
 
-        if line.strip().startswith('#'):
-            to_write.append(line)
+    return (args['name'], changed)
 
-            continue
 
-        # Check if we got a valid line for splitting
-        if (
-                platform.system() == 'SunOS' and len(line.split()) != 7 or
-                platform.system() != 'SunOS' and len(line.split()) != 6):
-            to_write.append(line)
-
-            continue
-
-        ld = {}
-
-        if platform.system() == 'SunOS':
-            (
-                ld['src'],
-                dash,
-                ld['name'],
-                ld['fstype'],
-                ld['passno'],
-                ld['boot'],
-                ld['opts']
-            ) = line.split()
-        else:
-            (
-                ld['src'],
-                ld['name'],
-                ld['fstype'],
-                ld['opts'],
-                ld['dump'],
-                ld['passno']
-            ) = line.split()
+def update_fstab(fstab, args, state):
+    """Apply the fstab part of state for the mount point args to fstab. Return whether it changed."""
 
-        if (
-                ld['name'] != escaped_name or (
-                    # In the case of swap, check the src instead
-                    'src' in args and
-                    ld['name'] == 'none' and
-                    ld['fstype'] == 'swap' and
-                    ld['src'] != args['src'])):
-            to_write.append(line)
-
-            continue
+    if state in ('absent', 'absent_from_fstab'):
+        src = args.get('src')
+        return fstab.remove(_escape_fstab(args['name']), _escape_fstab(src) if src is not None else None)
 
-        # If we got here we found a match - continue and mark changed
-        changed = True
+    if state in ('mounted', 'present'):
+        return fstab.set(dict([(k, _escape_fstab(v)) for k, v in args.items()]))
 
-    if changed and not module.check_mode:
-        write_fstab(module, to_write, args['fstab'])
-
-    return (args['name'], changed)
+    return False
 
 
 def _set_fstab_args(fstab_file):
@@ -480,10 +501,12 @@ def _set_ephemeral_args(args):
     return result
 
 
-def mount(module, args):
+def mount(module, args, state=None):
     """Mount up a path or remount if needed."""
 
-    mount_bin = module.get_bin_path('mount', required=True)
+    state = state or module.params['state']
+
+    mount_bin = get_bin_path(module, 'mount')
     name = args['name']
     cmd = [mount_bin]
 
@@ -491,15 +514,14 @@ def mount(module, args):
         # Use module.params['fstab'] here as args['fstab'] has been set to the
         # default value.
         if module.params['fstab'] is not None:
-            module.fail_json(
-                msg=(
-                    'OpenBSD does not support alternate fstab files. Do not '
-                    'specify the fstab parameter for OpenBSD hosts'))
+            raise MountError(
+                'OpenBSD does not support alternate fstab files. Do not '
+                'specify the fstab parameter for OpenBSD hosts')
     else:
-        if module.params['state'] != 'ephemeral':
+        if state != 'ephemeral':
             cmd += _set_fstab_args(args['fstab'])
 
-    if module.params['state'] == 'ephemeral':
+    if state == 'ephemeral':
         cmd += _set_ephemeral_args(args)
 
     cmd += [name]
@@ -515,7 +537,7 @@ def mount(module, args):
 def umount(module, path):
     """Unmount a path."""
 
-    umount_bin = module.get_bin_path('umount', required=True)
+    umount_bin = get_bin_path(module, 'umount')
     cmd = [umount_bin, path]
 
     rc, out, err = module.run_command(cmd)
@@ -526,19 +548,21 @@ def umount(module, path):
         return rc, out + err
 
 
-def remount(module, args):
+def remount(module, args, state=None):
     """Try to use 'remount' first and fallback to (u)mount if unsupported."""
-    mount_bin = module.get_bin_path('mount', required=True)
+
+    state = state or module.params['state']
+    mount_bin = get_bin_path(module, 'mount')
     cmd = [mount_bin]
 
     # Multiplatform remount opts
     if platform.system().lower().endswith('bsd'):
-        if module.params['state'] == 'remounted' and args['opts'] != 'defaults':
+        if state == 'remounted' and args['opts'] != 'defaults':
             cmd += ['-u', '-o', args['opts']]
         else:
             cmd += ['-u']
     else:
-        if module.params['state'] == 'remounted' and args['opts'] != 'defaults':
+        if state == 'remounted' and args['opts'] != 'defaults':
             cmd += ['-o', 'remount,' + args['opts']]
         else:
             cmd += ['-o', 'remount']
@@ -547,22 +571,21 @@ def remount(module, args):
         # Use module.params['fstab'] here as args['fstab'] has been set to the
         # default value.
         if module.params['fstab'] is not None:
-            module.fail_json(
-                msg=(
-                    'OpenBSD does not support alternate fstab files. Do not '
-                    'specify the fstab parameter for OpenBSD hosts'))
+            raise MountError(
+                'OpenBSD does not support alternate fstab files. Do not '
+                'specify the fstab parameter for OpenBSD hosts')
     else:
-        if module.params['state'] != 'ephemeral':
+        if state != 'ephemeral':
             cmd += _set_fstab_args(args['fstab'])
 
-    if module.params['state'] == 'ephemeral':
+    if state == 'ephemeral':
         cmd += _set_ephemeral_args(args)
 
     cmd += [args['name']]
     out = err = ''
 
     try:
-        if module.params['state'] != 'ephemeral' and platform.system().lower().endswith('bsd'):
+        if state != 'ephemeral' and platform.system().lower().endswith('bsd'):
             # Note: Forcing BSDs to do umount/mount due to BSD remount not
             # working as expected (suspect bug in the BSD mount command)
             # Interested contributor could rework this to use mount options on
@@ -581,19 +604,18 @@ def remount(module, args):
     if rc != 0:
         msg = out + err
 
-        if module.params['state'] == 'remounted' and args['opts'] != 'defaults':
-            module.fail_json(
-                msg=(
-                    'Options were specified with remounted, but the remount '
-                    'command failed. Failing in order to prevent an '
-                    'unexpected mount result. Try replacing this command with '
-                    'a "state: unmounted" followed by a "state: mounted" '
-                    'using the full desired mount options instead.'))
+        if state == 'remounted' and args['opts'] != 'defaults':
+            raise MountError(
+                'Options were specified with remounted, but the remount '
+                'command failed. Failing in order to prevent an '
+                'unexpected mount result. Try replacing this command with '
+                'a "state: unmounted" followed by a "state: mounted" '
+                'using the full desired mount options instead.')
 
         rc, msg = umount(module, args['name'])
 
         if rc == 0:
-            rc, msg = mount(module, args)
+            rc, msg = mount(module, args, state)
 
     return rc, msg
 
@@ -628,7 +650,7 @@ def is_bind_mounted(module, linux_mounts, dest, src=None, fstype=None):
                 is_mounted = linux_mounts[dest]['src'] == src
 
     else:
-        bin_path = module.get_bin_path('mount', required=True)
+        bin_path = get_bin_path(module, 'mount')
         cmd = '%s -l' % bin_path
         rc, out, err = module.run_command(cmd)
         mounts = []
@@ -655,104 +677,80 @@ def get_linux_mounts(module, mntinfo_file="/proc/self/mountinfo"):
     """Gather mount information"""
 
     try:
-        f = open(mntinfo_file)
+        return LinuxMounts.from_file(mntinfo_file)
     except IOError:
         return
 
-    lines = map(str.strip, f.readlines())
 
-    try:
-        f.close()
-    except IOError:
-        module.fail_json(msg="Cannot close file %s" % mntinfo_file)
+# The directories of the udev links of the devices by fstab source tag
+SOURCE_TAG_DIRS = {
+    'UUID': '/dev/disk/by-uuid',
+    'LABEL': '/dev/disk/by-label',
+    'PARTUUID': '/dev/disk/by-partuuid',
+    'PARTLABEL': '/dev/disk/by-partlabel',
+}
 
-    mntinfo = {}
 
-    for line in lines:
-        fields = line.split()
-
-        record = {
-            'id': int(fields[0]),
-            'parent_id': int(fields[1]),
-            'root': fields[3],
-            'dst': fields[4],
-            'opts': fields[5],
-            'fs': fields[-3],
-            'src': fields[-2]
-        }
-
-        mntinfo[record['id']] = record
+def _udev_encode(value):
+    """Encode value like udev does for the names of the /dev/disk/by-* links."""
+    return ''.join(
+        c if c.isalnum() or c in '#+-.:=@_' else ''.join('\\x%02x' % b for b in bytearray(c.encode('utf-8')))
+        for c in to_text(value)
+    )
 
-    mounts = {}
 
-    for mnt in mntinfo.values():
-        if mnt['parent_id'] != 1 and mnt['parent_id'] in mntinfo:
-            m = mntinfo[mnt['parent_id']]
-            if (
-                    len(m['root']) > 1 and
-                    mnt['root'].startswith("%s/" % m['root'])):
-                # Omit the parent's root in the child's root
-                # == Example:
-                # 140 136 253:2 /rootfs / rw - ext4 /dev/sdb2 rw
-                # 141 140 253:2 /rootfs/tmp/aaa /tmp/bbb rw - ext4 /dev/sdb2 rw
-                # == Expected result:
-                # src=/tmp/aaa
-                mnt['root'] = mnt['root'][len(m['root']):]
-
-            # Prepend the parent's dst to the child's root
-            # == Example:
-            # 42 60 0:35 / /tmp rw - tmpfs tmpfs rw
-            # 78 42 0:35 /aaa /tmp/bbb rw - tmpfs tmpfs rw
-            # == Expected result:
-            # src=/tmp/aaa
-            if m['dst'] != '/':
-                mnt['root'] = "%s%s" % (m['dst'], mnt['root'])
-            src = mnt['root']
-        else:
-            src = mnt['src']
+def get_source_device(src):
+    """
+    Return the device number 'major:minor' of the block device src, given as
+    a path, e.g. a /dev/disk/by-* link, or as a UUID=, LABEL=, PARTUUID= or
+    PARTLABEL= tag. Return None if src isn't a block device.
+    """
+    tag, sep, value = src.partition('=')
+    if sep and tag in SOURCE_TAG_DIRS:
+        src = os.path.join(SOURCE_TAG_DIRS[tag], _udev_encode(value.strip('"')))
 
-        record = {
-            'dst': mnt['dst'],
-            'src': src,
-            'opts': mnt['opts'],
-            'fs': mnt['fs']
-        }
+    try:
+        st = os.stat(src)
+    except (OSError, ValueError):
+        return None
+    if not stat.S_ISBLK(st.st_mode):
+        return None
+    return '%d:%d' % (os.major(st.st_rdev), os.minor(st.st_rdev))
 
-        mounts[mnt['dst']] = record
 
-    return mounts
+def _is_same_mount_src(module, src, mountpoint, linux_mounts, mount_points=None):
+    """Return True if the mounted fs on mountpoint is the same source than src. Return False if mountpoint is not a mountpoint"""
+    mount_points = mount_points or MountPoints()
 
+    if platform.system() == 'Linux' and linux_mounts is not None:
+        # The mount information tells the source and the device of the
+        # filesystem, the source of bind mounts being the bound directory.
+        mnt = linux_mounts.get(mountpoint)
+        if mnt is None:
+            return False
+        if src == mnt['src'] or src == mnt['source']:
+            return True
+        # Resolve device paths, links and tags to the device number
+        device = get_source_device(src)
+        return device is not None and device == mnt['device']
 
-def _is_same_mount_src(module, src, mountpoint, linux_mounts):
-    """Return True if the mounted fs on mountpoint is the same source than src. Return False if mountpoint is not a mountpoint"""
     # If the provided mountpoint is not a mountpoint, don't waste time
     if (
-            not ismount(mountpoint) and
+            not mount_points.ismount(mountpoint) and
             not is_bind_mounted(module, linux_mounts, mountpoint)):
         return False
 
-    # Treat Linux bind mounts
-    if platform.system() == 'Linux' and linux_mounts is not None:
-        # For Linux bind mounts only: the mount command does not return
-        # the actual source for bind mounts, but the device of the source.
-        # is_bind_mounted() called with the 'src' parameter will return True if
-        # the mountpoint is a bind mount AND the source FS is the same than 'src'.
-        # is_bind_mounted() is not reliable on Solaris, NetBSD and OpenBSD.
-        # But we can rely on 'mount -v' on all other platforms, and Linux non-bind mounts.
-        if is_bind_mounted(module, linux_mounts, mountpoint, src):
-            return True
-
     # mount with parameter -v has a close behavior on Linux, *BSD, SunOS
     # Requires -v with SunOS. Without -v, source and destination are reversed
     # Output format differs from a system to another, but field[0:3] are consistent: [src, 'on', dest]
-    cmd = '%s -v' % module.get_bin_path('mount', required=True)
+    cmd = '%s -v' % get_bin_path(module, 'mount')
     rc, out, err = module.run_command(cmd)
     mounts = []
 
     if len(out):
         mounts = to_native(out).strip().split('\n')
     else:
-        module.fail_json(msg="Unable to retrieve mount info with command '%s'" % cmd)
+        raise MountError("Unable to retrieve mount info with command '%s'" % cmd)
 
     for mnt in mounts:
         fields = mnt.split()
@@ -764,31 +762,150 @@ def _is_same_mount_src(module, src, mountpoint, linux_mounts):
     return False
 
 
-def main():
-    module = AnsibleModule(
-        argument_spec=dict(
-            boot=dict(type='bool', default=True),
-            dump=dict(type='str', default='0'),
-            fstab=dict(type='str'),
-            fstype=dict(type='str'),
-            path=dict(type='path', required=True, aliases=['name']),
-            opts=dict(type='str'),
-            opts_no_log=dict(type='bool', default=False),
-            passno=dict(type='str', no_log=False, default='0'),
-            src=dict(type='path'),
-            backup=dict(type='bool', default=False),
-            state=dict(type='str', required=True, choices=['absent', 'absent_from_fstab', 'mounted', 'present', 'unmounted', 'remounted', 'ephemeral']),
-        ),
-        supports_check_mode=True,
-        required_if=(
-            ['state', 'mounted', ['src', 'fstype']],
-            ['state', 'present', ['src', 'fstype']],
-            ['state', 'ephemeral', ['src', 'fstype']]
-        ),
+# The mount flags set by the filesystem independent mount options of mount(8),
+# as option: (flag, value)
+MOUNT_FLAG_OPTS = {
+    'ro': ('ro', True),
+    'rw': ('ro', False),
+    'nosuid': ('nosuid', True),
+    'suid': ('nosuid', False),
+    'nodev': ('nodev', True),
+    'dev': ('nodev', False),
+    'noexec': ('noexec', True),
+    'exec': ('noexec', False),
+    'sync': ('sync', True),
+    'async': ('sync', False),
+    'dirsync': ('dirsync', True),
+    'mand': ('mand', True),
+    'nomand': ('mand', False),
+    'lazytime': ('lazytime', True),
+    'nolazytime': ('lazytime', False),
+    'nodiratime': ('nodiratime', True),
+    'diratime': ('nodiratime', False),
+    'noatime': ('atime', 'noatime'),
+    'relatime': ('atime', 'relatime'),
+    'strictatime': ('atime', 'strictatime'),
+}
+
+# The mount options implied by 'defaults'
+DEFAULTS_MOUNT_OPTS = ('rw', 'suid', 'dev', 'exec', 'async')
+
+# The mount options which don't change a mounted filesystem
+IGNORED_MOUNT_OPTS = frozenset((
+    'defaults', 'remount', 'bind', 'rbind', 'auto', 'noauto', 'nofail', '_netdev',
+    'user', 'nouser', 'users', 'owner', 'noowner', 'group', 'nogroup',
+))
+
+
+def parse_mount_opts(opts):
+    """
+    Return (flags, fs_opts) of the comma separated mount options opts: the
+    mount flags they set, see MOUNT_FLAG_OPTS, and the filesystem specific
+    options by name, with None as value of options without one. Later
+    options override earlier ones, like with mount(8).
+    """
+    flags = {}
+    fs_opts = {}
+    for opt in opts.split(','):
+        if opt == 'defaults':
+            flags.update(MOUNT_FLAG_OPTS[default] for default in DEFAULTS_MOUNT_OPTS)
+        elif opt in MOUNT_FLAG_OPTS:
+            flag, value = MOUNT_FLAG_OPTS[opt]
+            flags[flag] = value
+        elif opt and opt not in IGNORED_MOUNT_OPTS and not opt.startswith(('x-', 'comment=')):
+            key, sep, value = opt.partition('=')
+            fs_opts[key] = value if sep else None
+    return flags, fs_opts
+
+
+def _normalize_opt_value(value):
+    """Return value as a number if it is one, sizes with a k, m, g or t suffix in bytes."""
+    if value is None or not value[:-1].isdigit():
+        return value
+    suffix = value[-1].lower()
+    if suffix.isdigit():
+        return int(value)
+    if suffix in 'kmgt':
+        return int(value[:-1]) * 1024 ** ('kmgt'.index(suffix) + 1)
+    return value
+
+
+def mount_opts_differ(mnt, opts):
+    """
+    Return whether mounting with the options opts would change the options
+    of the mount mnt of get_linux_mounts(), i.e. its mount options and its
+    filesystem options. Filesystem options which aren't shown in the mount
+    information, or not the way they are given, count as changed.
+    """
+    mount_flags, dummy = parse_mount_opts(mnt['opts'])
+    super_flags, super_opts = parse_mount_opts(mnt['super_opts'])
+
+    # Flags not shown are not set, access times are updated strictly unless
+    # noatime or relatime is shown
+    current = dict((flag, False) for flag, value in MOUNT_FLAG_OPTS.values() if value is True)
+    current['atime'] = 'strictatime'
+    current.update(super_flags)
+    current.update(mount_flags)
+    current['ro'] = mount_flags.get('ro', False) or super_flags.get('ro', False)
+
+    flags, fs_opts = parse_mount_opts(opts)
+    if any(current[flag] != value for flag, value in flags.items()):
+        return True
+    return any(
+        key not in super_opts or _normalize_opt_value(super_opts[key]) != _normalize_opt_value(value)
+        for key, value in fs_opts.items()
     )
 
-    if module.params['opts_no_log']:
-        module.no_log_values.add(module.params['opts'])
+
+def is_remount_needed(args, state, fstab, linux_mounts):
+    """
+    Return whether remounting the mount point args in state would change its
+    options. The remount of state remounted applies the options of the fstab
+    entry, if any, and then opts. Without the mount information of Linux the
+    remount is always needed.
+    """
+    if platform.system() != 'Linux' or not linux_mounts:
+        return True
+    mnt = linux_mounts.get(args['name'])
+    if mnt is None:
+        return True
+
+    opts = []
+    if state == 'remounted' and fstab is not None:
+        opts += [entry.opts for entry in fstab.find(_escape_fstab(args['name']))]
+    if args['opts'] != 'defaults':
+        opts.append(args['opts'])
+    return mount_opts_differ(mnt, ','.join(opts))
+
+
+MOUNT_STATES = ['absent', 'absent_from_fstab', 'mounted', 'present', 'unmounted', 'remounted', 'ephemeral']
+
+# States which mount, processed parents first, see manage_mounts()
+MOUNTING_STATES = ('mounted', 'ephemeral', 'remounted')
+
+# States which change fstab
+FSTAB_STATES = ('absent', 'absent_from_fstab', 'mounted', 'present')
+
+# The requirements of the states, see check_required_if()
+MOUNT_REQUIRED_IF = (
+    ['state', 'mounted', ['src', 'fstype']],
+    ['state', 'present', ['src', 'fstype']],
+    ['state', 'ephemeral', ['src', 'fstype']]
+)
+
+# Options of an item of mounts, defaulting to the option of the same name
+MOUNT_ITEM_OPTIONS = ('path', 'src', 'fstype', 'opts', 'dump', 'passno', 'boot', 'state')
+
+EPHEMERAL_SRC_DIFFERS_MSG = (
+    'Ephemeral mount point is already mounted with a different '
+    'source than the specified one. Failing in order to prevent an '
+    'unwanted unmount or override operation. Try replacing this command with '
+    'a "state: unmounted" followed by a "state: ephemeral", or use '
+    'a different destination path.')
+
+
+def get_mount_args(module, params):
+    """Return the args of the mount point params, with the defaults of the platform."""
 
     # solaris args:
     #   name, src, fstype, opts, boot, passno, state, fstab=/etc/vfstab
@@ -798,17 +915,17 @@ def main():
     # explicitly specified it in mount() and remount()
     if platform.system().lower() == 'sunos':
         args = dict(
-            name=module.params['path'],
+            name=params['path'],
             opts='-',
             passno='-',
             fstab=module.params['fstab'],
-            boot='yes' if module.params['boot'] else 'no',
+            boot='yes' if params['boot'] else 'no',
         )
         if args['fstab'] is None:
             args['fstab'] = '/etc/vfstab'
     else:
         args = dict(
-            name=module.params['path'],
+            name=params['path'],
             opts='defaults',
             dump='0',
             passno='0',
@@ -823,45 +940,89 @@ def main():
             args['opts'] = 'rw'
 
     args['backup_file'] = ""
-    linux_mounts = []
-
-    # Cache all mounts here in order we have consistent results if we need to
-    # call is_bind_mounted() multiple times
-    if platform.system() == 'Linux':
-        linux_mounts = get_linux_mounts(module)
-
-        if linux_mounts is None:
-            module.warn('Cannot open file /proc/self/mountinfo. Bind mounts might be misinterpreted.')
 
     # Override defaults with user specified params
-    for key in ('src', 'fstype', 'passno', 'opts', 'dump', 'fstab'):
-        if module.params[key] is not None:
-            args[key] = module.params[key]
+    for key in ('src', 'fstype', 'passno', 'opts', 'dump'):
+        if params[key] is not None:
+            args[key] = params[key]
+    if module.params['fstab'] is not None:
+        args['fstab'] = module.params['fstab']
     if platform.system().lower() == 'linux' or platform.system().lower().endswith('bsd'):
         # Linux, FreeBSD, NetBSD and OpenBSD have 'noauto' as mount option to
         # handle mount on boot.  To avoid mount option conflicts, if 'noauto'
         # specified in 'opts',  mount module will ignore 'boot'.
         opts = args['opts'].split(',')
-        if module.params['boot'] and 'noauto' in opts:
+        if params['boot'] and 'noauto' in opts:
             module.warn("Ignore the 'boot' due to 'opts' contains 'noauto'.")
-        elif not module.params['boot']:
+        elif not params['boot']:
             args['boot'] = 'no'
             opts.append('noauto')
             args['opts'] = ','.join(opts)
 
-    # If fstab file does not exist, we first need to create it. This mainly
-    # happens when fstab option is passed to the module.
-    # If state is 'ephemeral', we do not need fstab file
-    if module.params['state'] != 'ephemeral':
-        if not os.path.exists(args['fstab']):
-            if not os.path.exists(os.path.dirname(args['fstab'])):
-                os.makedirs(os.path.dirname(args['fstab']))
+    return args
+
+
+def create_fstab(module, path):
+    """Create the fstab file path if it does not exist."""
+
+    # This mainly happens when fstab option is passed to the module.
+    if not os.path.exists(path):
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        try:
+            open(path, 'a').close()
+        except PermissionError as e:
+            module.fail_json(msg="Failed to open %s due to permission issue" % path)
+        except Exception as e:
+            module.fail_json(msg="Failed to open %s due to %s" % (path, to_native(e)))
+
+
+def make_mount_point(name):
+    """
+    Create the directory name like mkdir -p. Return the created directories
+    so the change can be undone.
+    """
+
+    dirs_created = []
+    # Something like mkdir -p but with the possibility to undo.
+    # Based on some copy-paste from the "file" module.
+    curpath = ''
+    for dirname in name.strip('/').split('/'):
+        curpath = '/'.join([curpath, dirname])
+        # Remove leading slash if we're creating a relative path
+        if not os.path.isabs(name):
+            curpath = curpath.lstrip('/')
+
+        b_curpath = to_bytes(curpath, errors='surrogate_or_strict')
+        if not os.path.exists(b_curpath):
             try:
-                open(args['fstab'], 'a').close()
-            except PermissionError as e:
-                module.fail_json(msg="Failed to open %s due to permission issue" % args['fstab'])
-            except Exception as e:
-                module.fail_json(msg="Failed to open %s due to %s" % (args['fstab'], to_native(e)))
+                os.mkdir(b_curpath)
+                dirs_created.append(b_curpath)
+            except OSError as ex:
+                # Possibly something else created the dir since the os.path.exists
+                # check above. As long as it's a dir, we don't need to error out.
+                if not (ex.errno == errno.EEXIST and os.path.isdir(b_curpath)):
+                    raise
+    return dirs_created
+
+
+def remove_mount_point(dirs_created):
+    try:
+        for dirname in dirs_created[::-1]:
+            os.rmdir(dirname)
+    except Exception:
+        pass
+
+
+def apply_mount_state(module, args, state, fstab_changed, linux_mounts, fstab=None, mount_points=None):
+    """
+    Bring the mount point args into state, once its fstab entry has been
+    updated. fstab_changed tells whether the entry changed, fstab is the
+    Fstab as written, if read. mount_points are the MountPoints of the run.
+
+    Returns (changed, error, dirs_created), error being None on success and
+    dirs_created the directories created for the mount point.
+    """
 
     # absent:
     #   Remove from fstab and unmounted.
@@ -875,141 +1036,396 @@ def main():
     # ephemeral:
     #   Do not change fstab state, but mount.
 
-    state = module.params['state']
-    name = module.params['path']
-    changed = False
-
-    if state == 'absent_from_fstab':
-        name, changed = unset_mount(module, args)
-    elif state == 'absent':
-        name, changed = unset_mount(module, args)
+    name = args['name']
+    changed = fstab_changed
+    dirs_created = []
+    mount_points = mount_points or MountPoints()
+    skip_remount = module.params['skip_unchanged_remount']
 
+    if state == 'absent':
         if changed and not module.check_mode:
-            if ismount(name) or is_bind_mounted(module, linux_mounts, name):
+            if mount_points.ismount(name) or is_bind_mounted(module, linux_mounts, name):
                 res, msg = umount(module, name)
 
                 if res:
-                    module.fail_json(
-                        msg="Error unmounting %s: %s" % (name, msg))
+                    return changed, "Error unmounting %s: %s" % (name, msg), dirs_created
 
             if os.path.exists(name):
                 try:
                     os.rmdir(name)
                 except (OSError, IOError) as e:
-                    module.fail_json(msg="Error rmdir %s: %s" % (name, to_native(e)))
+                    return changed, "Error rmdir %s: %s" % (name, to_native(e)), dirs_created
     elif state == 'unmounted':
-        if ismount(name) or is_bind_mounted(module, linux_mounts, name):
+        if mount_points.ismount(name) or is_bind_mounted(module, linux_mounts, name):
             if not module.check_mode:
                 res, msg = umount(module, name)
 
                 if res:
-                    module.fail_json(
-                        msg="Error unmounting %s: %s" % (name, msg))
+                    return changed, "Error unmounting %s: %s" % (name, msg), dirs_created
 
             changed = True
     elif state == 'mounted' or state == 'ephemeral':
-        dirs_created = []
         if not os.path.exists(name) and not module.check_mode:
             try:
-                # Something like mkdir -p but with the possibility to undo.
-                # Based on some copy-paste from the "file" module.
-                curpath = ''
-                for dirname in name.strip('/').split('/'):
-                    curpath = '/'.join([curpath, dirname])
-                    # Remove leading slash if we're creating a relative path
-                    if not os.path.isabs(name):
-                        curpath = curpath.lstrip('/')
-
-                    b_curpath = to_bytes(curpath, errors='surrogate_or_strict')
-                    if not os.path.exists(b_curpath):
-                        try:
-                            os.mkdir(b_curpath)
-                            dirs_created.append(b_curpath)
-                        except OSError as ex:
-                            # Possibly something else created the dir since the os.path.exists
-                            # check above. As long as it's a dir, we don't need to error out.
-                            if not (ex.errno == errno.EEXIST and os.path.isdir(b_curpath)):
-                                raise
-
+                dirs_created = make_mount_point(name)
             except (OSError, IOError) as e:
-                module.fail_json(
-                    msg="Error making dir %s: %s" % (name, to_native(e)))
+                return changed, "Error making dir %s: %s" % (name, to_native(e)), dirs_created
 
-        # ephemeral: completely ignore fstab
-        if state != 'ephemeral':
-            name, backup_lines, changed = _set_mount_save_old(module, args)
-        else:
-            name, backup_lines, changed = args['name'], [], False
         res = 0
 
         if (
-                ismount(name) or
+                mount_points.ismount(name) or
                 is_bind_mounted(
                     module, linux_mounts, name, args['src'], args['fstype'])):
             if changed and not module.check_mode:
-                res, msg = remount(module, args)
+                res, msg = remount(module, args, state)
                 changed = True
 
             # When 'state' == 'ephemeral', we don't know what is in fstab, and 'changed' is always False
             if state == 'ephemeral':
                 # If state == 'ephemeral', check if the mountpoint src == module.params['src']
                 # If it doesn't, fail to prevent unwanted unmount or unwanted mountpoint override
-                if _is_same_mount_src(module, args['src'], args['name'], linux_mounts):
+                if not _is_same_mount_src(module, args['src'], args['name'], linux_mounts, mount_points):
+                    return changed, EPHEMERAL_SRC_DIFFERS_MSG, dirs_created
+                if not skip_remount or is_remount_needed(args, state, fstab, linux_mounts):
                     changed = True
                     if not module.check_mode:
-                        res, msg = remount(module, args)
-                else:
-                    module.fail_json(
-                        msg=(
-                            'Ephemeral mount point is already mounted with a different '
-                            'source than the specified one. Failing in order to prevent an '
-                            'unwanted unmount or override operation. Try replacing this command with '
-                            'a "state: unmounted" followed by a "state: ephemeral", or use '
-                            'a different destination path.'))
+                        res, msg = remount(module, args, state)
 
         else:
             # If not already mounted, mount it
             changed = True
 
             if not module.check_mode:
-                res, msg = mount(module, args)
+                res, msg = mount(module, args, state)
 
         if res:
-            # Not restoring fstab after a failed mount was reported as a bug,
-            # ansible/ansible#59183
-            # A non-working fstab entry may break the system at the reboot,
-            # so undo all the changes if possible.
-            try:
-                if state != 'ephemeral':
-                    write_fstab(module, backup_lines, args['fstab'])
-            except Exception:
-                pass
+            return changed, "Error mounting %s: %s" % (name, msg), dirs_created
 
-            try:
-                for dirname in dirs_created[::-1]:
-                    os.rmdir(dirname)
-            except Exception:
-                pass
-
-            module.fail_json(msg="Error mounting %s: %s" % (name, msg))
-    elif state == 'present':
-        name, changed = set_mount(module, args)
+        settle_timeout = module.params['settle_timeout']
+        if changed and settle_timeout and not module.check_mode and not wait_for_mount(name, settle_timeout):
+            return changed, "%s did not appear in the mount table within %d seconds" % (name, settle_timeout), dirs_created
     elif state == 'remounted':
+        # Remounting a busy filesystem stalls its I/O, skip it if the
+        # options are already in effect
+        if skip_remount and not is_remount_needed(args, state, fstab, linux_mounts):
+            return changed, None, dirs_created
+
         if not module.check_mode:
-            res, msg = remount(module, args)
+            res, msg = remount(module, args, state)
 
             if res:
-                module.fail_json(msg="Error remounting %s: %s" % (name, msg))
+                return True, "Error remounting %s: %s" % (name, msg), dirs_created
 
         changed = True
-    else:
-        module.fail_json(msg='Unexpected position reached')
 
+    return changed, None, dirs_created
+
+
+def get_mount_result(args, **kwargs):
+    """Return the module result of the mount point args."""
+
+    result = dict(args, **kwargs)
     # If the managed node is Solaris, convert the boot value type to Boolean
     #  to match the type of return value with the module argument.
     if platform.system().lower() == 'sunos':
-        args['boot'] = boolean(args['boot'])
-    module.exit_json(changed=changed, **args)
+        result['boot'] = boolean(result['boot'])
+    return result
+
+
+def check_mount_required_if(params):
+    """Raise TypeError if an option required by the state of params is not set."""
+    check_required_if(MOUNT_REQUIRED_IF, dict((key, value) for key, value in params.items() if value is not None))
+
+
+def get_mount_items(module):
+    """Return the mount points of the mounts option, with the options they default to applied."""
+
+    items = []
+    paths = set()
+    for item in module.params['mounts']:
+        params = dict(
+            (key, module.params[key] if item.get(key) is None else item[key])
+            for key in MOUNT_ITEM_OPTIONS
+        )
+        if params['state'] is None:
+            module.fail_json(msg="state is required for mount point %s" % params['path'])
+        try:
+            check_mount_required_if(params)
+        except TypeError as e:
+            module.fail_json(msg="mount point %s: %s" % (params['path'], to_native(e)))
+        if params['path'] in paths:
+            module.fail_json(msg="mount point %s is given more than once in mounts" % params['path'])
+        paths.add(params['path'])
+        if module.params['opts_no_log'] and params['opts']:
+            module.no_log_values.add(params['opts'])
+        items.append(params)
+    return items
+
+
+def get_mount_dependencies(paths, indexes, reverse=False):
+    """
+    Return the dependencies of the mount points paths[i] of indexes, a dict
+    of index -> set of the indexes to process before it.
+
+    The mount points form a tree by their paths, the parent of a mount point
+    being the closest mount point above it. A mount point depends on its
+    parent, or with reverse, on its children.
+    """
+
+    by_path = dict((os.path.normpath(paths[i]), i) for i in indexes)
+    dependencies = dict((i, set()) for i in indexes)
+    for path, i in by_path.items():
+        parent = os.path.dirname(path)
+        while parent and parent != path:
+            j = by_path.get(parent)
+            if j is not None:
+                if reverse:
+                    dependencies[j].add(i)
+                else:
+                    dependencies[i].add(j)
+                break
+            path, parent = parent, os.path.dirname(parent)
+    return dependencies
+
+
+def run_ordered(indexes, dependencies, func, workers):
+    """
+    Call func(i) for every i of indexes once func() succeeded for all of
+    its dependencies, in up to workers threads. func(i) returns whether it
+    succeeded. Indexes are started in ascending order as far as the
+    dependencies allow.
+
+    Returns the indexes for which func() was not called as a dict of index
+    -> index of the dependency which failed.
+    """
+
+    waiting = dict((i, len(dependencies[i])) for i in indexes)
+    dependents = dict((i, []) for i in indexes)
+    for i in indexes:
+        for j in dependencies[i]:
+            dependents[j].append(i)
+    ready = [i for i in indexes if not waiting[i]]
+    heapq.heapify(ready)
+    skipped = {}
+
+    def skip(i, failed):
+        for k in dependents[i]:
+            if k not in skipped:
+                skipped[k] = failed
+                skip(k, failed)
+
+    def finish(i, succeeded):
+        if not succeeded:
+            skip(i, i)
+            return
+        for k in dependents[i]:
+            waiting[k] -= 1
+            if not waiting[k] and k not in skipped:
+                heapq.heappush(ready, k)
+
+    if workers == 1 or not HAS_FUTURES:
+        while ready:
+            i = heapq.heappop(ready)
+            finish(i, func(i))
+        return skipped
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    running = {}
+    try:
+        while ready or running:
+            while ready and len(running) < workers:
+                i = heapq.heappop(ready)
+                running[executor.submit(func, i)] = i
+
+            done, dummy = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=running.get):
+                i = running.pop(future)
+                finish(i, future.result())
+    finally:
+        executor.shutdown(wait=True)
+
+    return skipped
+
+
+def manage_mounts(module, items, linux_mounts):
+    """
+    Bring every mount point of items into its state. fstab is read and, if
+    anything changed, written only once before any mount point is mounted
+    or unmounted.
+
+    Returns (results, backup_file, errors).
+    """
+
+    mounts = [(params['state'], get_mount_args(module, params)) for params in items]
+    fstab = None
+    backup_file = ""
+
+    # If fstab file does not exist, we first need to create it.
+    # If state is 'ephemeral', we do not need fstab file
+    if any(state != 'ephemeral' for state, args in mounts):
+        create_fstab(module, mounts[0][1]['fstab'])
+    # remounted applies the options of the fstab entry
+    skip_remount = module.params['skip_unchanged_remount']
+    if any(state in FSTAB_STATES or (state == 'remounted' and skip_remount) for state, args in mounts):
+        fstab = Fstab(mounts[0][1]['fstab'])
+
+    fstab_changes = [
+        update_fstab(fstab, args, state) if state in FSTAB_STATES else False
+        for state, args in mounts
+    ]
+    if fstab is not None and fstab.changed and not module.check_mode:
+        backup_file = write_fstab(module, fstab.to_lines(), fstab.path)
+
+    results = [None] * len(mounts)
+    errors = []
+    restore = []
+    # Whether paths are mount points, looked up once unless (un)mounted
+    mount_points = MountPoints()
+
+    def apply_state(i):
+        state, args = mounts[i]
+        args['backup_file'] = backup_file if fstab_changes[i] else ""
+        # Errors are reported by the main thread, not by fail_json() in a worker
+        try:
+            changed, error, dirs_created = apply_mount_state(
+                module, args, state, fstab_changes[i], linux_mounts, fstab, mount_points)
+        except MountError as e:
+            changed, error, dirs_created = fstab_changes[i], to_native(e), []
+        # The mount points below it are processed after it, see run_ordered()
+        if (changed or error) and not module.check_mode:
+            mount_points.invalidate(args['name'])
+
+        if error:
+            remove_mount_point(dirs_created)
+            results[i] = get_mount_result(args, state=state, changed=changed, failed=True, msg=error)
+        else:
+            results[i] = get_mount_result(args, state=state, changed=changed)
+        return error is None
+
+    # Mount points are unmounted, children first, before any is mounted,
+    # parents first
+    paths = [args['name'] for state, args in mounts]
+    unmounting = [i for i, (state, args) in enumerate(mounts) if state not in MOUNTING_STATES]
+    mounting = [i for i, (state, args) in enumerate(mounts) if state in MOUNTING_STATES]
+    for indexes, reverse in ((unmounting, True), (mounting, False)):
+        dependencies = get_mount_dependencies(paths, indexes, reverse)
+        skipped = run_ordered(indexes, dependencies, apply_state, module.params['parallel'])
+        for i, failed in skipped.items():
+            state, args = mounts[i]
+            args['backup_file'] = backup_file if fstab_changes[i] else ""
+            results[i] = get_mount_result(
+                args, state=state, changed=False, failed=True,
+                msg="Skipped %s because %s failed" % (args['name'], paths[failed]))
+
+    for i, (state, args) in enumerate(mounts):
+        if results[i].get('failed'):
+            errors.append(results[i]['msg'])
+            if state == 'mounted':
+                restore.append(args['name'])
+
+    if restore and not module.check_mode:
+        # Not restoring fstab after a failed mount was reported as a bug,
+        # ansible/ansible#59183
+        # A non-working fstab entry may break the system at the reboot,
+        # so undo the changes of the mount points which failed if possible.
+        try:
+            restored = Fstab(fstab.path, lines=fstab.original_lines)
+            for (state, args), fstab_changed in zip(mounts, fstab_changes):
+                if fstab_changed and args['name'] not in restore:
+                    update_fstab(restored, args, state)
+            write_fstab(module, restored.to_lines(), fstab.path)
+        except Exception:
+            pass
+
+    return results, backup_file, errors
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            boot=dict(type='bool', default=True),
+            dump=dict(type='str', default='0'),
+            fstab=dict(type='str'),
+            fstype=dict(type='str'),
+            path=dict(type='path', aliases=['name']),
+            opts=dict(type='str'),
+            opts_no_log=dict(type='bool', default=False),
+            passno=dict(type='str', no_log=False, default='0'),
+            src=dict(type='path'),
+            backup=dict(type='bool', default=False),
+            state=dict(type='str', choices=MOUNT_STATES),
+            parallel=dict(type='int', default=1),
+            settle_timeout=dict(type='int', default=0),
+            skip_unchanged_remount=dict(type='bool', default=False),
+            mounts=dict(
+                type='list',
+                elements='dict',
+                options=dict(
+                    path=dict(type='path', required=True, aliases=['name']),
+                    src=dict(type='path'),
+                    fstype=dict(type='str'),
+                    opts=dict(type='str'),
+                    dump=dict(type='str'),
+                    passno=dict(type='str', no_log=False),
+                    boot=dict(type='bool'),
+                    state=dict(type='str', choices=MOUNT_STATES),
+                ),
+            ),
+        ),
+        supports_check_mode=True,
+        required_one_of=[['path', 'mounts']],
+        mutually_exclusive=[['path', 'mounts']],
+        required_by={'path': 'state'},
+    )
+
+    if module.params['opts_no_log']:
+        module.no_log_values.add(module.params['opts'])
+
+    if module.params['parallel'] < 1:
+        module.fail_json(msg="parallel must be at least 1")
+    if module.params['parallel'] > 1 and not HAS_FUTURES:
+        module.warn("parallel requires concurrent.futures, processing the mount points one at a time")
+    if module.params['settle_timeout'] < 0:
+        module.fail_json(msg="settle_timeout must not be negative")
+
+    if module.params['mounts'] is not None:
+        items = get_mount_items(module)
+    else:
+        try:
+            check_mount_required_if(module.params)
+        except TypeError as e:
+            module.fail_json(msg=to_native(e))
+        items = [dict((key, module.params[key]) for key in MOUNT_ITEM_OPTIONS)]
+
+    linux_mounts = []
+
+    # Cache all mounts here in order we have consistent results if we need to
+    # call is_bind_mounted() multiple times
+    if platform.system() == 'Linux':
+        linux_mounts = get_linux_mounts(module)
+
+        if linux_mounts is None:
+            module.warn('Cannot open file /proc/self/mountinfo. Bind mounts might be misinterpreted.')
+
+    results, backup_file, errors = manage_mounts(module, items, linux_mounts)
+
+    if module.params['mounts'] is None:
+        result = results[0]
+        if errors:
+            module.fail_json(msg=result['msg'])
+        del result['state']
+        module.exit_json(**result)
+
+    fstab = results[0]['fstab']
+    for result in results:
+        del result['fstab'], result['backup_file']
+    changed = any(result['changed'] for result in results)
+    if errors:
+        module.fail_json(
+            msg="Error managing mount points: %s" % '; '.join(errors),
+            changed=changed, mounts=results, fstab=fstab, backup_file=backup_file)
+    module.exit_json(changed=changed, mounts=results, fstab=fstab, backup_file=backup_file)
 
 
 if __name__ == '__main__':
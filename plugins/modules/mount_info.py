@@ -0,0 +1,293 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: mount_info
+short_description: Gather information about active and configured mount points
+description:
+  - This module gathers the active mount points from C(/proc/self/mountinfo) and the mount points configured in
+    I(fstab), optionally only the ones matching filters and only some of their fields.
+  - Unlike the C(ansible_mounts) fact, no mounted filesystem is accessed, so hung network filesystems do not block
+    the module.
+version_added: 3.0.0
+options:
+  gather_subset:
+    description:
+      - The information to gather.
+      - V(mounts) gathers the active mount points, which is only supported on Linux.
+      - V(fstab) gathers the mount points configured in I(fstab).
+      - V(all) gathers both, or only the I(fstab) with a warning on other platforms than Linux.
+    type: list
+    elements: str
+    default: [all]
+    choices: [all, mounts, fstab]
+  paths:
+    description:
+      - Only gather the mount points at or below one of these paths.
+    type: list
+    elements: path
+  fstype:
+    description:
+      - Only gather the mount points of these filesystem types.
+    type: list
+    elements: str
+  src:
+    description:
+      - Only gather the mount points of these sources, e.g. devices, network shares or, for bind mounts,
+        the bound directories.
+      - Active mount points match by their source as shown in C(/proc/self/mountinfo) or their bound directory.
+      - The bind mount of a whole filesystem cannot be told from the filesystem mounted and has its source.
+    type: list
+    elements: str
+  fields:
+    description:
+      - The fields to return for every mount point, all by default.
+      - Fields which do not apply to active or configured mount points are not returned for them,
+        see RV(mount_info.mounts) and RV(mount_info.fstab).
+    type: list
+    elements: str
+    choices: [path, src, fstype, opts, device, source, super_opts, dump, passno, boot]
+  fstab:
+    description:
+      - File to use instead of C(/etc/fstab).
+      - This parameter defaults to C(/etc/fstab) or C(/etc/vfstab) on Solaris.
+    type: str
+notes:
+  - C(/proc/self/mountinfo) and I(fstab) are each read once. The source of a bind mount is only worked out for the
+    mount points returned.
+  - Special characters of paths and sources, escaped in C(/proc/self/mountinfo) and I(fstab), are returned unescaped.
+author:
+  - Ansible Project
+'''
+
+EXAMPLES = r'''
+- name: Gather all active and configured mount points
+  ansible.posix.mount_info:
+  register: result
+
+- name: Gather the source and options of the NFS mounts below /srv
+  ansible.posix.mount_info:
+    gather_subset: mounts
+    paths: /srv
+    fstype:
+      - nfs
+      - nfs4
+    fields:
+      - src
+      - opts
+  register: result
+
+- name: Fail if /data is not mounted from its disk
+  ansible.builtin.assert:
+    that:
+      - result.mount_info.mounts['/data'].src == '/dev/sdb1'
+
+- name: Gather where a device is configured to be mounted
+  ansible.posix.mount_info:
+    gather_subset: fstab
+    src: UUID=b3e48f45-f933-4c8e-a700-22a159ec9077
+  register: result
+'''
+
+RETURN = r'''
+mount_info:
+  description: The gathered mount points.
+  returned: success
+  type: complex
+  contains:
+    mounts:
+      description:
+        - The active mount points by path, if gathered.
+        - A mount point mounted over is represented by the last mount on it.
+        - C(src) is the bound directory for the bind mount of a directory and C(source) otherwise.
+        - The fields C(dump), C(passno) and C(boot) are not returned.
+      returned: if O(gather_subset) contains V(mounts) or V(all)
+      type: dict
+      sample: {
+        "/data": {
+          "path": "/data",
+          "src": "/dev/sdb1",
+          "fstype": "xfs",
+          "opts": "rw,relatime",
+          "device": "8:17",
+          "source": "/dev/sdb1",
+          "super_opts": "rw,attr2,inode64"
+        }
+      }
+    fstab:
+      description:
+        - The mount points configured in I(fstab), in the order of the file, if gathered.
+        - C(src) is the source as written in I(fstab). The fields C(device), C(source) and C(super_opts) are not
+          returned. C(dump) is not returned on Solaris, C(boot) only on Solaris.
+      returned: if O(gather_subset) contains V(fstab) or V(all)
+      type: list
+      elements: dict
+      sample: [
+        {
+          "path": "/data",
+          "src": "/dev/sdb1",
+          "fstype": "xfs",
+          "opts": "defaults",
+          "dump": "0",
+          "passno": "0"
+        }
+      ]
+'''
+
+import platform
+import re
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.ansible.posix.plugins.module_utils.mount import Fstab, FstabEntry, LinuxMounts
+from ansible.module_utils.common.text.converters import to_native
+
+
+MOUNTINFO = '/proc/self/mountinfo'
+
+# The octal escapes of special characters, e.g. \040 for a space
+ESCAPE_RE = re.compile(r'\\([0-7]{3})')
+
+# The fields of the active mount points, with their getters from LinuxMount
+MOUNT_FIELD_GETTERS = (
+    ('path', lambda mnt: unescape(mnt.dst)),
+    ('src', lambda mnt: get_mount_src(mnt)),
+    ('fstype', lambda mnt: mnt.fs),
+    ('opts', lambda mnt: mnt.opts),
+    ('device', lambda mnt: mnt.device),
+    ('source', lambda mnt: unescape(mnt.source)),
+    ('super_opts', lambda mnt: mnt.super_opts),
+)
+
+# The fields of the configured mount points, with their getters from FstabEntry
+FSTAB_FIELD_GETTERS = (
+    ('path', lambda entry: unescape(entry.name)),
+    ('src', lambda entry: unescape(entry.src)),
+    ('fstype', lambda entry: entry.fstype),
+    ('opts', lambda entry: entry.opts),
+    ('dump', lambda entry: entry.dump),
+    ('passno', lambda entry: entry.passno),
+    ('boot', lambda entry: entry.boot),
+)
+
+# Every field, see the fields option
+FIELDS = ['path', 'src', 'fstype', 'opts', 'device', 'source', 'super_opts', 'dump', 'passno', 'boot']
+
+
+def unescape(value):
+    """Return value with the octal escapes of mountinfo and fstab replaced."""
+    if value is None or '\\' not in value:
+        return value
+    return ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 8)), value)
+
+
+def get_mount_src(mnt):
+    """
+    Return the source of the LinuxMount mnt: the bound directory if it is the
+    bind mount of a directory, its source otherwise.
+    """
+    if mnt.root == '/':
+        return unescape(mnt.source)
+    return unescape(mnt.src)
+
+
+def match_path(path, paths):
+    """Return whether path is one of paths or below one of them, True if there are none."""
+    return not paths or any(path == prefix or path.startswith(prefix.rstrip('/') + '/') for prefix in paths)
+
+
+def get_record(item, getters, fields):
+    """Return the fields of item as a dict, leaving out the ones without value."""
+    record = dict()
+    for key, getter in getters:
+        if fields and key not in fields:
+            continue
+        value = getter(item)
+        if value is not None:
+            record[key] = value
+    return record
+
+
+def get_mounts(mounts, params):
+    """Return the records of the active mount points of mounts matching the filters of params, by path."""
+    result = dict()
+    for mnt in mounts.values():
+        if params['fstype'] and mnt.fs not in params['fstype']:
+            continue
+        path = unescape(mnt.dst)
+        if not match_path(path, params['paths']):
+            continue
+        # Resolving the bound directory of a bind mount is left for last
+        if params['src'] and unescape(mnt.source) not in params['src'] and get_mount_src(mnt) not in params['src']:
+            continue
+        result[path] = get_record(mnt, MOUNT_FIELD_GETTERS, params['fields'])
+    return result
+
+
+def get_fstab(fstab, params):
+    """Return the records of the configured mount points of fstab matching the filters of params."""
+    result = list()
+    for entry in fstab.lines:
+        if not isinstance(entry, FstabEntry):
+            continue
+        if params['fstype'] and entry.fstype not in params['fstype']:
+            continue
+        if not match_path(unescape(entry.name), params['paths']):
+            continue
+        if params['src'] and unescape(entry.src) not in params['src']:
+            continue
+        result.append(get_record(entry, FSTAB_FIELD_GETTERS, params['fields']))
+    return result
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            gather_subset=dict(type='list', elements='str', default=['all'], choices=['all', 'mounts', 'fstab']),
+            paths=dict(type='list', elements='path'),
+            fstype=dict(type='list', elements='str'),
+            src=dict(type='list', elements='str'),
+            fields=dict(type='list', elements='str', choices=FIELDS),
+            fstab=dict(type='str'),
+        ),
+        supports_check_mode=True,
+    )
+
+    gather_subset = module.params['gather_subset']
+    mount_info = dict()
+
+    if 'mounts' not in gather_subset and 'all' in gather_subset and platform.system() != 'Linux':
+        module.warn("Gathering the active mount points is only supported on Linux, gathering only the fstab")
+    elif 'all' in gather_subset or 'mounts' in gather_subset:
+        if platform.system() != 'Linux':
+            module.fail_json(msg="Gathering the active mount points is only supported on Linux, use gather_subset=fstab")
+        try:
+            mounts = LinuxMounts.from_file(MOUNTINFO)
+        except (IOError, OSError) as e:
+            module.fail_json(msg="Cannot read %s: %s" % (MOUNTINFO, to_native(e)))
+        mount_info['mounts'] = get_mounts(mounts, module.params)
+
+    if 'all' in gather_subset or 'fstab' in gather_subset:
+        path = module.params['fstab']
+        if path is None:
+            path = '/etc/vfstab' if platform.system() == 'SunOS' else '/etc/fstab'
+        try:
+            fstab = Fstab(path)
+        except (IOError, OSError) as e:
+            if module.params['fstab'] is not None:
+                module.fail_json(msg="Cannot read %s: %s" % (path, to_native(e)))
+            # No fstab at all, e.g. in a container
+            fstab = Fstab(path, lines=[])
+        mount_info['fstab'] = get_fstab(fstab, module.params)
+
+    module.exit_json(changed=False, mount_info=mount_info)
+
+
+if __name__ == '__main__':
+    main()
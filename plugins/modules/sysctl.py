@@ -23,7 +23,7 @@ options:
     name:
         description:
             - The dot-separated path (also known as O(key)) specifying the sysctl variable.
-        required: true
+            - Required unless O(parameters) is given.
         aliases: [ 'key' ]
         type: str
     value:
@@ -31,9 +31,20 @@ options:
             - Desired value of the sysctl key.
         aliases: [ 'val' ]
         type: str
+    parameters:
+        description:
+            - A dict of sysctl variables and their desired values to manage in one run instead of O(name) and O(value).
+            - The sysctl file is read once and, if any entry changed, written once.
+            - With O(state=absent), the entries of the variables are removed, their values are ignored.
+            - With O(reload=true) or O(sysctl_set=true), only the variables whose current value differs are set,
+              with a single C(sysctl -w) command, instead of reloading the whole sysctl file.
+            - Mutually exclusive with O(name) and O(value).
+        type: dict
+        version_added: 3.0.0
     state:
         description:
             - Whether the entry should be present or absent in the sysctl file.
+            - With O(parameters), the state of all of them.
         choices: [ "present", "absent" ]
         default: present
         type: str
@@ -114,6 +125,16 @@ EXAMPLES = r'''
     sysctl_set: true
     state: present
     reload: true
+
+# Set several variables in /etc/sysctl.d/90-tuning.conf with a single write,
+# and set the ones whose current value differs
+- ansible.posix.sysctl:
+    parameters:
+      vm.swappiness: 10
+      vm.dirty_ratio: 15
+      net.core.somaxconn: 4096
+      net.ipv4.tcp_rmem: 4096 131072 6291456
+    sysctl_file: /etc/sysctl.d/90-tuning.conf
 '''
 
 # ==============================================================
@@ -174,6 +195,10 @@ class SysctlModule(object):
         if self.platform == 'freebsd' and self.sysctl_file not in freebsd_sysctl_files and self.args['reload']:
             self.module.fail_json(msg="%s can not be reloaded. Set reload=False." % self.sysctl_file)
 
+        if self.args['parameters'] is not None:
+            self.process_parameters()
+            return
+
         # Whitespace is bad
         self.args['name'] = self.args['name'].strip()
         self.args['value'] = self._parse_value(self.args['value'])
@@ -228,6 +253,42 @@ class SysctlModule(object):
             if self.changed and self.args['reload']:
                 self.reload_sysctl()
 
+    def process_parameters(self):
+        """
+        Bring all the variables of the parameters option into state, reading
+        and writing the sysctl file once and setting only the changed values.
+        """
+        state = self.args['state']
+        tokens = dict((name.strip(), to_native(self._parse_value(value))) for name, value in self.args['parameters'].items())
+
+        self.read_sysctl_file()
+        self.fix_lines(tokens)
+
+        # the current values are only needed to set them
+        set_values = state == "present" and (self.args['reload'] or self.args['sysctl_set'])
+        proc_values = self.get_token_curr_values(tokens) if set_values else {}
+        changed_values = {}
+
+        for name, value in tokens.items():
+            file_value = self.file_values.get(name)
+            if state == "absent":
+                if file_value:
+                    self.write_file = True
+                continue
+            if file_value != value:
+                self.write_file = True
+            if set_values and not self._values_is_equal(proc_values[name], value):
+                changed_values[name] = value
+
+        self.changed = self.write_file or bool(changed_values)
+
+        # Do the work
+        if not self.module.check_mode:
+            if self.write_file:
+                self.write_sysctl()
+            if changed_values:
+                self.set_token_values(changed_values)
+
     def _values_is_equal(self, a, b):
         """Expects two string values. It will split the string by whitespace
         and compare each value. It will return True if both lists are the same,
@@ -286,6 +347,35 @@ class SysctlModule(object):
         else:
             return out
 
+    # Map the token to its path below /proc/sys like sysctl of procps
+    def _token_path(self, token):
+        # A name whose first separator is a slash is a path already, otherwise
+        # dots and slashes are swapped, so net.ipv4.conf.eth0/1.rp_filter is
+        # net/ipv4/conf/eth0.1/rp_filter
+        for char in token:
+            if char == '/':
+                return token
+            if char == '.':
+                break
+        return '/'.join(part.replace('/', '.') for part in token.split('.'))
+
+    # Read the current values, from /proc/sys on Linux
+    def get_token_curr_values(self, tokens):
+        values = {}
+        for token in tokens:
+            value = None
+            if self.platform == 'linux':
+                path = os.path.join('/proc/sys', self._token_path(token))
+                try:
+                    with open(path, 'r') as f:
+                        value = f.read()
+                except (IOError, OSError):
+                    pass
+            if value is None:
+                value = self.get_token_curr_value(token)
+            values[token] = value
+        return values
+
     # Use the sysctl command to set the current value
     def set_token_value(self, token, value):
         if len(value.split()) > 0:
@@ -310,6 +400,24 @@ class SysctlModule(object):
         else:
             return rc
 
+    # Use a single sysctl command to set several current values
+    def set_token_values(self, tokens):
+        cmd = [self.sysctl_cmd]
+        if self.platform == 'freebsd':
+            # freebsd doesn't accept -w, but since it's not needed, just drop it
+            if self.args['ignoreerrors']:
+                cmd.append('-i')
+        elif self.platform != 'openbsd':
+            # openbsd doesn't accept -w, but since it's not needed, just drop it
+            if self.args['ignoreerrors']:
+                cmd.append('-e')
+            cmd.append('-w')
+        cmd += ['%s=%s' % (token, value) for token, value in tokens.items()]
+        rc, out, err = self.module.run_command(cmd, environ_update=self.LANG_ENV)
+        if rc != 0 or self._stderr_failed(err):
+            self.module.fail_json(msg='setting %s failed: %s' % (', '.join(tokens), out + err))
+        return rc
+
     # Run sysctl -p
     def reload_sysctl(self):
         if self.platform == 'freebsd':
@@ -371,9 +479,12 @@ class SysctlModule(object):
             v = v.strip()
             self.file_values[k] = v.strip()
 
-    # Fix the value in the sysctl file content
-    def fix_lines(self):
-        checked = []
+    # Fix the values in the sysctl file content, of tokens (a dict of
+    # name: value) or of the name option
+    def fix_lines(self, tokens=None):
+        if tokens is None:
+            tokens = {self.args['name']: self.args['value']}
+        checked = set()
         self.fixed_lines = []
         for line in self.file_lines:
             if not line.strip() or line.strip().startswith(("#", ";")) or "=" not in line:
@@ -384,18 +495,19 @@ class SysctlModule(object):
             k = k.strip()
             v = v.strip()
             if k not in checked:
-                checked.append(k)
-                if k == self.args['name']:
+                checked.add(k)
+                if k in tokens:
                     if self.args['state'] == "present":
-                        new_line = "%s=%s\n" % (k, self.args['value'])
+                        new_line = "%s=%s\n" % (k, tokens[k])
                         self.fixed_lines.append(new_line)
                 else:
                     new_line = "%s=%s\n" % (k, v)
                     self.fixed_lines.append(new_line)
 
-        if self.args['name'] not in checked and self.args['state'] == "present":
-            new_line = "%s=%s\n" % (self.args['name'], self.args['value'])
-            self.fixed_lines.append(new_line)
+        for name, value in tokens.items():
+            if name not in checked and self.args['state'] == "present":
+                new_line = "%s=%s\n" % (name, value)
+                self.fixed_lines.append(new_line)
 
     # Completely rewrite the sysctl file
     def write_sysctl(self):
@@ -422,8 +534,9 @@ def main():
     # defining module
     module = AnsibleModule(
         argument_spec=dict(
-            name=dict(aliases=['key'], required=True),
+            name=dict(aliases=['key'], required=False),
             value=dict(aliases=['val'], required=False, type='str'),
+            parameters=dict(required=False, type='dict'),
             state=dict(default='present', choices=['present', 'absent']),
             reload=dict(default=True, type='bool'),
             sysctl_set=dict(default=False, type='bool'),
@@ -431,19 +544,30 @@ def main():
             sysctl_file=dict(default='/etc/sysctl.conf', type='path')
         ),
         supports_check_mode=True,
-        required_if=[('state', 'present', ['value'])],
+        required_if=[('state', 'present', ['value', 'parameters'], True)],
+        required_one_of=[['name', 'parameters']],
+        mutually_exclusive=[['name', 'parameters'], ['value', 'parameters']],
     )
 
-    if module.params['name'] is None:
-        module.fail_json(msg="name cannot be None")
-    if module.params['state'] == 'present' and module.params['value'] is None:
-        module.fail_json(msg="value cannot be None")
-
-    # In case of in-line params
-    if module.params['name'] == '':
-        module.fail_json(msg="name cannot be blank")
-    if module.params['state'] == 'present' and module.params['value'] == '':
-        module.fail_json(msg="value cannot be blank")
+    if module.params['parameters'] is not None:
+        if not module.params['parameters']:
+            module.fail_json(msg="parameters cannot be empty")
+        for name, value in module.params['parameters'].items():
+            if not name.strip():
+                module.fail_json(msg="parameter names cannot be blank")
+            if module.params['state'] == 'present' and (value is None or value == ''):
+                module.fail_json(msg="value of %s cannot be blank" % name)
+    else:
+        if module.params['name'] is None:
+            module.fail_json(msg="name cannot be None")
+        if module.params['state'] == 'present' and module.params['value'] is None:
+            module.fail_json(msg="value cannot be None")
+
+        # In case of in-line params
+        if module.params['name'] == '':
+            module.fail_json(msg="name cannot be blank")
+        if module.params['state'] == 'present' and module.params['value'] == '':
+            module.fail_json(msg="value cannot be blank")
 
     result = SysctlModule(module)
 
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmark of the firewalld transaction classes against the in-memory
+FakeFirewallClient, for checking batching and caching changes for
+regressions in firewalld round trips and CPU time without a daemon.
+
+Run it with the collection on the python path, for example:
+
+    python -m ansible_collections.ansible.posix.tests.benchmarks.bench_firewalld --ports 5000 --rules 2000
+
+Every scenario starts from a zone with the given number of ports and rich
+rules and reports the number of calls made to the fake client and the CPU
+and wall clock time spent in the transaction.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import time
+
+from ansible_collections.ansible.posix.plugins.modules import firewalld
+from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock
+from ansible_collections.ansible.posix.tests.unit.mock.firewalld import (
+    FakeFirewallClient,
+    fake_firewalld,
+    make_zone_settings,
+)
+
+
+def fail_json(msg, **kwargs):
+    raise RuntimeError(msg)
+
+
+def make_module(**params):
+    module = MagicMock(name='AnsibleModule')
+    module.check_mode = False
+    module.params = dict(timeout=0, perf=False, purge=False)
+    module.params.update(params)
+    module.fail_json.side_effect = fail_json
+    return module
+
+
+def port_items(start, count):
+    return [(str(port), 'tcp', 0) for port in range(start, start + count)]
+
+
+def rule_items(start, count):
+    return [('rule family="ipv4" source address="10.%d.%d.0/24" accept' % (i // 256 % 256, i % 256), 0)
+            for i in range(start, start + count)]
+
+
+def make_client(ports, rules):
+    zone = make_zone_settings(
+        ports=[item[:2] for item in port_items(10000, ports)],
+        rich_rules=[item[0] for item in rule_items(0, rules)],
+    )
+    return FakeFirewallClient(zones={'public': zone})
+
+
+def scenarios(ports, rules):
+    """Yield (name, function creating the transaction) of every scenario."""
+    both = dict(zone='public', permanent=True, immediate=True)
+
+    yield 'ports enable new', lambda: firewalld.PortTransaction(
+        make_module(), items=port_items(30000, ports), desired_state='enabled', **both)
+    yield 'ports enable existing', lambda: firewalld.PortTransaction(
+        make_module(), items=port_items(10000, ports), desired_state='enabled', **both)
+    yield 'ports disable existing', lambda: firewalld.PortTransaction(
+        make_module(), items=port_items(10000, ports), desired_state='disabled', **both)
+    yield 'rich rules enable new', lambda: firewalld.RichRuleTransaction(
+        make_module(), items=rule_items(rules, rules), desired_state='enabled', **both)
+    yield 'rich rules enable existing', lambda: firewalld.RichRuleTransaction(
+        make_module(), items=rule_items(0, rules), desired_state='enabled', **both)
+    yield 'rich rules disable existing', lambda: firewalld.RichRuleTransaction(
+        make_module(), items=rule_items(0, rules), desired_state='disabled', **both)
+
+    zone_settings = dict(
+        ports=[item[:2] for item in port_items(10000, ports // 2)],
+        rich_rules=[item[0] for item in rule_items(0, rules // 2)],
+    )
+    yield 'zone_settings purge half', lambda: firewalld.ZoneSettingsTransaction(
+        make_module(purge=True), action_args=(zone_settings,), desired_state='present', purge=True, **both)
+
+
+def run_scenario(create, ports, rules, repeat):
+    best = None
+    for dummy in range(repeat):
+        client = make_client(ports, rules)
+        with fake_firewalld(client):
+            transaction = create()
+            client.reset_calls()
+            wall_start, cpu_start = time.time(), time.process_time()
+            changed, dummy_msgs = transaction.run()
+            cpu, wall = time.process_time() - cpu_start, time.time() - wall_start
+        if best is None or cpu < best['cpu']:
+            best = dict(changed=changed, calls=sum(client.calls.values()), call_counts=dict(client.calls),
+                        cpu=round(cpu, 6), wall=round(wall, 6))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--ports', type=int, default=2000, help='number of ports in the zone and per scenario')
+    parser.add_argument('--rules', type=int, default=2000, help='number of rich rules in the zone and per scenario')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scenario, the fastest one is reported')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    results = dict(
+        (name, run_scenario(create, args.ports, args.rules, args.repeat))
+        for name, create in scenarios(args.ports, args.rules)
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+
+    print('%-30s %8s %6s %10s %10s' % ('scenario', 'changed', 'calls', 'cpu [s]', 'wall [s]'))
+    for name, result in results.items():
+        print('%-30s %8s %6d %10.4f %10.4f' % (name, result['changed'], result['calls'], result['cpu'], result['wall']))
+
+
+if __name__ == '__main__':
+    main()
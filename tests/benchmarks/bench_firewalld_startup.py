@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmark of the fixed startup cost of the firewalld module, i.e. what a
+task pays before any firewalld operation, each scenario measured in a fresh
+python interpreter.
+
+Run it with the collection on the python path, for example:
+
+    python -m ansible_collections.ansible.posix.tests.benchmarks.bench_firewalld_startup --repeat 10
+
+The 'import + connect' scenario is what every task paid before the firewall
+python bindings were imported lazily, the 'validation failure' scenario is a
+task failing argument validation, which no longer imports them at all. The
+bindings of the running python are used if installed, firewalld itself is
+connected to if running.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+MODULE = 'ansible_collections.ansible.posix.plugins.modules.firewalld'
+MODULE_UTILS = 'ansible_collections.ansible.posix.plugins.module_utils.firewalld'
+
+SCENARIOS = (
+    ('interpreter', ['-c', 'pass'], None),
+    ('import', ['-c', 'import %s' % MODULE], None),
+    ('import + connect', ['-c', 'import %s; import %s as utils; utils.connect_fw()' % (MODULE, MODULE_UTILS)], None),
+    ('validation failure', ['-m', MODULE], {'port': '8080/tcp', 'zone': 'public'}),
+    ('offline_backend=xml check', ['-m', MODULE], {
+        'port': '8080/tcp', 'state': 'enabled', 'permanent': True, 'offline_backend': 'xml', '_ansible_check_mode': True,
+    }),
+)
+
+
+def run_scenario(argv, module_args, repeat):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    stdin = json.dumps({'ANSIBLE_MODULE_ARGS': module_args}) if module_args is not None else ''
+    best = None
+    for dummy in range(repeat):
+        start = time.time()
+        subprocess.run([sys.executable] + argv, input=stdin, env=env, universal_newlines=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        wall = time.time() - start
+        if best is None or wall < best:
+            best = wall
+    return round(best, 6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per scenario, the fastest one is reported')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    results = dict((name, run_scenario(argv, module_args, args.repeat)) for name, argv, module_args in SCENARIOS)
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+
+    print('%-30s %10s' % ('scenario', 'wall [s]'))
+    for name, dummy, dummy in SCENARIOS:
+        print('%-30s %10.4f' % (name, results[name]))
+
+
+if __name__ == '__main__':
+    main()
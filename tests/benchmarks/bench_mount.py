@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmark of get_linux_mounts() of the mount module over synthetic
+mountinfo files the size of the mount tables of container hosts.
+
+Run it with the collection on the python path, for example:
+
+    python -m ansible_collections.ansible.posix.tests.benchmarks.bench_mount --lines 20000 40000 60000
+
+Every size reports the time and peak memory of reading the file and looking
+up a few mount points, like a mount task does, and of resolving the source
+of every mount. The same is measured for the implementation that resolved
+every source while reading the file, as the reference.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from ansible_collections.ansible.posix.plugins.modules import mount
+
+
+def make_mountinfo(lines, seed=0):
+    """
+    Return the lines of a mountinfo file of a container host: the host
+    mounts, and per container an overlay root filesystem with bind mounted
+    volumes and tmpfs mounts below it.
+    """
+    rnd = random.Random(seed)
+    result = [
+        '22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw',
+        '23 22 0:21 / /proc rw,nosuid,nodev,noexec,relatime shared:12 - proc proc rw',
+        '24 22 0:22 / /sys rw,nosuid,nodev,noexec,relatime shared:2 - sysfs sysfs rw',
+        '25 22 0:5 / /dev rw,nosuid shared:8 - devtmpfs devtmpfs rw,size=4096k',
+        '26 22 0:24 / /run rw,nosuid,nodev shared:20 - tmpfs tmpfs rw,mode=755',
+        '27 22 8:17 / /var/lib rw,relatime shared:30 - xfs /dev/sdb1 rw',
+    ]
+    next_id = 100
+    while len(result) < lines:
+        container = '%032x' % rnd.getrandbits(128)
+        pod = '%08x-%04x-%04x-%04x-%012x' % (
+            rnd.getrandbits(32), rnd.getrandbits(16), rnd.getrandbits(16), rnd.getrandbits(16), rnd.getrandbits(48))
+        rootfs = '/run/containerd/io.containerd.runtime.v2.task/k8s.io/%s/rootfs' % container
+        root_id = next_id
+        result.append('%d 26 0:%d / %s rw,relatime shared:%d - overlay overlay rw,lowerdir=/var/lib/l/%s' % (
+            root_id, 1000 + root_id % 5000, rootfs, root_id, container[:8]))
+        next_id += 1
+        for volume in range(rnd.randint(2, 12)):
+            if volume % 4 == 3:
+                result.append('%d %d 0:%d / %s/dev/shm rw,nosuid,nodev - tmpfs shm rw,size=65536k' % (
+                    next_id, root_id, 2000 + next_id % 5000, rootfs))
+            else:
+                result.append('%d %d 8:17 /kubelet/pods/%s/volumes/kubernetes.io~empty-dir/vol%d %s/data/vol%d rw,relatime - xfs /dev/sdb1 rw' % (
+                    next_id, root_id, pod, volume, rootfs, volume))
+            next_id += 1
+    return [line + '\n' for line in result[:lines]]
+
+
+def reference_get_linux_mounts(mntinfo_file):
+    """get_linux_mounts() before the records were resolved on demand."""
+    with open(mntinfo_file) as f:
+        lines = map(str.strip, f.readlines())
+
+    mntinfo = {}
+    for line in lines:
+        fields = line.split()
+        record = {
+            'id': int(fields[0]),
+            'parent_id': int(fields[1]),
+            'device': fields[2],
+            'root': fields[3],
+            'dst': fields[4],
+            'opts': fields[5],
+            'fs': fields[-3],
+            'src': fields[-2]
+        }
+        mntinfo[record['id']] = record
+
+    mounts = {}
+    for mnt in mntinfo.values():
+        if mnt['parent_id'] != 1 and mnt['parent_id'] in mntinfo:
+            m = mntinfo[mnt['parent_id']]
+            if len(m['root']) > 1 and mnt['root'].startswith("%s/" % m['root']):
+                mnt['root'] = mnt['root'][len(m['root']):]
+            if m['dst'] != '/':
+                mnt['root'] = "%s%s" % (m['dst'], mnt['root'])
+            src = mnt['root']
+        else:
+            src = mnt['src']
+        mounts[mnt['dst']] = {
+            'dst': mnt['dst'], 'src': src, 'opts': mnt['opts'], 'fs': mnt['fs'],
+            'device': mnt['device'], 'source': mnt['src'],
+        }
+    return mounts
+
+
+def measure(func):
+    """Return (result, seconds, peak memory in bytes) of func()."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def run_size(path, lookups, repeat):
+    def task(get_mounts):
+        mounts = get_mounts()
+        return [mounts[dst]['src'] for dst in lookups if dst in mounts]
+
+    def all_sources(get_mounts):
+        mounts = get_mounts()
+        return dict((dst, mounts[dst]['src']) for dst in mounts)
+
+    implementations = (
+        ('get_linux_mounts', lambda: mount.get_linux_mounts(None, path)),
+        ('reference', lambda: reference_get_linux_mounts(path)),
+    )
+    result = {}
+    for name, get_mounts in implementations:
+        for scenario, func in (('task', task), ('all sources', all_sources)):
+            best = None
+            for dummy in range(repeat):
+                value, seconds, peak = measure(lambda: func(get_mounts))
+                if best is None or seconds < best['time']:
+                    best = dict(time=round(seconds, 6), peak_memory=peak)
+            best['value'] = value
+            result['%s %s' % (name, scenario)] = best
+
+    if result['get_linux_mounts all sources']['value'] != result['reference all sources']['value']:
+        raise AssertionError('get_linux_mounts() and the reference differ')
+    for value in result.values():
+        del value['value']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--lines', type=int, nargs='+', default=[20000, 40000, 60000], help='mountinfo sizes in lines')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scenario, the fastest one is reported')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    for lines in args.lines:
+        content = make_mountinfo(lines)
+        fd, path = tempfile.mkstemp(prefix='bench-mountinfo-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.writelines(content)
+            # The mount points a task looks at: some host and container mounts
+            lookups = ['/', '/var/lib', '/nonexistent'] + [line.split()[4] for line in content[-5:]]
+            results[lines] = run_size(path, lookups, args.repeat)
+        finally:
+            os.unlink(path)
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+
+    print('%-8s %-34s %10s %14s' % ('lines', 'scenario', 'time [s]', 'peak mem [kB]'))
+    for lines, result in results.items():
+        for name, value in result.items():
+            print('%-8d %-34s %10.4f %14d' % (lines, name, value['time'], value['peak_memory'] // 1024))
+
+
+if __name__ == '__main__':
+    main()
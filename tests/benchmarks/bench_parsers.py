@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmark of the parsers and serializers of the files the collection reads
+on every run: fstab and mountinfo of the mount module, sysctl.conf of the
+sysctl module and authorized_keys of the authorized_key module.
+
+Run it with the collection on the python path, for example:
+
+    python -m ansible_collections.ansible.posix.tests.benchmarks.bench_parsers --baseline tests/benchmarks/baseline_parsers.json
+
+Every scenario runs over synthetic files of each size and reports its time
+and its peak memory, the latter measured with tracemalloc in a separate run.
+Times are also reported relative to a fixed pure python workload timed at
+the start, so results of different machines can be compared roughly.
+
+With --baseline, the results are compared with the ones stored in the file
+and the exit status is 1 if the relative time or the peak memory of any
+scenario grew by more than --threshold. --save-baseline stores the results.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ansible_collections.ansible.posix.plugins.module_utils.mount import Fstab, LinuxMounts
+from ansible_collections.ansible.posix.plugins.modules import authorized_key, mount, sysctl
+from ansible_collections.ansible.posix.tests.benchmarks.bench_mount import make_mountinfo
+from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock
+
+
+def make_fstab(lines, seed=0):
+    """Return the lines of an fstab file with comments, disks, bind mounts, NFS shares and swap files."""
+    rnd = random.Random(seed)
+    result = ['# /etc/fstab: static file system information.\n']
+    while len(result) < lines:
+        i = len(result)
+        kind = rnd.randint(0, 9)
+        if kind == 0:
+            result.append('# %s\n' % ('x' * rnd.randint(0, 60)))
+        elif kind == 1:
+            result.append('\n')
+        elif kind < 5:
+            result.append('UUID=%08x-%04x-%04x-%04x-%012x /srv/disk%d xfs defaults,noatime 0 2\n' % (
+                rnd.getrandbits(32), rnd.getrandbits(16), rnd.getrandbits(16), rnd.getrandbits(16), rnd.getrandbits(48), i))
+        elif kind < 7:
+            result.append('/srv/disk%d/data /var/lib/bind%d none bind 0 0\n' % (rnd.randint(0, lines), i))
+        elif kind < 9:
+            result.append('nfs%d.example.com:/export/%d /mnt/nfs/share\\040%d nfs4 rw,hard,timeo=600,_netdev 0 0\n' % (
+                rnd.randint(0, 9), i, i))
+        else:
+            result.append('/swapfile%d none swap sw 0 0\n' % i)
+    return result[:lines]
+
+
+def make_sysctl_conf(lines, seed=0):
+    """Return the lines of a sysctl.conf file with comments and the settings of many interfaces."""
+    rnd = random.Random(seed)
+    settings = ('rp_filter', 'accept_redirects', 'send_redirects', 'accept_source_route', 'log_martians', 'arp_ignore')
+    result = []
+    while len(result) < lines:
+        i = len(result)
+        kind = rnd.randint(0, 9)
+        if kind == 0:
+            result.append('# %s\n' % ('x' * rnd.randint(0, 60)))
+        elif kind == 1:
+            result.append('\n')
+        else:
+            result.append('net.ipv4.conf.eth%d.%s = %d\n' % (i // len(settings), settings[i % len(settings)], rnd.randint(0, 2)))
+    return result[:lines]
+
+
+def make_authorized_keys(lines, seed=0):
+    """Return the lines of an authorized_keys file with comments, options and keys of several types."""
+    rnd = random.Random(seed)
+    result = []
+    while len(result) < lines:
+        i = len(result)
+        kind = rnd.randint(0, 9)
+        key = '%x' % rnd.getrandbits(512)
+        if kind == 0:
+            result.append('# %s\n' % ('x' * rnd.randint(0, 60)))
+        elif kind < 4:
+            result.append('ssh-ed25519 AAAAC3NzaC1lZDI1NTE5%s user%d@host%d\n' % (key[:48], i, i % 97))
+        elif kind < 7:
+            result.append('ssh-rsa AAAAB3NzaC1yc2EAAAADAQABAAABAQ%s%s user%d@example.com\n' % (key, key, i))
+        else:
+            result.append('from="10.%d.%d.0/24",no-port-forwarding,command="/usr/bin/backup %d" '
+                          'ecdsa-sha2-nistp256 AAAAE2VjZHNhLXNoYTItbmlzdHAyNTY%s backup%d\n' % (
+                              i // 256 % 256, i % 256, i, key[:96], i))
+    return result[:lines]
+
+
+def make_module(**params):
+    module = MagicMock(name='AnsibleModule')
+    module.check_mode = False
+    module.params = params
+    module.fail_json.side_effect = lambda msg, **kwargs: sys.exit(msg)
+    return module
+
+
+def make_sysctl(path):
+    """Return a SysctlModule for path without running it, which would read and set the live values."""
+    module = make_module(name='net.ipv4.conf.eth1.rp_filter', value='1', state='present', sysctl_file=path)
+    sysctl_module = sysctl.SysctlModule.__new__(sysctl.SysctlModule)
+    sysctl_module.module = module
+    sysctl_module.args = module.params
+    sysctl_module.sysctl_file = path
+    sysctl_module.file_lines = []
+    sysctl_module.file_values = {}
+    return sysctl_module
+
+
+def fstab_parse(path):
+    return Fstab(path, system='Linux')
+
+
+def fstab_serialize(path):
+    fstab = Fstab(path, system='Linux')
+    fstab.set(dict(src='/dev/sdz1', name='/srv/new', fstype='xfs', opts='defaults', dump='0', passno='0'))
+    return fstab.to_lines()
+
+
+def mountinfo_parse(path):
+    mounts = mount.get_linux_mounts(None, path)
+    return [mounts[dst]['src'] for dst in ('/', '/var/lib', '/nonexistent') if dst in mounts]
+
+
+def mountinfo_resolve(path):
+    mounts = LinuxMounts.from_file(path)
+    return [mnt.src for mnt in mounts.values()]
+
+
+def sysctl_read(path):
+    sysctl_module = make_sysctl(path)
+    sysctl_module.read_sysctl_file()
+    return sysctl_module.file_values
+
+
+def sysctl_serialize(path):
+    sysctl_module = make_sysctl(path)
+    sysctl_module.read_sysctl_file()
+    sysctl_module.fix_lines()
+    return sysctl_module.fixed_lines
+
+
+def authorized_keys_parse(path):
+    return authorized_key.parsekeys(make_module(), authorized_key.readfile(None, path))
+
+
+def authorized_keys_serialize(path):
+    keys = authorized_key.parsekeys(make_module(), authorized_key.readfile(None, path))
+    return authorized_key.serialize(keys)
+
+
+# (name, file generator, scenario)
+SCENARIOS = (
+    ('fstab parse', make_fstab, fstab_parse),
+    ('fstab serialize', make_fstab, fstab_serialize),
+    ('mountinfo parse', make_mountinfo, mountinfo_parse),
+    ('mountinfo resolve', make_mountinfo, mountinfo_resolve),
+    ('sysctl read', make_sysctl_conf, sysctl_read),
+    ('sysctl serialize', make_sysctl_conf, sysctl_serialize),
+    ('authorized_keys parse', make_authorized_keys, authorized_keys_parse),
+    ('authorized_keys serialize', make_authorized_keys, authorized_keys_serialize),
+)
+
+
+def calibrate(repeat):
+    """Return the time of a fixed pure python workload, the unit of the relative times."""
+    def workload():
+        counts = {}
+        for i in range(200000):
+            key = 'key%d' % (i % 1000)
+            counts[key] = counts.get(key, 0) + len(key.split('y'))
+        return counts
+
+    return min(timed(workload)[1] for dummy in range(repeat))
+
+
+def timed(func):
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes, repeat, unit):
+    results = {}
+    for name, generator, scenario in SCENARIOS:
+        for size in sizes:
+            fd, path = tempfile.mkstemp(prefix='bench-parsers-')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.writelines(generator(size))
+                seconds = min(timed(lambda: scenario(path))[1] for dummy in range(repeat))
+                results['%s %d' % (name, size)] = dict(
+                    time=round(seconds, 6),
+                    relative_time=round(seconds / unit, 4),
+                    peak_memory=peak_memory(lambda: scenario(path)),
+                )
+            finally:
+                os.unlink(path)
+    return results
+
+
+def compare(results, baseline, threshold, min_time):
+    """
+    Return the regressions of results against baseline, as messages. Times
+    below min_time are too noisy to compare.
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key not in baseline:
+            continue
+        for metric in ('relative_time', 'peak_memory'):
+            if metric == 'relative_time' and result['time'] < min_time:
+                continue
+            before = baseline[key][metric]
+            if before and result[metric] > before * (1 + threshold):
+                regressions.append('%s: %s %s -> %s (+%d%%)' % (
+                    key, metric, before, result[metric], round((result[metric] / before - 1) * 100)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='file sizes in lines')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scenario, the fastest one is reported')
+    parser.add_argument('--baseline', help='JSON file of results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='growth of relative time or peak memory over the baseline that fails, default 0.25 (25%%)')
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='time in seconds below which times are not compared with the baseline, default 0.1')
+    parser.add_argument('--save-baseline', help='JSON file to store the results in')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    unit = calibrate(args.repeat)
+    results = run(args.sizes, args.repeat, unit)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    else:
+        print('%-34s %10s %10s %14s' % ('scenario', 'time [s]', 'relative', 'peak mem [kB]'))
+        for key, result in results.items():
+            print('%-34s %10.4f %10.2f %14d' % (key, result['time'], result['relative_time'], result['peak_memory'] // 1024))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_time)
+        if regressions:
+            print('Regressions against %s:' % args.baseline, file=sys.stderr)
+            for message in regressions:
+                print('  %s' % message, file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+In-memory stand-in for firewall.client.FirewallClient.
+
+FakeFirewallClient keeps a permanent and a runtime configuration of zones
+and counts every call made to it, to itself, its config object and the
+config zone objects, in FakeFirewallClient.calls. The zone settings are
+ZoneSettings objects, which have the layout and the methods of
+FirewallClientZoneSettings, the ipset settings are IPSetSettings objects,
+the same for FirewallClientIPSetSettings.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import collections
+import contextlib
+import copy
+
+from ansible_collections.ansible.posix.tests.unit.compat.mock import patch
+
+from ansible_collections.ansible.posix.plugins.module_utils import firewalld as firewalld_utils
+from ansible_collections.ansible.posix.plugins.module_utils.firewalld_xml import ZoneSettings
+
+
+FAKE_FW_VERSION = '1.3.4'
+
+
+class FakeFirewallError(Exception):
+    pass
+
+
+def make_zone_settings(services=(), ports=(), rich_rules=(), interfaces=(), sources=(), target='default', **kwargs):
+    """Return ZoneSettings with the given content."""
+    settings = ZoneSettings()
+    settings.settings[4] = target
+    settings.settings[5].extend(services)
+    settings.settings[6].extend(tuple(port) for port in ports)
+    settings.settings[10].extend(interfaces)
+    settings.settings[11].extend(sources)
+    settings.settings[12].extend(rich_rules)
+    for key, index in (('icmp_blocks', 7), ('forward_ports', 9), ('protocols', 13)):
+        settings.settings[index].extend(kwargs.get(key, ()))
+    for key, index in (('masquerade', 8), ('icmp_block_inversion', 15), ('forward', 16)):
+        if key in kwargs:
+            settings.settings[index] = kwargs[key]
+    return settings
+
+
+class IPSetSettings(object):
+    """Stand-in for firewall.client.FirewallClientIPSetSettings."""
+
+    def __init__(self, settings=None):
+        if settings:
+            self.settings = settings
+        else:
+            self.settings = ["", "", "", "", {}, []]
+
+    def getType(self):
+        return self.settings[3]
+
+    def setType(self, ipset_type):
+        self.settings[3] = ipset_type
+
+    def getOptions(self):
+        return self.settings[4]
+
+    def setOptions(self, options):
+        self.settings[4] = options
+
+    def getEntries(self):
+        return self.settings[5]
+
+    def setEntries(self, entries):
+        self.settings[5] = entries
+
+
+def make_ipset_settings(ipset_type='hash:ip', options=None, entries=()):
+    """Return IPSetSettings with the given content."""
+    return IPSetSettings(["", "", "", ipset_type, dict(options or {}), list(entries)])
+
+
+class FakeConfigIPSet(object):
+    """Stand-in for firewall.client.FirewallClientConfigIPSet."""
+
+    def __init__(self, client, name, settings):
+        self.client = client
+        self.name = name
+        self.settings = settings
+
+    def getSettings(self):
+        self.client.calls['config.ipset.getSettings'] += 1
+        return copy.deepcopy(self.settings)
+
+    def update(self, settings):
+        self.client.calls['config.ipset.update'] += 1
+        self.settings = copy.deepcopy(settings)
+
+    def setEntries(self, entries):
+        self.client.calls['config.ipset.setEntries'] += 1
+        self.settings.setEntries(list(entries))
+
+    def remove(self):
+        self.client.calls['config.ipset.remove'] += 1
+        del self.client.permanent_ipsets[self.name]
+
+
+class FakeConfigZone(object):
+    """Stand-in for firewall.client.FirewallClientConfigZone."""
+
+    def __init__(self, client, name, settings):
+        self.client = client
+        self.name = name
+        self.settings = settings
+
+    def get_property(self, prop):
+        self.client.calls['config.zone.get_property'] += 1
+        return getattr(self, prop)
+
+    def getSettings(self):
+        self.client.calls['config.zone.getSettings'] += 1
+        return copy.deepcopy(self.settings)
+
+    def update(self, settings):
+        self.client.calls['config.zone.update'] += 1
+        self.settings = copy.deepcopy(settings)
+
+    def remove(self):
+        self.client.calls['config.zone.remove'] += 1
+        del self.client.permanent[self.name]
+
+
+class FakeFirewallClientConfig(object):
+    """Stand-in for firewall.client.FirewallClientConfig."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _zone(self, name):
+        if name not in self.client.permanent:
+            raise FakeFirewallError('INVALID_ZONE: %s' % name)
+        return self.client.permanent[name]
+
+    def getZoneByName(self, name):
+        self.client.calls['config.getZoneByName'] += 1
+        return self._zone(name)
+
+    def getZoneNames(self):
+        self.client.calls['config.getZoneNames'] += 1
+        return sorted(self.client.permanent)
+
+    def listZones(self):
+        self.client.calls['config.listZones'] += 1
+        return sorted(self.client.permanent)
+
+    def getZone(self, path):
+        self.client.calls['config.getZone'] += 1
+        return self._zone(path)
+
+    def getZoneOfInterface(self, interface):
+        self.client.calls['config.getZoneOfInterface'] += 1
+        for name, zone in sorted(self.client.permanent.items()):
+            if interface in zone.settings.getInterfaces():
+                return name
+        return ''
+
+    def addZone(self, name, settings):
+        self.client.calls['config.addZone'] += 1
+        if name in self.client.permanent:
+            raise FakeFirewallError('NAME_CONFLICT: %s' % name)
+        self.client.permanent[name] = FakeConfigZone(self.client, name, copy.deepcopy(settings))
+
+    def getIPSetNames(self):
+        self.client.calls['config.getIPSetNames'] += 1
+        return sorted(self.client.permanent_ipsets)
+
+    def getIPSetByName(self, name):
+        self.client.calls['config.getIPSetByName'] += 1
+        if name not in self.client.permanent_ipsets:
+            raise FakeFirewallError('INVALID_IPSET: %s' % name)
+        return self.client.permanent_ipsets[name]
+
+    def addIPSet(self, name, settings):
+        self.client.calls['config.addIPSet'] += 1
+        if name in self.client.permanent_ipsets:
+            raise FakeFirewallError('NAME_CONFLICT: %s' % name)
+        self.client.permanent_ipsets[name] = FakeConfigIPSet(self.client, name, copy.deepcopy(settings))
+
+
+class FakeFirewallClient(object):
+    """
+    Stand-in for firewall.client.FirewallClient.
+
+    :zones:        dict, zone name -> ZoneSettings of the permanent configuration
+    :runtime:      dict, zone name -> ZoneSettings of the runtime configuration
+                   (default: a copy of the permanent configuration)
+    :default_zone: str, the default zone
+    :ipsets:       dict, ipset name -> IPSetSettings of the permanent and,
+                   until a reload, the runtime configuration
+    """
+
+    connected = True
+
+    def __init__(self, zones=None, runtime=None, default_zone='public', ipsets=None):
+        self.calls = collections.Counter()
+        if zones is None:
+            zones = {'public': make_zone_settings(services=['ssh', 'dhcpv6-client'])}
+        self.permanent = dict(
+            (name, FakeConfigZone(self, name, copy.deepcopy(settings))) for name, settings in zones.items()
+        )
+        if runtime is None:
+            runtime = zones
+        self.runtime = copy.deepcopy(runtime)
+        self.default_zone = default_zone
+        ipsets = ipsets or {}
+        self.permanent_ipsets = dict(
+            (name, FakeConfigIPSet(self, name, copy.deepcopy(settings))) for name, settings in ipsets.items()
+        )
+        self.runtime_ipsets = dict((name, list(settings.getEntries())) for name, settings in ipsets.items())
+        self._config = FakeFirewallClientConfig(self)
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def _runtime(self, zone):
+        if zone not in self.runtime:
+            raise FakeFirewallError('INVALID_ZONE: %s' % zone)
+        return self.runtime[zone]
+
+    def config(self):
+        return self._config
+
+    def getDefaultZone(self):
+        self.calls['getDefaultZone'] += 1
+        return self.default_zone
+
+    def getZones(self):
+        self.calls['getZones'] += 1
+        return sorted(self.runtime)
+
+    def getActiveZones(self):
+        self.calls['getActiveZones'] += 1
+        return dict(
+            (name, {'interfaces': settings.getInterfaces(), 'sources': settings.getSources()})
+            for name, settings in self.runtime.items()
+            if settings.getInterfaces() or settings.getSources()
+        )
+
+    def getZoneSettings(self, zone):
+        self.calls['getZoneSettings'] += 1
+        return copy.deepcopy(self._runtime(zone))
+
+    def setZoneSettings(self, zone, settings):
+        self.calls['setZoneSettings'] += 1
+        self._runtime(zone)
+        self.runtime[zone] = copy.deepcopy(settings)
+
+    def reload(self):
+        self.calls['reload'] += 1
+        self.runtime = dict((name, copy.deepcopy(zone.settings)) for name, zone in self.permanent.items())
+        self.runtime_ipsets = dict(
+            (name, list(ipset.settings.getEntries())) for name, ipset in self.permanent_ipsets.items()
+        )
+
+    # Runtime operations on single items
+
+    def _call(self, name, zone, method, *args):
+        self.calls[name] += 1
+        return getattr(self._runtime(zone), method)(*args)
+
+    def getServices(self, zone):
+        return list(self._call('getServices', zone, 'getServices'))
+
+    def addService(self, zone, service, timeout=0):
+        self._call('addService', zone, 'addService', service)
+
+    def removeService(self, zone, service):
+        self._call('removeService', zone, 'removeService', service)
+
+    def queryPort(self, zone, port, protocol):
+        return self._call('queryPort', zone, 'queryPort', port, protocol)
+
+    def addPort(self, zone, port, protocol, timeout=0):
+        self._call('addPort', zone, 'addPort', port, protocol)
+
+    def removePort(self, zone, port, protocol):
+        self._call('removePort', zone, 'removePort', port, protocol)
+
+    def getProtocols(self, zone):
+        return list(self._call('getProtocols', zone, 'getProtocols'))
+
+    def addProtocol(self, zone, protocol, timeout=0):
+        self._call('addProtocol', zone, 'addProtocol', protocol)
+
+    def removeProtocol(self, zone, protocol):
+        self._call('removeProtocol', zone, 'removeProtocol', protocol)
+
+    def getSources(self, zone):
+        return list(self._call('getSources', zone, 'getSources'))
+
+    def addSource(self, zone, source):
+        self._call('addSource', zone, 'addSource', source)
+
+    def removeSource(self, zone, source):
+        self._call('removeSource', zone, 'removeSource', source)
+
+    def getInterfaces(self, zone):
+        return list(self._call('getInterfaces', zone, 'getInterfaces'))
+
+    def changeZoneOfInterface(self, zone, interface):
+        self.calls['changeZoneOfInterface'] += 1
+        for settings in self.runtime.values():
+            if interface in settings.getInterfaces():
+                settings.removeInterface(interface)
+        self._runtime(zone).addInterface(interface)
+
+    def removeInterface(self, zone, interface):
+        self._call('removeInterface', zone, 'removeInterface', interface)
+
+    def getIcmpBlocks(self, zone):
+        return list(self._call('getIcmpBlocks', zone, 'getIcmpBlocks'))
+
+    def addIcmpBlock(self, zone, icmp_block, timeout=0):
+        self._call('addIcmpBlock', zone, 'addIcmpBlock', icmp_block)
+
+    def removeIcmpBlock(self, zone, icmp_block):
+        self._call('removeIcmpBlock', zone, 'removeIcmpBlock', icmp_block)
+
+    def getRichRules(self, zone):
+        return list(self._call('getRichRules', zone, 'getRichRules'))
+
+    def addRichRule(self, zone, rule, timeout=0):
+        self._call('addRichRule', zone, 'addRichRule', rule)
+
+    def removeRichRule(self, zone, rule):
+        self._call('removeRichRule', zone, 'removeRichRule', rule)
+
+    def queryForwardPort(self, zone, port, protocol, toport, toaddr):
+        return self._call('queryForwardPort', zone, 'queryForwardPort', port, protocol, toport, toaddr)
+
+    def addForwardPort(self, zone, port, protocol, toport, toaddr, timeout=0):
+        self._call('addForwardPort', zone, 'addForwardPort', port, protocol, toport, toaddr)
+
+    def removeForwardPort(self, zone, port, protocol, toport, toaddr):
+        self._call('removeForwardPort', zone, 'removeForwardPort', port, protocol, toport, toaddr)
+
+    def queryMasquerade(self, zone):
+        return self._call('queryMasquerade', zone, 'getMasquerade')
+
+    def addMasquerade(self, zone, timeout=0):
+        self._call('addMasquerade', zone, 'setMasquerade', True)
+
+    def removeMasquerade(self, zone):
+        self._call('removeMasquerade', zone, 'setMasquerade', False)
+
+    def queryForward(self, zone):
+        return self._call('queryForward', zone, 'getForward')
+
+    def addForward(self, zone, timeout=0):
+        self._call('addForward', zone, 'setForward', True)
+
+    def removeForward(self, zone):
+        self._call('removeForward', zone, 'setForward', False)
+
+    def queryIcmpBlockInversion(self, zone):
+        return self._call('queryIcmpBlockInversion', zone, 'getIcmpBlockInversion')
+
+    def addIcmpBlockInversion(self, zone):
+        self._call('addIcmpBlockInversion', zone, 'setIcmpBlockInversion', True)
+
+    def removeIcmpBlockInversion(self, zone):
+        self._call('removeIcmpBlockInversion', zone, 'setIcmpBlockInversion', False)
+
+    # Runtime ipsets
+
+    def _runtime_ipset(self, ipset):
+        if ipset not in self.runtime_ipsets:
+            raise FakeFirewallError('INVALID_IPSET: %s' % ipset)
+        return self.runtime_ipsets[ipset]
+
+    def getIPSets(self):
+        self.calls['getIPSets'] += 1
+        return sorted(self.runtime_ipsets)
+
+    def getEntries(self, ipset):
+        self.calls['getEntries'] += 1
+        return list(self._runtime_ipset(ipset))
+
+    def setEntries(self, ipset, entries):
+        self.calls['setEntries'] += 1
+        self._runtime_ipset(ipset)
+        self.runtime_ipsets[ipset] = list(entries)
+
+
+def reset_transaction_state():
+    """Forget the state FirewallTransaction keeps for the module run."""
+    firewalld_utils.FirewallTransaction.invalidate_fw_zone_settings()
+    firewalld_utils.FirewallTransaction.zone_binding_index = None
+    firewalld_utils.FirewallTransaction.perf_stats.clear()
+
+
+@contextlib.contextmanager
+def fake_firewalld(client):
+    """
+    Make module_utils/firewalld.py use client as a running firewalld,
+    whether or not the firewall python bindings are installed.
+    """
+    reset_transaction_state()
+    with patch.multiple(
+        firewalld_utils,
+        fw=client,
+        fw_offline=False,
+        fw_backend='firewall',
+        zone_settings_class=ZoneSettings,
+        import_failure=False,
+        FW_VERSION=FAKE_FW_VERSION,
+    ):
+        try:
+            yield client
+        finally:
+            reset_transaction_state()
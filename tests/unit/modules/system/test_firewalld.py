@@ -0,0 +1,180 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.ansible.posix.plugins.modules import firewalld
+from ansible_collections.ansible.posix.tests.unit.mock.firewalld import (
+    FakeFirewallClient,
+    fake_firewalld,
+    make_zone_settings,
+)
+from ansible_collections.ansible.posix.tests.unit.modules.utils import ModuleTestCase
+
+
+class OldFirewallClient(FakeFirewallClient):
+    """A firewalld < 0.9.0, which can't push the runtime settings of a zone as a whole."""
+
+    @property
+    def setZoneSettings(self):
+        raise AttributeError('setZoneSettings')
+
+
+class FirewalldTestCase(ModuleTestCase):
+
+    def setUp(self):
+        super(FirewalldTestCase, self).setUp()
+        self.client = FakeFirewallClient(zones={
+            'public': make_zone_settings(services=['ssh'], ports=[('22', 'tcp')], interfaces=['eth0']),
+            'internal': make_zone_settings(),
+        })
+        context = fake_firewalld(self.client)
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+    def run_firewalld(self, **args):
+        return self.run_module(firewalld, args)
+
+    def test_ports_batched(self):
+        ports = ['%d/tcp' % port for port in range(1000, 1100)]
+        result = self.run_firewalld(port=ports, permanent=True, immediate=True, state='enabled')
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 1)
+        self.assertEqual(self.client.calls['config.zone.update'], 1)
+        self.assertEqual(self.client.calls['getZoneSettings'], 1)
+        self.assertEqual(self.client.calls['setZoneSettings'], 1)
+        self.assertEqual(len(self.client.permanent['public'].settings.getPorts()), 101)
+        self.assertEqual(len(self.client.runtime['public'].getPorts()), 101)
+
+        self.client.reset_calls()
+        result = self.run_firewalld(port=ports, permanent=True, immediate=True, state='enabled')
+        self.assertFalse(result['changed'])
+        self.assertEqual(self.client.calls['config.zone.update'], 0)
+        self.assertEqual(self.client.calls['setZoneSettings'], 0)
+
+    def test_service_disabled(self):
+        result = self.run_firewalld(service='ssh', permanent=True, state='disabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.permanent['public'].settings.getServices(), [])
+        self.assertEqual(self.client.runtime['public'].getServices(), ['ssh'])
+
+    def test_check_mode(self):
+        result = self.run_firewalld(service='http', permanent=True, state='enabled', _ansible_check_mode=True)
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.calls['config.zone.update'], 0)
+        self.assertEqual(self.client.permanent['public'].settings.getServices(), ['ssh'])
+
+    def test_timeout_uses_runtime_item_calls(self):
+        result = self.run_firewalld(service=['http', 'https'], timeout=60, state='enabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.calls['addService'], 2)
+        self.assertEqual(self.client.calls['setZoneSettings'], 0)
+
+    def test_repeated_items(self):
+        for state, services in (('enabled', ['ssh', 'http']), ('disabled', ['ssh'])):
+            result = self.run_firewalld(service=['http', 'http'], permanent=True, immediate=True, state=state)
+            self.assertTrue(result['changed'], state)
+            self.assertEqual(self.client.permanent['public'].settings.getServices(), services)
+            self.assertEqual(self.client.runtime['public'].getServices(), services)
+
+        result = self.run_firewalld(service=['http', 'http'], timeout=60, state='enabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.calls['addService'], 1)
+
+    def test_rich_rules_canonical(self):
+        self.client.permanent['public'].settings.addRichRule('rule family="ipv4" source address="10.0.0.0/8" accept')
+        result = self.run_firewalld(rich_rule=['rule  family=ipv4 source address=10.0.0.0/8 accept'],
+                                    permanent=True, state='enabled')
+        self.assertFalse(result['changed'])
+
+        result = self.run_firewalld(rich_rule=['rule family=ipv4 source address=10.0.0.0/8 accept'],
+                                    permanent=True, state='disabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.permanent['public'].settings.getRichRules(), [])
+
+    def test_interface_moved(self):
+        result = self.run_firewalld(interface='eth0', zone='internal', permanent=True, state='enabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.permanent['public'].settings.getInterfaces(), [])
+        self.assertEqual(self.client.permanent['internal'].settings.getInterfaces(), ['eth0'])
+        # Both zones are read once, the target zone is not read again to be written
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 2)
+
+    def test_zone_settings_purge(self):
+        result = self.run_firewalld(
+            zone='public', state='present', permanent=True, immediate=True, purge=True,
+            zone_settings=dict(services=['http'], ports=['80/tcp'], interfaces=['eth0'], masquerade=True),
+        )
+        self.assertTrue(result['changed'])
+        for settings in (self.client.permanent['public'].settings, self.client.runtime['public']):
+            self.assertEqual(settings.getServices(), ['http'])
+            self.assertEqual(settings.getPorts(), [('80', 'tcp')])
+            self.assertTrue(settings.getMasquerade())
+        self.assertEqual(self.client.calls['config.zone.update'], 1)
+        self.assertEqual(self.client.calls['setZoneSettings'], 1)
+
+    def test_zone_settings_rejected_before_write(self):
+        zone_settings = dict(services=['http'])
+        result = self.run_firewalld(zone='public', state='present', permanent=True, timeout=60, zone_settings=zone_settings)
+        self.assertTrue(result['failed'])
+
+        client = OldFirewallClient(zones={'public': make_zone_settings(services=['ssh'])})
+        with fake_firewalld(client):
+            result = self.run_firewalld(zone='public', state='present', permanent=True, immediate=True, zone_settings=zone_settings)
+        self.assertTrue(result['failed'])
+        self.assertIn('0.9.0', result['msg'])
+        self.assertEqual(client.calls['config.zone.update'], 0)
+        self.assertEqual(client.permanent['public'].settings.getServices(), ['ssh'])
+
+    def test_zone_present_and_absent(self):
+        result = self.run_firewalld(zone='custom', state='present', permanent=True)
+        self.assertTrue(result['changed'])
+        self.assertIn('custom', self.client.permanent)
+
+        result = self.run_firewalld(zone='custom', state='absent', permanent=True)
+        self.assertTrue(result['changed'])
+        self.assertNotIn('custom', self.client.permanent)
+
+    def test_runtime_only_settings_kept(self):
+        self.client.runtime['public'].addService('runtime-only')
+        self.client.runtime['internal'].addService('runtime-only')
+        result = self.run_firewalld(port=['80/tcp', '443/tcp'], permanent=True, immediate=True, state='enabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.calls['reload'], 0)
+        self.assertEqual(self.client.calls['setZoneSettings'], 1)
+        self.assertEqual(self.client.runtime['public'].getServices(), ['ssh', 'runtime-only'])
+        self.assertEqual(self.client.runtime['public'].getPorts(), [('22', 'tcp'), ('80', 'tcp'), ('443', 'tcp')])
+        self.assertEqual(self.client.runtime['internal'].getServices(), ['runtime-only'])
+        self.assertEqual(self.client.permanent['public'].settings.getServices(), ['ssh'])
+
+        # Only the items missing from the runtime configuration are added to it
+        self.client.runtime['public'].removePort('80', 'tcp')
+        self.client.reset_calls()
+        result = self.run_firewalld(port=['80/tcp', '443/tcp'], permanent=True, immediate=True, state='enabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.calls['config.zone.update'], 0)
+        self.assertEqual(self.client.calls['setZoneSettings'], 1)
+        self.assertEqual(self.client.runtime['public'].getServices(), ['ssh', 'runtime-only'])
+
+    def test_perf(self):
+        result = self.run_firewalld(port='80/tcp', permanent=True, state='enabled', perf=True)
+        self.assertEqual(result['perf']['operations']['update_fw_settings']['count'], 1)
+        self.assertEqual(result['perf']['calls'], sum(op['count'] for op in result['perf']['operations'].values()))
+
+    def test_invalid_zone(self):
+        result = self.run_firewalld(service='http', zone='missing', permanent=True, state='enabled')
+        self.assertTrue(result['failed'])
+        self.assertIn('INVALID_ZONE', result['msg'])
+
+    def test_rich_rule_with_comma(self):
+        rule = 'rule family="ipv4" source address="10.0.0.0/8" log prefix="a,b" accept'
+        result = self.run_firewalld(rich_rule=rule, permanent=True, state='enabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.client.permanent['public'].settings.getRichRules(), [rule])
+
+        result = self.run_firewalld(rich_rule=[rule, 'rule family="ipv6" accept'], permanent=True, state='enabled')
+        self.assertTrue(result['changed'])
+        self.assertEqual(len(self.client.permanent['public'].settings.getRichRules()), 2)
+
+        result = self.run_firewalld(rich_rule={'rule': 'accept'}, permanent=True, state='enabled')
+        self.assertTrue(result['failed'])
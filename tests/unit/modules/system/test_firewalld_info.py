@@ -0,0 +1,139 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+
+from ansible_collections.ansible.posix.plugins.modules import firewalld_info
+from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock, patch
+from ansible_collections.ansible.posix.tests.unit.mock.firewalld import (
+    FAKE_FW_VERSION,
+    FakeFirewallClient,
+    FakeFirewallError,
+    make_zone_settings,
+)
+from ansible_collections.ansible.posix.tests.unit.modules.utils import ModuleTestCase
+
+
+class FirewalldInfoTestCase(ModuleTestCase):
+
+    def setUp(self):
+        super(FirewalldInfoTestCase, self).setUp()
+        self.client = FakeFirewallClient(zones={
+            'public': make_zone_settings(services=['ssh'], ports=[('22', 'tcp')], interfaces=['eth0']),
+            'internal': make_zone_settings(rich_rules=['rule family="ipv4" accept']),
+        })
+
+        dbus = MagicMock(name='dbus')
+        dbus.Boolean = bool
+        dbus.exceptions.DBusException = FakeFirewallError
+        patcher = patch.multiple(
+            firewalld_info,
+            create=True,
+            HAS_DBUS=True,
+            HAS_FIREWALLD=True,
+            dbus=dbus,
+            fw_client=MagicMock(FirewallClient=MagicMock(return_value=self.client)),
+            fw_config=MagicMock(VERSION=FAKE_FW_VERSION),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_all_zones(self):
+        result = self.run_module(firewalld_info, {})
+        self.assertEqual(sorted(result['collected_zones']), ['internal', 'public'])
+        info = result['firewalld_info']
+        self.assertEqual(info['version'], FAKE_FW_VERSION)
+        self.assertEqual(info['default_zone'], 'public')
+        self.assertEqual(info['zones']['public']['services'], ['ssh'])
+        self.assertEqual(info['zones']['internal']['rich_rules'], ['rule family="ipv4" accept'])
+        self.assertEqual(self.client.calls['getZoneSettings'], 2)
+
+    def test_active_zones(self):
+        result = self.run_module(firewalld_info, {'active_zones': True})
+        self.assertEqual(result['collected_zones'], ['public'])
+
+    def test_undefined_zones(self):
+        result = self.run_module(firewalld_info, {'zones': ['public', 'missing']})
+        self.assertEqual(result['collected_zones'], ['public'])
+        self.assertEqual(result['undefined_zones'], ['missing'])
+
+    def test_gather_subset(self):
+        result = self.run_module(firewalld_info, {'zones': ['public'], 'gather_subset': ['ports', 'interfaces']})
+        self.assertEqual(sorted(result['firewalld_info']['zones']['public']), ['interfaces', 'ports'])
+
+    def test_cache_file(self):
+        tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache_file = os.path.join(tmp_dir, 'cache.json')
+
+        with patch.object(firewalld_info, 'FIREWALLD_CONFIG_DIR', tmp_dir):
+            result = self.run_module(firewalld_info, {'cache_file': cache_file})
+            self.assertFalse(result['cached'])
+            self.client.reset_calls()
+
+            result = self.run_module(firewalld_info, {'cache_file': cache_file})
+            self.assertTrue(result['cached'])
+            self.assertEqual(result['firewalld_info']['zones']['public']['services'], ['ssh'])
+            self.assertEqual(self.client.calls['getZoneSettings'], 0)
+
+    def test_cache_max_age(self):
+        tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache_file = os.path.join(tmp_dir, 'cache.json')
+
+        with patch.object(firewalld_info, 'FIREWALLD_CONFIG_DIR', tmp_dir):
+            self.run_module(firewalld_info, {'cache_file': cache_file})
+            # A runtime-only change does not alter the fingerprint, the cache expires
+            self.client.runtime['public'].addService('http')
+            with patch.object(firewalld_info.time, 'time', MagicMock(return_value=firewalld_info.time.time() + 301)):
+                result = self.run_module(firewalld_info, {'cache_file': cache_file})
+            self.assertFalse(result['cached'])
+            self.assertEqual(result['firewalld_info']['zones']['public']['services'], ['ssh', 'http'])
+
+            for args in ({'cache_max_age': 0}, {'drift': True}):
+                args['cache_file'] = cache_file
+                self.assertTrue(self.run_module(firewalld_info, args)['failed'])
+
+    def test_fingerprint_without_mtime_ns(self):
+        tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        with open(os.path.join(tmp_dir, 'public.xml'), 'w') as f:
+            f.write('<zone/>')
+
+        # os.stat_result of Python 2
+        stat = MagicMock(spec=['st_mtime', 'st_size'], st_mtime=1.5, st_size=7)
+        params = {'active_zones': False, 'zones': None, 'gather_subset': ['all']}
+        with patch.object(firewalld_info, 'FIREWALLD_CONFIG_DIR', tmp_dir):
+            with patch.object(firewalld_info.os, 'stat', MagicMock(return_value=stat)):
+                fingerprint = firewalld_info.get_fingerprint(self.client, params)
+                stat.st_mtime = 2.5
+                self.assertNotEqual(firewalld_info.get_fingerprint(self.client, params), fingerprint)
+
+    def test_drift(self):
+        self.client.runtime['public'].addService('http')
+        self.client.runtime['public'].removePort('22', 'tcp')
+        self.client.runtime['public'].setMasquerade(True)
+        result = self.run_module(firewalld_info, {'drift': True})
+        drift = result['firewalld_info']['drift']
+        self.assertEqual(drift['internal'], {})
+        self.assertEqual(drift['public']['services'], {'runtime_only': ['http'], 'permanent_only': []})
+        self.assertEqual(drift['public']['ports'], {'runtime_only': [], 'permanent_only': [('22', 'tcp')]})
+        self.assertEqual(drift['public']['masquerade'], {'runtime': True, 'permanent': False})
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 2)
+
+    def test_drift_permanent_missing(self):
+        del self.client.permanent['internal']
+        result = self.run_module(firewalld_info, {'drift': True, 'gather_subset': ['services']})
+        drift = result['firewalld_info']['drift']
+        self.assertEqual(drift, {'internal': {'permanent_missing': True}, 'public': {}})
+        self.assertNotIn('drift', self.run_module(firewalld_info, {})['firewalld_info'])
+
+    def test_drift_permanent_error(self):
+        error = FakeFirewallError('org.freedesktop.DBus.Error.AccessDenied: not authorized')
+        with patch.object(firewalld_info, 'get_permanent_zone_settings', MagicMock(side_effect=error)):
+            result = self.run_module(firewalld_info, {'drift': True})
+        self.assertTrue(result['failed'])
+        self.assertIn('AccessDenied', result['msg'])
@@ -0,0 +1,111 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+
+from ansible_collections.ansible.posix.plugins.modules import firewalld_ipset
+from ansible_collections.ansible.posix.tests.unit.compat.mock import patch
+from ansible_collections.ansible.posix.tests.unit.mock.firewalld import (
+    FakeFirewallClient,
+    IPSetSettings,
+    fake_firewalld,
+    make_ipset_settings,
+)
+from ansible_collections.ansible.posix.tests.unit.modules.utils import ModuleTestCase
+
+
+class FirewalldIPSetTestCase(ModuleTestCase):
+
+    def setUp(self):
+        super(FirewalldIPSetTestCase, self).setUp()
+        self.client = FakeFirewallClient(ipsets={
+            'blocklist': make_ipset_settings('hash:net', entries=['192.0.2.0/24', '198.51.100.0/24']),
+        })
+        context = fake_firewalld(self.client)
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+        # The firewall python bindings may not be installed
+        patcher = patch.object(firewalld_ipset, 'new_fw_ipset_settings', IPSetSettings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_ipset(self, **args):
+        return self.run_module(firewalld_ipset, dict(args, name=args.get('name', 'blocklist')))
+
+    def permanent_entries(self, name='blocklist'):
+        return self.client.permanent_ipsets[name].settings.getEntries()
+
+    def test_add(self):
+        result = self.run_ipset(entries=['198.51.100.0/24', '203.0.113.0/24'], permanent=True, immediate=True)
+        self.assertTrue(result['changed'])
+        self.assertEqual((result['added'], result['removed']), (1, 0))
+        entries = ['192.0.2.0/24', '198.51.100.0/24', '203.0.113.0/24']
+        self.assertEqual(self.permanent_entries(), entries)
+        self.assertEqual(self.client.runtime_ipsets['blocklist'], entries)
+        # One read and one write per configuration
+        self.assertEqual(self.client.calls['config.ipset.getSettings'], 1)
+        self.assertEqual(self.client.calls['config.ipset.setEntries'], 1)
+        self.assertEqual(self.client.calls['getEntries'], 1)
+        self.assertEqual(self.client.calls['setEntries'], 1)
+
+    def test_already_present(self):
+        result = self.run_ipset(entries=['192.0.2.0/24'], permanent=True, immediate=True)
+        self.assertFalse(result['changed'])
+        self.assertEqual((result['added'], result['removed']), (0, 0))
+        self.assertEqual(self.client.calls['config.ipset.setEntries'], 0)
+        self.assertEqual(self.client.calls['setEntries'], 0)
+
+    def test_remove(self):
+        result = self.run_ipset(entries=['192.0.2.0/24', '203.0.113.0/24'], state='absent', permanent=True, immediate=True)
+        self.assertTrue(result['changed'])
+        self.assertEqual((result['added'], result['removed']), (0, 1))
+        self.assertEqual(self.permanent_entries(), ['198.51.100.0/24'])
+        self.assertEqual(self.client.runtime_ipsets['blocklist'], ['198.51.100.0/24'])
+
+        result = self.run_ipset(entries=['192.0.2.0/24'], state='absent', permanent=True, immediate=True)
+        self.assertFalse(result['changed'])
+
+    def test_purge(self):
+        result = self.run_ipset(entries=['203.0.113.0/24'], purge=True)
+        self.assertTrue(result['changed'])
+        self.assertEqual((result['added'], result['removed']), (1, 2))
+        self.assertEqual(self.client.runtime_ipsets['blocklist'], ['203.0.113.0/24'])
+        # The permanent configuration is left alone
+        self.assertEqual(self.permanent_entries(), ['192.0.2.0/24', '198.51.100.0/24'])
+
+    def test_create_and_remove(self):
+        result = self.run_ipset(name='allowlist', entries=['192.0.2.1'], permanent=True)
+        self.assertTrue(result['failed'])
+        self.assertIn('type is required to create ipset allowlist', result['msg'])
+
+        result = self.run_ipset(name='allowlist', type='hash:ip', ipset_options={'maxelem': 1024},
+                                entries=['192.0.2.1'], permanent=True)
+        self.assertTrue(result['changed'])
+        settings = self.client.permanent_ipsets['allowlist'].settings
+        self.assertEqual(settings.getType(), 'hash:ip')
+        self.assertEqual(settings.getOptions(), {'maxelem': '1024'})
+        self.assertEqual(settings.getEntries(), ['192.0.2.1'])
+        self.assertNotIn('allowlist', self.client.runtime_ipsets)
+
+        result = self.run_ipset(name='allowlist', state='absent', permanent=True)
+        self.assertTrue(result['changed'])
+        self.assertNotIn('allowlist', self.client.permanent_ipsets)
+
+    def test_entries_file(self):
+        tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        entries_file = os.path.join(tmp_dir, 'entries.txt')
+        with open(entries_file, 'w') as f:
+            f.write('# blocked networks\n192.0.2.0/24\n\n  203.0.113.0/24  \n')
+
+        result = self.run_ipset(entries_file=entries_file, purge=True, permanent=True)
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.permanent_entries(), ['192.0.2.0/24', '203.0.113.0/24'])
+
+        result = self.run_ipset(entries_file=os.path.join(tmp_dir, 'missing'), permanent=True)
+        self.assertTrue(result['failed'])
+        self.assertIn('Unable to read entries_file', result['msg'])
@@ -3,17 +3,28 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import os
+import shutil
+import stat
 import tempfile
 
 from ansible_collections.ansible.posix.tests.unit.compat import unittest
-from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock
+from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock, patch
+from ansible.module_utils import basic
 from ansible.module_utils.common.text.converters import to_bytes
 
+from ansible_collections.ansible.posix.plugins.modules import mount
+
 from ansible_collections.ansible.posix.plugins.modules.mount import (
+    _is_same_mount_src,
     get_linux_mounts,
+    get_mount_dependencies,
+    mount_opts_differ,
+    run_ordered,
     _set_mount_save_old,
     set_mount,
 )
+from ansible_collections.ansible.posix.plugins.module_utils.mount import LinuxMounts
+from ansible_collections.ansible.posix.tests.unit.modules.utils import ModuleTestCase
 
 
 class LinuxMountsTestCase(unittest.TestCase):
@@ -32,6 +43,66 @@ class LinuxMountsTestCase(unittest.TestCase):
         )
         mounts = get_linux_mounts(None, path)
         self.assertEqual(mounts['/tmp/bbb']['src'], '/tmp/aaa')
+        self.assertEqual(mounts['/tmp/bbb']['source'], '/dev/sdb2')
+        self.assertEqual(mounts['/tmp/bbb']['device'], '253:2')
+
+    def test_is_same_mount_src(self):
+        path = self._create_file(
+            '22 1 8:1 / / rw - ext4 /dev/sda1 rw\n'
+            '23 22 8:17 / /data rw - xfs /dev/sdb1 rw\n'
+            '24 22 8:1 /srv /bind rw - ext4 /dev/sda1 rw\n'
+            '25 22 0:50 / /nfs rw - nfs4 server:/export rw\n'
+        )
+        mounts = get_linux_mounts(None, path)
+        devices = {
+            '/dev/disk/by-uuid/8ac075e3': os.makedev(8, 17),
+            '/dev/disk/by-label/my\\x20data': os.makedev(8, 17),
+            '/dev/sdb1': os.makedev(8, 17),
+            '/dev/sdc1': os.makedev(8, 33),
+        }
+
+        def fake_stat(path):
+            if path not in devices:
+                raise OSError(2, 'No such file or directory')
+            return MagicMock(st_mode=stat.S_IFBLK | 0o660, st_rdev=devices[path])
+
+        module = MagicMock(name='AnsibleModule')
+        with patch.multiple(mount.platform, system=MagicMock(return_value='Linux')), patch.object(mount.os, 'stat', fake_stat):
+            for src in ('/dev/sdb1', 'UUID=8ac075e3', 'LABEL="my data"'):
+                self.assertTrue(_is_same_mount_src(module, src, '/data', mounts), src)
+            for src in ('/dev/sdc1', 'UUID=other', '/srv'):
+                self.assertFalse(_is_same_mount_src(module, src, '/data', mounts), src)
+            self.assertTrue(_is_same_mount_src(module, '/srv', '/bind', mounts))
+            self.assertTrue(_is_same_mount_src(module, 'server:/export', '/nfs', mounts))
+            self.assertFalse(_is_same_mount_src(module, '/dev/sdb1', '/mnt', mounts))
+        module.run_command.assert_not_called()
+
+    def test_mount_opts_differ(self):
+        mounts = LinuxMounts([
+            '22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw,errors=remount-ro\n',
+            '23 22 0:50 / /tmp rw,nosuid,nodev,noatime - tmpfs tmpfs rw,size=2097152k,mode=1777\n',
+            '24 22 8:17 / /data ro,relatime - xfs /dev/sdb1 ro,attr2,inode64\n',
+        ])
+        for dst, opts in (
+            ('/', ''),
+            ('/', 'defaults'),
+            ('/', 'defaults,noauto,nofail,x-systemd.automount,errors=remount-ro'),
+            ('/', 'rw,relatime,async'),
+            ('/tmp', 'nosuid,nodev,noatime,size=2G,mode=01777'),
+            ('/data', 'defaults,ro,inode64'),
+        ):
+            self.assertFalse(mount_opts_differ(mounts[dst], opts), (dst, opts))
+        for dst, opts in (
+            ('/', 'ro'),
+            ('/', 'noexec'),
+            ('/', 'strictatime'),
+            ('/', 'sync'),
+            ('/', 'discard'),
+            ('/tmp', 'defaults'),
+            ('/tmp', 'size=1G'),
+            ('/data', 'defaults'),
+        ):
+            self.assertTrue(mount_opts_differ(mounts[dst], opts), (dst, opts))
 
     def test_set_mount_save_old(self):
         module = MagicMock(name='AnsibleModule')
@@ -61,3 +132,250 @@ class LinuxMountsTestCase(unittest.TestCase):
         self.assertEqual(backup_lines, fstab_data)
         self.assertEqual(name, '/data')
         self.assertTrue(changed)
+
+
+class MountOrderTestCase(unittest.TestCase):
+
+    PATHS = ['/srv/a/x', '/srv', '/srv/a', '/mnt', '/srv/a/x/deep/er', '/srv/b']
+
+    def test_dependencies(self):
+        indexes = list(range(len(self.PATHS)))
+        self.assertEqual(get_mount_dependencies(self.PATHS, indexes), {
+            0: set([2]), 1: set(), 2: set([1]), 3: set(), 4: set([0]), 5: set([1]),
+        })
+        self.assertEqual(get_mount_dependencies(self.PATHS, indexes, reverse=True), {
+            0: set([4]), 1: set([2, 5]), 2: set([0]), 3: set(), 4: set(), 5: set(),
+        })
+        self.assertEqual(get_mount_dependencies(self.PATHS, [0, 1, 4]), {0: set([1]), 1: set(), 4: set([0])})
+
+    def test_run_ordered(self):
+        indexes = list(range(len(self.PATHS)))
+        for workers in (1, 3):
+            calls = []
+            skipped = run_ordered(
+                indexes, get_mount_dependencies(self.PATHS, indexes), lambda i: calls.append(i) or i != 2, workers)
+            self.assertEqual(sorted(calls), [1, 2, 3, 5])
+            self.assertLess(calls.index(1), calls.index(2))
+            self.assertEqual(skipped, {0: 2, 4: 2})
+
+        calls = []
+        run_ordered(indexes, get_mount_dependencies(self.PATHS, indexes, reverse=True), lambda i: calls.append(i) or True, 1)
+        self.assertEqual(calls, [3, 4, 0, 2, 5, 1])
+
+    def test_run_ordered_without_futures(self):
+        indexes = list(range(len(self.PATHS)))
+        calls = []
+        with patch.object(mount, 'HAS_FUTURES', False):
+            skipped = run_ordered(
+                indexes, get_mount_dependencies(self.PATHS, indexes), lambda i: calls.append(i) or i != 2, 3)
+        self.assertEqual(calls, [1, 2, 3, 5])
+        self.assertEqual(skipped, {0: 2, 4: 2})
+
+
+class MountModuleTestCase(ModuleTestCase):
+
+    def setUp(self):
+        super(MountModuleTestCase, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.fstab = os.path.join(self.tmp_dir, 'fstab')
+        with open(self.fstab, 'w') as f:
+            f.write('# static file system information\n'
+                    'server:/old %s/old nfs rw 0 0\n'
+                    'server:/home %s/home nfs rw 0 0\n' % (self.tmp_dir, self.tmp_dir))
+
+        self.mounted = set([os.path.join(self.tmp_dir, 'home'), os.path.join(self.tmp_dir, 'old')])
+        self.failing = set()
+        self.commands = []
+
+        def run_command(module, cmd, *args, **kwargs):
+            self.commands.append(cmd)
+            if cmd[-1] in self.failing:
+                return 32, '', 'mount failed'
+            return 0, '', ''
+
+        patcher = patch.multiple(mount, get_linux_mounts=MagicMock(return_value={}))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for target, kwargs in (
+            (mount.MountPoints, dict(ismount=lambda mount_points, path: path in self.mounted)),
+            (mount.platform, dict(system=MagicMock(return_value='Linux'))),
+            (basic.AnsibleModule, dict(run_command=run_command, get_bin_path=MagicMock(side_effect=lambda name, **kwargs: '/bin/' + name))),
+        ):
+            patcher = patch.multiple(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.write_fstab = MagicMock(wraps=mount.write_fstab)
+        patcher = patch.object(mount, 'write_fstab', self.write_fstab)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir, name)
+
+    def read_fstab(self):
+        with open(self.fstab) as f:
+            return f.read()
+
+    def test_mounts(self):
+        result = self.run_module(mount, {
+            'fstab': self.fstab,
+            'fstype': 'nfs',
+            'opts': 'rw',
+            'state': 'mounted',
+            'mounts': [
+                {'path': self.path('home'), 'src': 'server:/home'},
+                {'path': self.path('data'), 'src': 'server:/data'},
+                {'path': self.path('data/sub'), 'src': 'server:/sub', 'opts': 'ro'},
+                {'path': self.path('old'), 'state': 'absent'},
+            ],
+        })
+        self.assertTrue(result['changed'])
+        self.assertEqual([item['changed'] for item in result['mounts']], [False, True, True, True])
+        self.assertEqual(result['mounts'][2]['opts'], 'ro')
+        self.assertEqual(self.write_fstab.call_count, 1)
+        self.assertEqual(self.read_fstab(), (
+            '# static file system information\n'
+            'server:/home %(dir)s/home nfs rw 0 0\n'
+            'server:/data %(dir)s/data nfs rw 0 0\n'
+            'server:/sub %(dir)s/data/sub nfs ro 0 0\n') % {'dir': self.tmp_dir})
+        self.assertEqual([cmd[0] for cmd in self.commands], ['/bin/umount', '/bin/mount', '/bin/mount'])
+        self.assertTrue(os.path.isdir(self.path('data/sub')))
+
+    def test_mounts_parallel(self):
+        self.failing.add(self.path('b'))
+        result = self.run_module(mount, {
+            'fstab': self.fstab,
+            'fstype': 'nfs',
+            'state': 'mounted',
+            'parallel': 4,
+            'mounts': [
+                {'path': self.path('a/x'), 'src': 'server:/ax'},
+                {'path': self.path('b/y'), 'src': 'server:/by'},
+                {'path': self.path('a'), 'src': 'server:/a'},
+                {'path': self.path('b'), 'src': 'server:/b'},
+                {'path': self.path('c'), 'src': 'server:/c'},
+            ],
+        })
+        mounted = [cmd[-1] for cmd in self.commands]
+        self.assertLess(mounted.index(self.path('a')), mounted.index(self.path('a/x')))
+        self.assertEqual(sorted(mounted), [self.path(name) for name in ('a', 'a/x', 'b', 'c')])
+        self.assertEqual(result['mounts'][1]['msg'], 'Skipped %s because %s failed' % (self.path('b/y'), self.path('b')))
+        self.assertEqual([item.get('failed', False) for item in result['mounts']], [False, True, False, True, False])
+
+    def test_mounts_check_mode(self):
+        before = self.read_fstab()
+        result = self.run_module(mount, {
+            'fstab': self.fstab,
+            '_ansible_check_mode': True,
+            'mounts': [{'path': self.path('data'), 'src': 'server:/data', 'fstype': 'nfs', 'state': 'mounted'}],
+        })
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.read_fstab(), before)
+        self.assertEqual(self.commands, [])
+
+    def test_mounts_failure(self):
+        self.failing.add(self.path('data'))
+        result = self.run_module(mount, {
+            'fstab': self.fstab,
+            'fstype': 'nfs',
+            'state': 'mounted',
+            'mounts': [
+                {'path': self.path('data'), 'src': 'server:/data'},
+                {'path': self.path('scratch'), 'src': 'server:/scratch'},
+            ],
+        })
+        self.assertTrue(result['failed'])
+        self.assertIn('Error mounting %s' % self.path('data'), result['msg'])
+        self.assertTrue(result['mounts'][0]['failed'])
+        self.assertNotIn('failed', result['mounts'][1])
+        self.assertNotIn('server:/data', self.read_fstab())
+        self.assertIn('server:/scratch', self.read_fstab())
+        self.assertFalse(os.path.exists(self.path('data')))
+
+    def test_mounts_worker_error(self):
+        self.failing.add(self.path('home'))
+        result = self.run_module(mount, {
+            'fstab': self.fstab,
+            'fstype': 'nfs',
+            'parallel': 2,
+            'mounts': [
+                {'path': self.path('home'), 'opts': 'ro', 'state': 'remounted'},
+                {'path': self.path('data'), 'src': 'server:/data', 'state': 'mounted'},
+            ],
+        })
+        self.assertTrue(result['failed'])
+        self.assertTrue(result['mounts'][0]['msg'].startswith('Options were specified with remounted'))
+        self.assertNotIn('failed', result['mounts'][1])
+        self.assertIn('server:/data', self.read_fstab())
+
+        self.commands = []
+        basic.AnsibleModule.get_bin_path.side_effect = lambda name, **kwargs: None if name == 'umount' else '/bin/' + name
+        result = self.run_module(mount, {
+            'fstab': self.fstab,
+            'mounts': [{'path': self.path('old'), 'state': 'unmounted'}],
+        })
+        self.assertTrue(result['failed'])
+        self.assertEqual(result['mounts'][0]['msg'], 'Failed to find required executable "umount"')
+        self.assertEqual(self.commands, [])
+
+    def test_settle_timeout(self):
+        settled = set([self.path('data')])
+        wait = MagicMock(side_effect=lambda path, timeout: path in settled)
+        with patch.object(mount, 'wait_for_mount', wait):
+            result = self.run_module(mount, {
+                'fstab': self.fstab,
+                'fstype': 'nfs',
+                'state': 'ephemeral',
+                'settle_timeout': 5,
+                'mounts': [
+                    {'path': self.path('data'), 'src': 'server:/data'},
+                    {'path': self.path('auto'), 'src': 'server:/auto'},
+                ],
+            })
+        self.assertEqual([item.get('failed', False) for item in result['mounts']], [False, True])
+        self.assertEqual(result['mounts'][1]['msg'], '%s did not appear in the mount table within 5 seconds' % self.path('auto'))
+        self.assertEqual(sorted(wait.call_args_list), sorted([((self.path('data'), 5),), ((self.path('auto'), 5),)]))
+
+    def test_mounts_validation(self):
+        result = self.run_module(mount, {
+            'fstab': self.fstab,
+            'mounts': [{'path': self.path('data'), 'state': 'present'}],
+        })
+        self.assertTrue(result['failed'])
+        self.assertIn('missing: src, fstype', result['msg'])
+
+        result = self.run_module(mount, {'fstab': self.fstab, 'path': self.path('data')})
+        self.assertTrue(result['failed'])
+
+    def test_remounted_unchanged(self):
+        with open(self.fstab, 'a') as f:
+            f.write('/dev/sdb1 %s xfs noatime,nodev 0 0\n' % self.path('data'))
+        mounts = LinuxMounts([
+            '22 1 8:1 / / rw,relatime - ext4 /dev/sda1 rw\n',
+            '23 22 8:17 / %s rw,nodev,noatime - xfs /dev/sdb1 rw,attr2\n' % self.path('data'),
+        ])
+        mount.get_linux_mounts.return_value = mounts
+
+        result = self.run_module(mount, {'fstab': self.fstab, 'path': self.path('data'), 'state': 'remounted'})
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.commands, [['/bin/mount', '-o', 'remount', '-T', self.fstab, self.path('data')]])
+
+        self.commands = []
+        args = {'fstab': self.fstab, 'path': self.path('data'), 'state': 'remounted', 'skip_unchanged_remount': True}
+        result = self.run_module(mount, args)
+        self.assertFalse(result['changed'])
+        result = self.run_module(mount, dict(args, opts='nodev,relatime'))
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.commands, [['/bin/mount', '-o', 'remount,nodev,relatime', '-T', self.fstab, self.path('data')]])
+
+    def test_single_mount_point(self):
+        result = self.run_module(mount, {
+            'fstab': self.fstab, 'path': self.path('data'), 'src': 'server:/data', 'fstype': 'nfs', 'state': 'present',
+        })
+        self.assertTrue(result['changed'])
+        self.assertEqual(result['name'], self.path('data'))
+        self.assertEqual(result['fstab'], self.fstab)
+        self.assertNotIn('mounts', result)
+        self.assertIn('server:/data %s nfs defaults 0 0\n' % self.path('data'), self.read_fstab())
@@ -0,0 +1,99 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+
+from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock, patch
+from ansible.module_utils import basic
+
+from ansible_collections.ansible.posix.plugins.modules import mount_info
+from ansible_collections.ansible.posix.tests.unit.modules.utils import ModuleTestCase
+
+
+MOUNTINFO = (
+    '22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw,errors=remount-ro\n'
+    '23 22 8:17 / /srv/data rw,noatime - xfs /dev/sdb1 rw,attr2\n'
+    '24 22 8:1 /home/shared /srv/my\\040share rw,relatime - ext4 /dev/sda1 rw\n'
+    '25 22 0:50 / /srv/nfs rw,relatime - nfs4 server:/export rw,vers=4.2\n'
+    '26 22 0:51 / /srvx rw - tmpfs tmpfs rw\n'
+)
+
+FSTAB = (
+    '# /etc/fstab\n'
+    '/dev/sda1 / ext4 errors=remount-ro 0 1\n'
+    '/dev/sdb1 /srv/data xfs noatime 0 2\n'
+    '/home/shared /srv/my\\040share none bind\n'
+    '/swapfile none swap sw 0 0\n'
+)
+
+
+class MountInfoTestCase(ModuleTestCase):
+
+    def setUp(self):
+        super(MountInfoTestCase, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.fstab = os.path.join(self.tmp_dir, 'fstab')
+        with open(self.fstab, 'w') as f:
+            f.write(FSTAB)
+        mountinfo = os.path.join(self.tmp_dir, 'mountinfo')
+        with open(mountinfo, 'w') as f:
+            f.write(MOUNTINFO)
+
+        for target, kwargs in (
+            (mount_info, dict(MOUNTINFO=mountinfo)),
+            (mount_info.platform, dict(system=MagicMock(return_value='Linux'))),
+        ):
+            patcher = patch.multiple(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_all(self):
+        result = self.run_module(mount_info, {'fstab': self.fstab})
+        self.assertFalse(result['changed'])
+        mounts = result['mount_info']['mounts']
+        self.assertEqual(sorted(mounts), ['/', '/srv/data', '/srv/my share', '/srv/nfs', '/srvx'])
+        self.assertEqual(mounts['/srv/data'], dict(
+            path='/srv/data', src='/dev/sdb1', fstype='xfs', opts='rw,noatime', device='8:17',
+            source='/dev/sdb1', super_opts='rw,attr2'))
+        self.assertEqual(mounts['/srv/my share']['src'], '/home/shared')
+        fstab = result['mount_info']['fstab']
+        self.assertEqual([entry['path'] for entry in fstab], ['/', '/srv/data', '/srv/my share', 'none'])
+        self.assertEqual(fstab[2], dict(path='/srv/my share', src='/home/shared', fstype='none', opts='bind', dump='0', passno='0'))
+
+    def test_filters(self):
+        result = self.run_module(mount_info, {'fstab': self.fstab, 'paths': ['/srv/'], 'fields': ['src', 'fstype']})
+        self.assertEqual(result['mount_info']['mounts'], {
+            '/srv/data': dict(src='/dev/sdb1', fstype='xfs'),
+            '/srv/my share': dict(src='/home/shared', fstype='ext4'),
+            '/srv/nfs': dict(src='server:/export', fstype='nfs4'),
+        })
+        self.assertEqual(len(result['mount_info']['fstab']), 2)
+
+        result = self.run_module(mount_info, {'fstab': self.fstab, 'fstype': ['nfs4', 'xfs'], 'gather_subset': ['mounts']})
+        self.assertEqual(sorted(result['mount_info']['mounts']), ['/srv/data', '/srv/nfs'])
+        self.assertNotIn('fstab', result['mount_info'])
+
+        result = self.run_module(mount_info, {'fstab': self.fstab, 'src': ['/dev/sda1', '/home/shared']})
+        self.assertEqual(sorted(result['mount_info']['mounts']), ['/', '/srv/my share'])
+        self.assertEqual([entry['path'] for entry in result['mount_info']['fstab']], ['/', '/srv/my share'])
+
+    def test_fstab_only(self):
+        with patch.object(mount_info.platform, 'system', MagicMock(return_value='FreeBSD')):
+            with patch.object(basic.AnsibleModule, 'warn') as warn:
+                result = self.run_module(mount_info, {'fstab': self.fstab})
+            self.assertEqual(sorted(result['mount_info']), ['fstab'])
+            self.assertEqual(warn.call_count, 1)
+
+            result = self.run_module(mount_info, {'fstab': self.fstab, 'gather_subset': ['all', 'mounts']})
+            self.assertTrue(result['failed'])
+
+            result = self.run_module(mount_info, {'fstab': self.fstab, 'gather_subset': ['fstab'], 'fields': ['path', 'device']})
+            # Entries need all six fields on BSD
+            self.assertEqual(result['mount_info'], {'fstab': [dict(path=path) for path in ('/', '/srv/data', 'none')]})
+
+        result = self.run_module(mount_info, {'fstab': os.path.join(self.tmp_dir, 'missing')})
+        self.assertTrue(result['failed'])
@@ -0,0 +1,105 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+
+from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock, patch
+from ansible.module_utils import basic
+
+from ansible_collections.ansible.posix.plugins.modules import sysctl
+from ansible_collections.ansible.posix.tests.unit.modules.utils import ModuleTestCase
+
+
+SYSCTL_CONF = (
+    '# kernel parameters\n'
+    'ansible.test.a = 1\n'
+    'ansible.test.b=0\n'
+    'ansible.test.a = 2\n'
+)
+
+CURRENT_VALUES = {
+    'ansible.test.a': '1\n',
+    'ansible.test.b': '0\n',
+    'ansible.test.c': '4096\t131072\t6291456\n',
+}
+
+
+class SysctlParametersTestCase(ModuleTestCase):
+
+    def setUp(self):
+        super(SysctlParametersTestCase, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.sysctl_file = os.path.join(self.tmp_dir, 'sysctl.conf')
+        with open(self.sysctl_file, 'w') as f:
+            f.write(SYSCTL_CONF)
+
+        self.current_values = dict(CURRENT_VALUES)
+        self.run_command = MagicMock(side_effect=self.set_values)
+        for target, kwargs in (
+            (basic.AnsibleModule, dict(get_bin_path=MagicMock(return_value='/sbin/sysctl'), run_command=self.run_command)),
+            (sysctl.SysctlModule, dict(get_token_curr_value=lambda module, token: self.current_values.get(token, ''))),
+            (sysctl.platform, dict(system=MagicMock(return_value='Linux'))),
+        ):
+            patcher = patch.multiple(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def set_values(self, cmd, **kwargs):
+        for arg in cmd[2:]:
+            token, value = arg.split('=', 1)
+            self.current_values[token] = value + '\n'
+        return 0, '', ''
+
+    def read_sysctl_file(self):
+        with open(self.sysctl_file) as f:
+            return f.read()
+
+    def test_present(self):
+        parameters = {'ansible.test.a': 1, 'ansible.test.b': True, 'ansible.test.c': '4096 131072 6291456'}
+        result = self.run_module(sysctl, {'parameters': parameters, 'sysctl_file': self.sysctl_file})
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.read_sysctl_file(), (
+            '# kernel parameters\n'
+            'ansible.test.a=1\n'
+            'ansible.test.b=1\n'
+            'ansible.test.c=4096 131072 6291456\n'
+        ))
+        # Only the value which differs is set, in one command and without reloading the file
+        self.run_command.assert_called_once_with(['/sbin/sysctl', '-w', 'ansible.test.b=1'], environ_update=sysctl.SysctlModule.LANG_ENV)
+
+        self.run_command.reset_mock()
+        result = self.run_module(sysctl, {'parameters': parameters, 'sysctl_file': self.sysctl_file})
+        self.assertFalse(result['changed'])
+        self.run_command.assert_not_called()
+
+    def test_absent(self):
+        parameters = {'ansible.test.a': None, 'ansible.test.c': None}
+        result = self.run_module(sysctl, {'parameters': parameters, 'state': 'absent', 'sysctl_file': self.sysctl_file})
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.read_sysctl_file(), '# kernel parameters\nansible.test.b=0\n')
+        self.run_command.assert_not_called()
+
+    def test_invalid(self):
+        for args in (
+            {'parameters': {}},
+            {'parameters': {' ': '1'}},
+            {'parameters': {'ansible.test.a': ''}},
+            {'parameters': {'ansible.test.a': '1'}, 'name': 'ansible.test.b'},
+        ):
+            args['sysctl_file'] = self.sysctl_file
+            result = self.run_module(sysctl, args)
+            self.assertTrue(result['failed'], args)
+        self.assertEqual(self.read_sysctl_file(), SYSCTL_CONF)
+
+    def test_token_path(self):
+        module = object.__new__(sysctl.SysctlModule)
+        for token, path in (
+            ('kernel.panic', 'kernel/panic'),
+            ('net.ipv4.conf.eth0/1.rp_filter', 'net/ipv4/conf/eth0.1/rp_filter'),
+            ('net/ipv4/conf/eth0.1/rp_filter', 'net/ipv4/conf/eth0.1/rp_filter'),
+        ):
+            self.assertEqual(module._token_path(token), path)
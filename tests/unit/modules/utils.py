@@ -0,0 +1,65 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import contextlib
+import json
+
+from ansible.module_utils import basic
+from ansible.module_utils.common.text.converters import to_bytes
+
+from ansible_collections.ansible.posix.tests.unit.compat import unittest
+from ansible_collections.ansible.posix.tests.unit.compat.mock import patch
+
+
+@contextlib.contextmanager
+def set_module_args(args):
+    """Run a module with args as its module arguments."""
+    try:
+        from ansible.module_utils.testing import patch_module_args
+    except ImportError:
+        # ansible-core < 2.19
+        with patch.object(basic, '_ANSIBLE_ARGS', to_bytes(json.dumps({'ANSIBLE_MODULE_ARGS': args}))):
+            yield
+    else:
+        with patch_module_args(args):
+            yield
+
+
+class AnsibleExitJson(Exception):
+    pass
+
+
+class AnsibleFailJson(Exception):
+    pass
+
+
+def exit_json(*args, **kwargs):
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class ModuleTestCase(unittest.TestCase):
+    """Test case running module main() functions, see run_module()."""
+
+    def setUp(self):
+        patcher = patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_module(self, module, args):
+        """Run module.main() with args and return its result."""
+        with set_module_args(args):
+            try:
+                module.main()
+            except AnsibleExitJson as e:
+                return e.args[0]
+            except AnsibleFailJson as e:
+                return e.args[0]
+        self.fail('module did not exit')
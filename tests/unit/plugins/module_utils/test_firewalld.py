@@ -0,0 +1,321 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import sys
+import tempfile
+
+from ansible_collections.ansible.posix.tests.unit.compat import unittest
+from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock, patch
+from ansible_collections.ansible.posix.tests.unit.mock.firewalld import (
+    FakeFirewallClient,
+    fake_firewalld,
+    make_zone_settings,
+    reset_transaction_state,
+)
+
+from ansible_collections.ansible.posix.plugins.module_utils import firewalld as firewalld_utils
+from ansible_collections.ansible.posix.plugins.module_utils.firewalld import (
+    FirewallTransaction,
+    RichRuleIndex,
+    normalize_rich_rule,
+)
+from ansible_collections.ansible.posix.plugins.module_utils.firewalld_xml import FirewallXml, ZoneSettings
+
+
+class NormalizeRichRuleTestCase(unittest.TestCase):
+
+    def test_equivalent_rules(self):
+        rule = 'rule family="ipv4" source address="10.0.0.0/8" service name="ftp" log prefix="ftp x" level="info" limit value="1/m" accept'
+        for equivalent in (
+            'rule  family=ipv4 source address=10.0.0.0/8   service name=ftp log prefix="ftp x" level=info limit value=1/m accept',
+            'rule family="ipv4" service name="ftp" source address="10.0.0.0/8" accept log level="info" prefix="ftp x" limit value="1/m"',
+            'rule priority=0 family="ipv4" source address="10.0.0.0/8" service name="ftp" log prefix="ftp x" level="info" limit value="1/m" accept',
+        ):
+            self.assertEqual(normalize_rich_rule(rule), normalize_rich_rule(equivalent))
+
+    def test_different_rules(self):
+        rule = normalize_rich_rule('rule family="ipv4" source address="10.0.0.0/8" accept')
+        self.assertNotEqual(rule, normalize_rich_rule('rule family="ipv4" source not address="10.0.0.0/8" accept'))
+        self.assertNotEqual(rule, normalize_rich_rule('rule family="ipv4" source address="10.0.0.0/8" drop'))
+        self.assertNotEqual(rule, normalize_rich_rule('rule family="ipv4" source address="10.0.0.0/8" accept limit value="1/m"'))
+        self.assertNotEqual(
+            normalize_rich_rule('rule log limit value="1/m" accept'),
+            normalize_rich_rule('rule log accept limit value="1/m"'),
+        )
+
+    def test_invalid_rules(self):
+        for rule in ('', 'family="ipv4" accept', 'rule family="ipv4 accept', 'not family=ipv4'):
+            self.assertRaises(ValueError, normalize_rich_rule, rule)
+
+    def test_index(self):
+        index = RichRuleIndex(['rule family="ipv4" source address="10.0.0.0/8" accept'])
+        self.assertIn('rule family=ipv4  source address=10.0.0.0/8 accept', index)
+        self.assertEqual(index.get('rule family=ipv4 source address=10.0.0.0/8 accept'),
+                         'rule family="ipv4" source address="10.0.0.0/8" accept')
+        index.add('rule family=ipv4 source address=10.0.0.0/8 accept')
+        self.assertEqual(len(index), 1)
+        index.discard('rule family=ipv4 source address=10.0.0.0/8 accept')
+        self.assertNotIn('rule family="ipv4" source address="10.0.0.0/8" accept', index)
+
+
+class ServiceItemsTransaction(FirewallTransaction):
+    """Batched transaction on the services of a zone."""
+
+    def get_enabled_settings(self, fw_settings, service):
+        return service in fw_settings.getServices()
+
+    def set_enabled_settings(self, fw_settings, service):
+        fw_settings.addService(service)
+
+    def set_disabled_settings(self, fw_settings, service):
+        fw_settings.removeService(service)
+
+    def set_enabled_immediate(self, service):
+        self.fw.addService(self.zone, service)
+
+    def set_disabled_immediate(self, service):
+        self.fw.removeService(self.zone, service)
+
+
+class FirewallTransactionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeFirewallClient(zones={
+            'public': make_zone_settings(services=['ssh']),
+            'internal': make_zone_settings(),
+        })
+        context = fake_firewalld(self.client)
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+        self.module = MagicMock(name='AnsibleModule')
+        self.module.check_mode = False
+        self.module.params = {'timeout': 0, 'perf': False}
+
+    def test_default_zone(self):
+        transaction = FirewallTransaction(self.module)
+        self.assertEqual(transaction.zone, 'public')
+
+    def test_zone_settings_cache(self):
+        transaction = FirewallTransaction(self.module, zone='public')
+        fw_zone, fw_settings = transaction.get_fw_zone_settings()
+        self.assertIs(transaction.get_fw_zone_settings(), FirewallTransaction(self.module).get_fw_zone_settings())
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 1)
+
+        fw_settings.addService('http')
+        transaction.update_fw_settings(fw_zone, fw_settings)
+        self.assertEqual(self.client.calls['config.zone.update'], 1)
+        self.assertEqual(transaction.get_fw_zone_settings()[1].getServices(), ['ssh', 'http'])
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 2)
+
+    def test_zone_settings_cache_invalidate(self):
+        transaction = FirewallTransaction(self.module, zone='public')
+        public = transaction.get_fw_zone_settings()
+        internal = transaction.get_fw_zone_settings('internal')
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 2)
+
+        FirewallTransaction.invalidate_fw_zone_settings('internal')
+        self.assertIs(transaction.get_fw_zone_settings(), public)
+        self.assertIsNot(transaction.get_fw_zone_settings('internal'), internal)
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 3)
+
+        FirewallTransaction.invalidate_fw_zone_settings()
+        transaction.get_fw_zone_settings()
+        transaction.get_fw_zone_settings('internal')
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 5)
+
+    def test_runtime_in_sync(self):
+        transaction = FirewallTransaction(self.module, zone='public')
+        dummy, fw_settings = transaction.get_fw_zone_settings()
+        runtime_settings = transaction.get_fw_runtime_settings()
+        self.assertTrue(transaction.is_runtime_in_sync(fw_settings, runtime_settings))
+
+        runtime_settings.addService('http')
+        self.assertFalse(transaction.is_runtime_in_sync(fw_settings, runtime_settings))
+
+    def run_items(self, services, desired_state='enabled', permanent=True, immediate=False):
+        transaction = ServiceItemsTransaction(
+            self.module, items=[(service,) for service in services], zone='public',
+            desired_state=desired_state, permanent=permanent, immediate=immediate,
+        )
+        changed, msgs = transaction.run()
+        return changed, [item[0] for item in transaction.changed_items]
+
+    def test_run_items_permanent(self):
+        self.assertEqual(self.run_items(['ssh', 'http', 'https']), (True, ['http', 'https']))
+        self.assertEqual(self.client.permanent['public'].settings.getServices(), ['ssh', 'http', 'https'])
+        self.assertEqual(self.client.runtime['public'].getServices(), ['ssh'])
+        self.assertEqual(self.client.calls['config.zone.getSettings'], 1)
+        self.assertEqual(self.client.calls['config.zone.update'], 1)
+        self.assertEqual(self.client.calls['getZoneSettings'], 0)
+
+        self.client.reset_calls()
+        self.assertEqual(self.run_items(['ssh', 'http', 'https']), (False, []))
+        self.assertEqual(self.client.calls['config.zone.update'], 0)
+
+    def test_run_items_immediate(self):
+        self.assertEqual(self.run_items(['ssh', 'http'], 'disabled', permanent=False, immediate=True), (True, ['ssh']))
+        self.assertEqual(self.client.runtime['public'].getServices(), [])
+        self.assertEqual(self.client.permanent['public'].settings.getServices(), ['ssh'])
+        self.assertEqual(self.client.calls['setZoneSettings'], 1)
+
+    def test_run_items_runtime_in_sync(self):
+        self.assertEqual(self.run_items(['http', 'https'], permanent=True, immediate=True), (True, ['http', 'https']))
+        self.assertEqual(self.client.runtime['public'].getServices(), ['ssh', 'http', 'https'])
+        # The runtime settings were compared once with the permanent ones, not per item
+        self.assertEqual(self.client.calls['getZoneSettings'], 1)
+        self.assertEqual(self.client.calls['setZoneSettings'], 1)
+        self.assertEqual(self.client.calls['reload'], 0)
+
+    def test_run_items_timeout(self):
+        self.module.params['timeout'] = 60
+        self.assertEqual(self.run_items(['http', 'https'], permanent=False, immediate=True), (True, ['http', 'https']))
+        self.assertEqual(self.client.calls['addService'], 2)
+        self.assertEqual(self.client.calls['setZoneSettings'], 0)
+
+    def test_perf_result(self):
+        self.assertEqual(FirewallTransaction.get_perf_result(self.module), {})
+
+        self.module.params['perf'] = True
+        transaction = FirewallTransaction(self.module, zone='public')
+        transaction.action_handler(transaction.get_fw_zone_settings, ())
+        transaction.action_handler(transaction.get_fw_zone_settings, ())
+        perf = FirewallTransaction.get_perf_result(self.module)['perf']
+        self.assertEqual(perf['operations']['get_fw_zone_settings']['count'], 2)
+        self.assertEqual(perf['calls'], 2)
+
+    def test_perf_stats(self):
+        transaction = FirewallTransaction(self.module, zone='public')
+        transaction.action_handler(transaction.get_fw_zone_settings, ())
+        self.assertEqual(FirewallTransaction.perf_stats, {})
+
+        self.module.params['perf'] = True
+        self.module.fail_json.side_effect = SystemExit
+        transaction.action_handler(transaction.get_fw_runtime_settings, ())
+        self.assertRaises(SystemExit, transaction.action_handler, transaction.get_fw_zone_settings, ('missing',))
+        # Failed calls are recorded too
+        self.assertEqual(sorted(FirewallTransaction.perf_stats), ['get_fw_runtime_settings', 'get_fw_zone_settings'])
+        self.assertEqual(FirewallTransaction.perf_stats['get_fw_zone_settings'][0], 1)
+
+        perf = FirewallTransaction.get_perf_result(self.module)['perf']
+        self.assertEqual(sorted(perf), ['calls', 'calls_time', 'import_time', 'operations', 'total_time'])
+        self.assertEqual(perf['calls'], 2)
+        self.assertGreaterEqual(perf['total_time'], perf['calls_time'])
+
+    def test_action_handler_failure(self):
+        self.module.fail_json.side_effect = SystemExit
+        transaction = FirewallTransaction(self.module, zone='missing')
+        self.assertRaises(SystemExit, transaction.action_handler, transaction.get_fw_zone_settings, ())
+        self.assertIn('INVALID_ZONE', self.module.fail_json.call_args[1]['msg'])
+
+
+class ZoneBindingIndexTestCase(unittest.TestCase):
+
+    ZONES = {
+        'public': '<zone><interface name="eth0"/><source address="10.0.0.0/8"/></zone>',
+        'internal': '<zone><interface name="eth1"/><source address="10.0.0.0/8"/></zone>',
+        'dmz': '<zone/>',
+    }
+
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        os.makedirs(os.path.join(tmp_dir, 'usr', 'zones'))
+        for name, content in self.ZONES.items():
+            with open(os.path.join(tmp_dir, 'usr', 'zones', '%s.xml' % name), 'w') as f:
+                f.write(content)
+        self.fw = FirewallXml(os.path.join(tmp_dir, 'etc'), os.path.join(tmp_dir, 'usr'))
+
+        reset_transaction_state()
+        self.addCleanup(reset_transaction_state)
+        patcher = patch.multiple(firewalld_utils, fw=self.fw, fw_offline=True, zone_settings_class=ZoneSettings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.module = MagicMock(name='AnsibleModule')
+        self.module.params = {'timeout': 0, 'perf': False}
+
+    def test_index(self):
+        transaction = FirewallTransaction(self.module, zone='dmz')
+        self.assertEqual(transaction.get_zones_of_binding('interfaces', 'eth0'), ['public'])
+        self.assertEqual(transaction.get_zones_of_binding('sources', '10.0.0.0/8'), ['internal', 'public'])
+        self.assertEqual(transaction.get_zones_of_binding('interfaces', 'eth9'), [])
+
+    def test_index_follows_writes(self):
+        transaction = FirewallTransaction(self.module, zone='dmz')
+        transaction.get_zones_of_binding('interfaces', 'eth0')
+
+        with patch.object(self.fw.config, 'get_zones', side_effect=AssertionError('index rebuilt')):
+            fw_zone, fw_settings = transaction.get_fw_zone_settings('public')
+            fw_settings.removeInterface('eth0')
+            transaction.update_fw_settings(fw_zone, fw_settings)
+            fw_zone, fw_settings = transaction.get_fw_zone_settings()
+            fw_settings.addInterface('eth0')
+            transaction.update_fw_settings(fw_zone, fw_settings)
+
+            self.assertEqual(transaction.get_zones_of_binding('interfaces', 'eth0'), ['dmz'])
+            self.assertEqual(transaction.get_zones_of_binding('sources', '10.0.0.0/8'), ['internal', 'public'])
+
+        # A zone written without coming from the cache drops the index
+        transaction.update_fw_settings(self.fw.config.get_zone('internal'), ZoneSettings())
+        self.assertIsNone(FirewallTransaction.zone_binding_index)
+
+
+class ConnectFwTestCase(unittest.TestCase):
+
+    def make_module(self, **params):
+        module = MagicMock(name='AnsibleModule')
+        module.params = params
+        module.fail_json.side_effect = SystemExit
+        return module
+
+    def test_not_connected_on_import(self):
+        self.assertIsNone(firewalld_utils.fw)
+
+    def test_connected_by_sanity_check(self):
+        client = MagicMock(name='FirewallClient', connected=True)
+        firewall = MagicMock(name='firewall')
+        firewall.config.VERSION = '1.3.4'
+        firewall.client.FirewallClient.return_value = client
+        modules = {'firewall': firewall, 'firewall.config': firewall.config,
+                   'firewall.client': firewall.client, 'firewall.errors': firewall.errors}
+        with patch.dict(sys.modules, modules), patch.multiple(firewalld_utils, fw=None, import_failure=True, FW_VERSION=None):
+            module = self.make_module()
+            FirewallTransaction.sanity_check(module)
+            self.assertIs(firewalld_utils.fw, client)
+            self.assertEqual(firewalld_utils.FW_VERSION, '1.3.4')
+            module.fail_json.assert_not_called()
+
+            # A second check reuses the connection
+            FirewallTransaction.sanity_check(module)
+            self.assertEqual(firewall.client.FirewallClient.call_count, 1)
+
+    def test_missing_bindings(self):
+        with patch.dict(sys.modules, {'firewall': None}), patch.multiple(
+            firewalld_utils, fw=None, import_failure=True, FW_VERSION=None, HAS_RESPAWN_UTIL=False
+        ):
+            module = self.make_module()
+            self.assertRaises(SystemExit, FirewallTransaction.sanity_check, module)
+            self.assertIn('firewall', module.fail_json.call_args[1]['msg'])
+
+    def test_xml_backend_skips_bindings(self):
+        with patch.dict(sys.modules, {'firewall': None}), patch.multiple(
+            firewalld_utils, fw=None, fw_offline=False, fw_backend='firewall', zone_settings_class=None,
+            is_firewalld_running=MagicMock(return_value=False),
+        ):
+            FirewallTransaction.sanity_check(self.make_module(offline_backend='xml'))
+            self.assertEqual(firewalld_utils.fw_backend, 'xml')
+            self.assertTrue(firewalld_utils.fw_offline)
+
+    def test_xml_backend_refused_with_running_daemon(self):
+        with patch.multiple(
+            firewalld_utils, fw=None, fw_offline=False, fw_backend='firewall', zone_settings_class=None,
+            is_firewalld_running=MagicMock(return_value=True),
+        ):
+            module = self.make_module(offline_backend='xml')
+            self.assertRaises(SystemExit, FirewallTransaction.sanity_check, module)
+            self.assertIn('firewalld is running', module.fail_json.call_args[1]['msg'])
+            self.assertIsNone(firewalld_utils.fw)
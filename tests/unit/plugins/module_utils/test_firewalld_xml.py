@@ -0,0 +1,135 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+
+from ansible_collections.ansible.posix.tests.unit.compat import unittest
+
+from ansible_collections.ansible.posix.plugins.module_utils.firewalld_xml import (
+    FirewallXml,
+    FirewallXmlError,
+    ZoneSettings,
+    is_firewalld_running,
+)
+
+
+PUBLIC_ZONE = '''<?xml version="1.0" encoding="utf-8"?>
+<zone>
+  <short>Public</short>
+  <description>For use in public areas.</description>
+  <source ipset="blocklist"/>
+  <service name="ssh"/>
+  <port port="8080" protocol="tcp"/>
+  <forward-port port="80" protocol="tcp" to-port="8080"/>
+  <rule family="ipv4">
+    <source address="10.0.0.0/8"/>
+    <accept/>
+  </rule>
+  <forward/>
+</zone>
+'''
+
+
+class FirewallXmlTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix='ansible-test-')
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.etc_dir = os.path.join(self.tmp_dir, 'etc')
+        self.usr_dir = os.path.join(self.tmp_dir, 'usr')
+        os.makedirs(os.path.join(self.usr_dir, 'zones'))
+        with open(os.path.join(self.usr_dir, 'zones', 'public.xml'), 'w') as f:
+            f.write(PUBLIC_ZONE)
+        self.fw = FirewallXml(self.etc_dir, self.usr_dir)
+
+    def test_read_builtin_zone(self):
+        self.assertEqual(self.fw.config.get_zones(), ['public'])
+        self.assertEqual(self.fw.get_default_zone(), 'public')
+
+        zone = self.fw.config.get_zone('public')
+        settings = ZoneSettings(self.fw.config.get_zone_config(zone))
+        self.assertEqual(settings.getServices(), ['ssh'])
+        self.assertTrue(settings.queryPort('8080', 'tcp'))
+        self.assertTrue(settings.queryForwardPort('80', 'tcp', '8080', ''))
+        self.assertEqual(settings.getSources(), ['ipset:blocklist'])
+        self.assertTrue(settings.getForward())
+        self.assertEqual(settings.getTarget(), 'default')
+
+    def test_write_customizes_zone(self):
+        zone = self.fw.config.get_zone('public')
+        settings = ZoneSettings(self.fw.config.get_zone_config(zone))
+        settings.addService('http')
+        settings.removePort('8080', 'tcp')
+        settings.addSource('00:11:22:33:44:55')
+        settings.setTarget('DROP')
+        self.fw.config.set_zone_config(zone, settings.settings)
+
+        self.assertTrue(os.path.exists(os.path.join(self.etc_dir, 'zones', 'public.xml')))
+        # The builtin zone stays as it is
+        with open(os.path.join(self.usr_dir, 'zones', 'public.xml')) as f:
+            self.assertEqual(f.read(), PUBLIC_ZONE)
+
+        reread = FirewallXml(self.etc_dir, self.usr_dir)
+        zone = reread.config.get_zone('public')
+        settings = ZoneSettings(reread.config.get_zone_config(zone))
+        self.assertEqual(settings.getServices(), ['ssh', 'http'])
+        self.assertEqual(settings.getPorts(), [])
+        self.assertEqual(settings.getSources(), ['ipset:blocklist', '00:11:22:33:44:55'])
+        self.assertEqual(settings.getTarget(), 'DROP')
+        self.assertEqual(zone.interfaces, [])
+        # Rich rules are written back untouched
+        self.assertEqual([child.tag for child in zone.root.findall('rule')], ['rule'])
+        self.assertEqual(zone.root.find('rule/source').get('address'), '10.0.0.0/8')
+
+    def test_new_and_remove_zone(self):
+        settings = ZoneSettings()
+        settings.addInterface('eth0')
+        zone = self.fw.config.new_zone('internal', settings.settings)
+        self.assertEqual(zone.interfaces, ['eth0'])
+        self.assertEqual(self.fw.config.get_zones(), ['internal', 'public'])
+        self.assertRaises(FirewallXmlError, self.fw.config.new_zone, 'public', settings.settings)
+
+        self.fw.config.remove_zone(zone)
+        self.assertEqual(self.fw.config.get_zones(), ['public'])
+        self.assertRaises(FirewallXmlError, self.fw.config.get_zone, 'internal')
+        self.assertRaises(FirewallXmlError, self.fw.config.remove_zone, self.fw.config.get_zone('public'))
+
+    def test_rich_rules_are_rejected(self):
+        zone = self.fw.config.get_zone('public')
+        settings = ZoneSettings(self.fw.config.get_zone_config(zone))
+        settings.addRichRule('rule family="ipv4" accept')
+        self.assertRaises(FirewallXmlError, self.fw.config.set_zone_config, zone, settings.settings)
+
+    def make_proc(self, *processes):
+        """Return a fake proc tree with the processes (comm, cmdline)."""
+        proc = tempfile.mkdtemp(dir=self.tmp_dir)
+        processes = (
+            (b'systemd\n', b'/usr/lib/systemd/systemd\0--switched-root\0'),
+            (b'journalctl\n', b'journalctl\0-u\0firewalld\0'),
+            (b'kthreadd\n', b''),
+        ) + processes
+        for pid, (comm, cmdline) in enumerate(processes, 1):
+            os.makedirs(os.path.join(proc, str(pid)))
+            for name, content in (('comm', comm), ('cmdline', cmdline)):
+                with open(os.path.join(proc, str(pid), name), 'wb') as f:
+                    f.write(content)
+        os.symlink('1', os.path.join(proc, 'self'))
+        return proc
+
+    def test_is_firewalld_running(self):
+        self.assertFalse(is_firewalld_running(self.make_proc()))
+        self.assertFalse(is_firewalld_running(os.path.join(self.tmp_dir, 'missing')))
+
+        for process in (
+            # Started by the shebang line on RHEL 8
+            (b'firewalld\n', b'/usr/libexec/platform-python\0-s\0/usr/sbin/firewalld\0--nofork\0--nopid\0'),
+            # Started by the interpreter
+            (b'python3\n', b'/usr/bin/python3\0-s\0/usr/sbin/firewalld\0--nofork\0--nopid\0'),
+            (b'platform-python\n', b'/usr/libexec/platform-python\0-s\0/usr/sbin/firewalld\0'),
+            # Executed directly
+            (b'firewalld\n', b'/usr/sbin/firewalld\0--nofork\0'),
+        ):
+            self.assertTrue(is_firewalld_running(self.make_proc(process)), process)
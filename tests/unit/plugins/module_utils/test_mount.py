@@ -0,0 +1,152 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import tempfile
+
+from ansible_collections.ansible.posix.tests.unit.compat import unittest
+from ansible_collections.ansible.posix.tests.unit.compat.mock import MagicMock, patch
+from ansible.module_utils.common.text.converters import to_bytes
+
+from ansible_collections.ansible.posix.plugins.module_utils import mount
+from ansible_collections.ansible.posix.plugins.module_utils.mount import Fstab, LinuxMounts, MountPoints, ismount, statx_ismount, wait_for_mount
+
+
+FSTAB = (
+    '# /etc/fstab\n'
+    'UUID=8ac075e3-1124-4bb6-bef7-a6811bf8b870 /     xfs   defaults 0 0\n'
+    '\n'
+    '/dev/sdb1   /data  ext4  noatime  # data disk\n'
+    '/swapfile none swap defaults 0 0\n'
+    '/swapfile2 none swap defaults 0 0\n'
+    'not an entry'
+)
+
+
+class FstabTestCase(unittest.TestCase):
+
+    def _create_file(self, content):
+        tmp_file = tempfile.NamedTemporaryFile(prefix='ansible-test-', delete=False)
+        tmp_file.write(to_bytes(content))
+        tmp_file.close()
+        self.addCleanup(os.unlink, tmp_file.name)
+        return tmp_file.name
+
+    def _fields(self, **fields):
+        result = dict(src='/dev/sdc1', name='/srv', fstype='xfs', opts='defaults', dump='0', passno='0', boot='yes')
+        result.update(fields)
+        return result
+
+    def test_parse(self):
+        fstab = Fstab(self._create_file(FSTAB), system='Linux')
+        self.assertEqual(''.join(fstab.to_lines()), FSTAB + '\n')
+        self.assertEqual(fstab.original_lines, fstab.to_lines())
+        entry, = fstab.find('/data')
+        self.assertEqual((entry.src, entry.fstype, entry.opts, entry.dump, entry.passno), ('/dev/sdb1', 'ext4', 'noatime', '0', '0'))
+        self.assertEqual(len(fstab.find('none')), 2)
+        self.assertEqual([entry.src for entry in fstab.find('none', '/swapfile2')], ['/swapfile2'])
+        self.assertEqual(fstab.find('an'), [])
+
+    def test_set_unchanged(self):
+        fstab = Fstab(self._create_file(FSTAB), system='Linux')
+        self.assertFalse(fstab.set(self._fields(src='/dev/sdb1', name='/data', fstype='ext4', opts='noatime')))
+        self.assertFalse(fstab.changed)
+
+    def test_set_in_place(self):
+        fstab = Fstab(self._create_file(FSTAB), system='Linux')
+        self.assertTrue(fstab.set(self._fields(src='/dev/sdb1', name='/data', fstype='ext4', opts='ro')))
+        self.assertTrue(fstab.set(self._fields()))
+        self.assertTrue(fstab.changed)
+        lines = fstab.to_lines()
+        self.assertEqual(lines[1], fstab.original_lines[1])
+        self.assertEqual(lines[3], '/dev/sdb1 /data ext4 ro 0 0\n')
+        self.assertEqual(lines[-1], '/dev/sdc1 /srv xfs defaults 0 0\n')
+
+    def test_remove(self):
+        fstab = Fstab(self._create_file(FSTAB), system='Linux')
+        self.assertTrue(fstab.remove('none', '/swapfile'))
+        self.assertTrue(fstab.remove('/data'))
+        self.assertFalse(fstab.remove('/data'))
+        self.assertEqual(''.join(fstab.to_lines()), FSTAB.replace('/dev/sdb1   /data  ext4  noatime  # data disk\n', '')
+                         .replace('/swapfile none swap defaults 0 0\n', '') + '\n')
+
+    def test_sunos(self):
+        fstab = Fstab(self._create_file('/dev/dsk/c0t0d0s7 /dev/rdsk/c0t0d0s7 /export/home ufs 2 yes -\n'), system='SunOS')
+        entry, = fstab.find('/export/home')
+        self.assertEqual((entry.src, entry.passno, entry.boot, entry.opts), ('/dev/dsk/c0t0d0s7', '2', 'yes', '-'))
+        self.assertTrue(fstab.set(dict(src='/dev/dsk/c0t0d0s7', name='/export/home', fstype='ufs', passno='2', boot='no', opts='-')))
+        self.assertEqual(fstab.to_lines(), ['/dev/dsk/c0t0d0s7 - /export/home ufs 2 no -\n'])
+
+
+MOUNTINFO = (
+    '140 1 253:2 /rootfs / rw - ext4 /dev/sdb2 rw\n'
+    '141 140 253:2 /rootfs/tmp/aaa /tmp/bbb rw - ext4 /dev/sdb2 rw\n'
+    '42 140 0:35 / /tmp rw - tmpfs tmpfs rw\n'
+    '78 42 0:35 /aaa /tmp/bbb rw - tmpfs tmpfs rw\n'
+    '79 78 0:35 /aaa/ccc /tmp/bbb/ddd rw - tmpfs tmpfs rw\n'
+    '80 81 0:36 /eee /srv/eee rw - tmpfs tmpfs rw\n'
+    '81 140 0:36 /fff /srv rw - tmpfs tmpfs rw\n'
+)
+
+
+class LinuxMountsTestCase(unittest.TestCase):
+
+    def test_mounts(self):
+        mounts = LinuxMounts(MOUNTINFO.splitlines(True))
+        self.assertEqual(sorted(mounts), ['/', '/srv', '/srv/eee', '/tmp', '/tmp/bbb', '/tmp/bbb/ddd'])
+        self.assertNotIn('/tmp/aaa', mounts)
+        self.assertEqual(mounts['/'].src, '/dev/sdb2')
+        self.assertEqual(mounts['/tmp'].src, '/')
+        # The last mount on /tmp/bbb wins
+        self.assertEqual(mounts['/tmp/bbb'].to_dict(), dict(
+            dst='/tmp/bbb', src='/tmp/aaa', opts='rw', fs='tmpfs', device='0:35', source='tmpfs', super_opts='rw'))
+        self.assertEqual(mounts['/tmp/bbb/ddd']['src'], '/tmp/bbb/aaa/ccc')
+        # The parent listed after its child is not resolved for it
+        self.assertEqual(mounts['/srv/eee'].src, '/srv/eee')
+        self.assertEqual(mounts['/srv'].get('src'), '/fff')
+        self.assertIsNone(mounts['/srv'].get('root'))
+        self.assertRaises(KeyError, lambda: mounts['/srv']['root'])
+
+
+class MountPointsTestCase(unittest.TestCase):
+
+    def test_statx_ismount(self):
+        for path in ('/', '/nonexistent', os.getcwd()):
+            result = statx_ismount(path)
+            if result is not None:
+                self.assertEqual(result, ismount(path), path)
+
+    def test_cache(self):
+        statx = MagicMock(side_effect=lambda path: {'/mnt': True, '/mnt/a': False}.get(path))
+        fallback = MagicMock(return_value=False)
+        with patch.multiple(mount, statx_ismount=statx, ismount=fallback):
+            mount_points = MountPoints()
+            for dummy in range(2):
+                self.assertTrue(mount_points.ismount('/mnt'))
+                self.assertFalse(mount_points.ismount('/mnt/a'))
+                self.assertFalse(mount_points.ismount('/mntb'))
+            self.assertEqual(statx.call_count, 3)
+            fallback.assert_called_once_with('/mntb')
+
+            mount_points.invalidate('/mnt')
+            for path in ('/mnt', '/mnt/a', '/mntb'):
+                mount_points.ismount(path)
+            self.assertEqual(statx.call_count, 5)
+
+
+class WaitForMountTestCase(unittest.TestCase):
+
+    def test_wait_for_mount(self):
+        tmp_file = tempfile.NamedTemporaryFile(prefix='ansible-test-', delete=False)
+        tmp_file.write(b'22 1 8:1 / / rw - ext4 /dev/sda1 rw\n23 22 0:50 / /srv/my\\040share rw - nfs4 server:/export rw\n')
+        tmp_file.close()
+        self.addCleanup(os.unlink, tmp_file.name)
+
+        self.assertTrue(wait_for_mount('/srv/my share', 1, tmp_file.name))
+        self.assertFalse(wait_for_mount('/srv', 0.01, tmp_file.name))
+
+        fallback = MagicMock(side_effect=[False, True])
+        with patch.object(mount, 'ismount', fallback):
+            self.assertTrue(wait_for_mount('/srv', 1, os.path.join(tmp_file.name, 'missing')))
+        self.assertEqual(fallback.call_count, 2)